@@ -11,6 +11,7 @@ class LeasesLicensingConfig(AppConfig):
 
     def ready(self):
         if not self.run_once:
+            from leaseslicensing.components.approvals import signals  # noqa
             from leaseslicensing.components.approvals.models import (
                 Approval,
                 ApprovalDocument,
@@ -22,6 +23,8 @@ class LeasesLicensingConfig(AppConfig):
                 CompetitiveProcessParty,
             )
             from leaseslicensing.components.compliances.models import Compliance
+            from leaseslicensing.components.invoicing import signals  # noqa
+            from leaseslicensing.components.main import signals  # noqa
             from leaseslicensing.components.main.models import ApplicationType
             from leaseslicensing.components.organisations import signals  # noqa
             from leaseslicensing.components.proposals import signals  # noqa
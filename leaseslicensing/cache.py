@@ -0,0 +1,275 @@
+"""A two-tier django cache backend: a per-process LRU in front of a shared cache."""
+
+import logging
+import pickle
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    A bounded, thread-safe least recently used cache for the current process.
+    Entries expire after `timeout` seconds (or the timeout they were set with).
+    """
+
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        # Hit, miss and eviction counters
+        self.counters = Counter()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        values = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                value, expires = entry
+                if expires < now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                values[key] = value
+        return values
+
+    def get(self, key, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def set_many(self, values, timeout=None):
+        expires = time.monotonic() + (self.timeout if timeout is None else timeout)
+        with self._lock:
+            for key, value in values.items():
+                self._entries[key] = (value, expires)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def count(self, counter, value=1):
+        with self._lock:
+            self.counters[counter] += value
+
+    def set(self, key, value, timeout=None):
+        self.set_many({key: value}, timeout)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def delete(self, key):
+        self.delete_many([key])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Django creates a cache backend instance per thread, so the local tiers are kept here
+# to share them between the threads of a process
+_local_tiers = {}
+_local_tiers_lock = threading.Lock()
+
+
+def get_local_tier(name, maxsize, timeout):
+    with _local_tiers_lock:
+        if name not in _local_tiers:
+            _local_tiers[name] = LRUCache(maxsize, timeout)
+        return _local_tiers[name]
+
+
+class TwoTierCache(BaseCache):
+    """
+    A cache backend that keeps recently used values in a bounded LRU cache of the
+    current process in front of a shared cache (the cache alias given by the
+    `SHARED_CACHE` option, e.g. a file based or redis cache).
+
+    Values are read from the local tier first and only fetched from (and unpickled
+    from) the shared tier when they are not in the local tier. Values are kept in
+    the local tier for at most `LOCAL_TIMEOUT` seconds, which bounds how long other
+    processes can keep reading a value after it has been changed or deleted.
+
+    Keys of the form `<namespace>:<key>` are namespaced. All keys of a namespace
+    can be invalidated at once with `invalidate_namespace`, e.g. from model signals.
+
+    Options:
+        SHARED_CACHE: The alias of the shared cache (default "shared")
+        LOCAL_MAX_ENTRIES: The maximum number of values in the local tier
+        LOCAL_TIMEOUT: The maximum number of seconds a value stays in the local tier
+    """
+
+    namespace_separator = ":"
+    namespace_version_key = "cache-namespace-version-{}"
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._shared_alias = options.get("SHARED_CACHE", "shared")
+        self.local_timeout = int(options.get("LOCAL_TIMEOUT", 10))
+        self._local = get_local_tier(
+            location or self._shared_alias,
+            int(options.get("LOCAL_MAX_ENTRIES", 1000)),
+            self.local_timeout,
+        )
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    def stats(self):
+        """Returns the hit, miss and eviction counters of the current process"""
+
+        return {
+            "local_hits": self._local.counters["local_hits"],
+            "shared_hits": self._local.counters["shared_hits"],
+            "misses": self._local.counters["misses"],
+            "local_evictions": self._local.counters["evictions"],
+            "local_entries": len(self._local),
+        }
+
+    def namespace_version(self, namespace):
+        key = self.namespace_version_key.format(namespace)
+        version = self._local.get(key)
+        if version is None:
+            version = self.shared.get(key)
+            if version is None:
+                # Not yet set or evicted from the shared cache, so anything cached
+                # under the namespace before has to be treated as stale
+                self.shared.add(key, uuid.uuid4().hex, None)
+                version = self.shared.get(key)
+            self._local.set(key, version)
+        return version
+
+    def invalidate_namespace(self, namespace):
+        """Makes all values cached under `namespace` unreachable"""
+
+        key = self.namespace_version_key.format(namespace)
+        version = uuid.uuid4().hex
+        self.shared.set(key, version, None)
+        self._local.set(key, version)
+        logger.debug(f"Invalidated cache namespace {namespace}")
+
+    def _versioned_key(self, key):
+        namespace, separator, name = key.partition(self.namespace_separator)
+        if not separator:
+            return key
+        version = self.namespace_version(namespace)
+        return f"{namespace}{separator}{version}{separator}{name}"
+
+    def _local_timeout(self, timeout):
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is None:
+            return self.local_timeout
+        return min(max(timeout - time.time(), 0), self.local_timeout)
+
+    def get_many(self, keys, version=None):
+        keys = {self._versioned_key(key): key for key in keys}
+        local_keys = {
+            self.make_and_validate_key(key, version=version): key for key in keys
+        }
+        values = {
+            local_keys[local_key]: pickle.loads(value)
+            for local_key, value in self._local.get_many(local_keys).items()
+        }
+        self._local.count("local_hits", len(values))
+
+        missing = [key for key in keys if key not in values]
+        if missing:
+            shared_values = self.shared.get_many(missing, version=version)
+            self._local.count("shared_hits", len(shared_values))
+            self._local.count("misses", len(missing) - len(shared_values))
+            self._local.set_many(
+                {
+                    self.make_and_validate_key(key, version=version): pickle.dumps(
+                        value, pickle.HIGHEST_PROTOCOL
+                    )
+                    for key, value in shared_values.items()
+                }
+            )
+            values.update(shared_values)
+
+        return {keys[key]: value for key, value in values.items()}
+
+    def get(self, key, default=None, version=None):
+        return self.get_many([key], version=version).get(key, default)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout=timeout, version=version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        data = {self._versioned_key(key): value for key, value in data.items()}
+        local_timeout = self._local_timeout(timeout)
+        local_data = {
+            self.make_and_validate_key(key, version=version): pickle.dumps(
+                value, pickle.HIGHEST_PROTOCOL
+            )
+            for key, value in data.items()
+        }
+        failed_keys = self.shared.set_many(data, timeout=timeout, version=version)
+        if local_timeout > 0:
+            self._local.set_many(local_data, local_timeout)
+        else:
+            self._local.delete_many(local_data)
+        return failed_keys
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        versioned_key = self._versioned_key(key)
+        self._local.delete(self.make_and_validate_key(versioned_key, version=version))
+        return self.shared.add(versioned_key, value, timeout=timeout, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(
+            self._versioned_key(key), timeout=timeout, version=version
+        )
+
+    def delete_many(self, keys, version=None):
+        keys = [self._versioned_key(key) for key in keys]
+        self._local.delete_many(
+            [self.make_and_validate_key(key, version=version) for key in keys]
+        )
+        self.shared.delete_many(keys, version=version)
+
+    def delete(self, key, version=None):
+        versioned_key = self._versioned_key(key)
+        self._local.delete(self.make_and_validate_key(versioned_key, version=version))
+        return self.shared.delete(versioned_key, version=version)
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version=version) is not _MISSING
+
+    def incr(self, key, delta=1, version=None):
+        versioned_key = self._versioned_key(key)
+        self._local.delete(self.make_and_validate_key(versioned_key, version=version))
+        return self.shared.incr(versioned_key, delta, version=version)
+
+    def clear(self):
+        self._local.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+
+def invalidate_cache_namespace(namespace):
+    """Invalidates `namespace` of the default cache if the cache supports namespaces"""
+
+    from django.core.cache import cache
+
+    if hasattr(cache, "invalidate_namespace"):
+        cache.invalidate_namespace(namespace)
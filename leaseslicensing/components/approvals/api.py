@@ -14,15 +14,11 @@ from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.throttling import UserRateThrottle
 from rest_framework_datatables.filters import DatatablesFilterBackend
-from rest_framework_datatables.pagination import DatatablesPageNumberPagination
 from rest_framework_datatables.renderers import DatatablesRenderer
-from reversion.errors import RevertError
-from reversion.models import Version
 
 from leaseslicensing.components.approvals.document import ApprovalDocumentGenerator
 from leaseslicensing.components.approvals.models import (
     Approval,
-    ApprovalDocument,
     ApprovalTransfer,
     ApprovalTransferApplicant,
     ApprovalType,
@@ -46,6 +42,10 @@ from leaseslicensing.components.main.api import (
     UserActionLoggingViewset,
 )
 from leaseslicensing.components.main.decorators import basic_exception_handler
+from leaseslicensing.components.main.pagination import (
+    DatatablesPagination,
+    get_cached_total_count,
+)
 from leaseslicensing.components.main.process_document import process_generic_document
 from leaseslicensing.components.main.serializers import RelatedItemSerializer
 from leaseslicensing.components.organisations.utils import get_organisation_ids_for_user
@@ -123,7 +123,7 @@ class ApprovalFilterBackend(DatatablesFilterBackend):
     """
 
     def filter_queryset(self, request, queryset, view):
-        total_count = queryset.count()
+        total_count = get_cached_total_count(queryset)
 
         filter_approval_type = (
             request.GET.get("filter_approval_type")
@@ -216,7 +216,7 @@ class ApprovalFilterBackend(DatatablesFilterBackend):
 
 class ApprovalPaginatedViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = (ApprovalFilterBackend,)
-    pagination_class = DatatablesPageNumberPagination
+    pagination_class = DatatablesPagination
     renderer_classes = (ProposalRenderer,)
     page_size = 10
     queryset = Approval.objects.none()
@@ -291,7 +291,6 @@ class ApprovalPaginatedViewSet(viewsets.ReadOnlyModelViewSet):
             .values_list("id", flat=True)
         )
         qs = Approval.objects.filter(id__in=ids)
-        qs = self.filter_queryset(qs)
 
         # on the internal organisations dashboard, filter the Proposal/Approval/Compliance datatables
         # by applicant/organisation
@@ -302,8 +301,10 @@ class ApprovalPaginatedViewSet(viewsets.ReadOnlyModelViewSet):
         if submitter_id:
             qs = qs.filter(submitter_id=submitter_id)
 
-        self.paginator.page_size = qs.count()
-        result_page = self.paginator.paginate_queryset(qs, request)
+        # Filter last so the counts stored on the view match the paginated queryset
+        qs = self.filter_queryset(qs)
+
+        result_page = self.paginator.paginate_queryset(qs, request, view=self)
         serializer = ApprovalSerializer(
             result_page, context={"request": request}, many=True
         )
@@ -313,7 +314,7 @@ class ApprovalPaginatedViewSet(viewsets.ReadOnlyModelViewSet):
 class ApprovalViewSet(UserActionLoggingViewset, KeyValueListMixin):
     queryset = Approval.objects.none()
     serializer_class = ApprovalSerializer
-    pagination_class = DatatablesPageNumberPagination
+    pagination_class = DatatablesPagination
     key_value_display_field = "lodgement_number"
     key_value_serializer_class = ApprovalKeyValueSerializer
     permission_classes = [IsAssessor | IsFinanceOfficer | HasObjectPermission]
@@ -529,63 +530,16 @@ class ApprovalViewSet(UserActionLoggingViewset, KeyValueListMixin):
             logger.warning(f"No license document found for approval {instance}")
             return Response({})
 
-        versions = Version.objects.get_for_object(instance)
-
-        first = versions.first()
-        if not first:
-            return Response({})
-
-        versions = versions.filter(
-            ~Q(revision__comment="")
-            # | Q(revision_id=first.revision_id)
-        ).order_by("-revision__date_created")
-
-        approvals = []  # List of history approvals to return
-        lodgement_sequences = (
-            []
-        )  # List to make sure there is only one approval (the most recent one) per lodgement sequence
-        for version in versions:
-            version_set = version.revision.version_set.all()
-
-            approval = None
-            documents = []
-            for vs in version_set:
-                try:
-                    obj_class = vs._object_version.object.__class__
-                except RevertError:
-                    logger.exception("Error reverting object version")
-                    continue
-                if obj_class == Approval:
-                    approval = vs._object_version.object
-                elif obj_class == ApprovalDocument:
-                    documents.append(vs._object_version.object)
-
-            if not approval or approval.lodgement_sequence in lodgement_sequences:
-                # Don't add to the history when there is no approval
-                # or when the lodgement sequence is already in the list
-                continue
-            lodgement_sequences.append(approval.lodgement_sequence)
-
-            for doc in documents:
-                if doc.id == approval.licence_document_id:
-                    approval.licence_document = doc
-                if doc.id == approval.cover_letter_document_id:
-                    approval.cover_letter_document = doc
-
-            approval.revision_id = version.revision_id
-
-            version_date = version.revision.date_created.strftime(
-                "%d/%m/%Y %I:%M:%S %p"
-            )
-            logger.info(
-                f"Adding approval {approval}-{approval.lodgement_sequence} from {version_date} to history table"
-            )
-            approvals.append(approval)
-        logger.info(
-            f"Returning Approval history: {', '.join([f'{approval}-{ls}' for ls in lodgement_sequences])}"
-        )
-        # Sort by lodgement sequence (don't trust the revision date)
-        approvals = sorted(approvals, key=lambda x: x.lodgement_sequence, reverse=True)
+        # One entry per lodgement sequence, recorded when the approval's commented
+        # revisions were saved (see `ApprovalHistory`)
+        approvals = instance.history.select_related(
+            "approval",
+            "approval_type",
+            "current_proposal__org_applicant",
+            "licence_document",
+            "cover_letter_document",
+            "sign_off_sheet",
+        ).order_by("-lodgement_sequence")
         serializer = ApprovalHistorySerializer(approvals, many=True)
         return Response(serializer.data)
 
@@ -659,7 +613,7 @@ class ApprovalViewSet(UserActionLoggingViewset, KeyValueListMixin):
         methods=["GET"],
         detail=True,
         renderer_classes=[DatatablesRenderer],
-        pagination_class=DatatablesPageNumberPagination,
+        pagination_class=DatatablesPagination,
     )
     def related_items(self, request, *args, **kwargs):
         """Uses union to combine a queryset of multiple different model types
@@ -1,5 +1,4 @@
 import logging
-import os
 import re
 from io import BytesIO
 
@@ -10,6 +9,7 @@ from docx import Document
 
 from leaseslicensing.components.approvals.models import ApprovalDocument
 from leaseslicensing.components.main.decorators import basic_exception_handler
+from leaseslicensing.components.main.document_conversion import get_document_converter
 
 logger = logging.getLogger(__name__)
 
@@ -100,13 +100,12 @@ class ApprovalDocumentGenerator:
         else:
             return BytesIO(buffer)
 
-    @basic_exception_handler
-    def _example_approval_document_from_template(self, approval, template):
+    def _render_example_approval_document(self, approval, template):
         """
         Test function to create a very basic Approval license document from a template
 
         Returns:
-            BytesIO object
+            BytesIO object of the docx document
         """
 
         doc = Document(template)
@@ -153,28 +152,40 @@ class ApprovalDocumentGenerator:
             doc, re.compile(rf"{key}"), f"{issue_date}", key, False
         )
 
-        temp_directory = f"{settings.BASE_DIR}/tmp"
+        buffer = BytesIO()
+        doc.save(buffer)
 
-        try:
-            os.stat(temp_directory)
-        except OSError:
-            os.mkdir(temp_directory)
-        new_doc_file = f"{temp_directory}/licence_{str(approval.lodgement_number)}.docx"
-        new_pdf_file = f"{temp_directory}/licence_{str(approval.lodgement_number)}.pdf"
-        doc.save(new_doc_file)
-        os.system(
-            "libreoffice --headless --convert-to pdf "
-            + new_doc_file
-            + " --outdir "
-            + temp_directory
+        return buffer
+
+    @basic_exception_handler
+    def _example_approval_documents_from_template(self, approvals, template):
+        """
+        Creates very basic Approval license documents from a template and converts
+        them to pdf in parallel with the document converter of the process
+
+        Returns:
+            list: A BytesIO object for each approval
+        """
+
+        return get_document_converter().convert(
+            [
+                (
+                    f"licence_{approval.lodgement_number}.docx",
+                    self._render_example_approval_document(approval, template),
+                )
+                for approval in approvals
+            ]
         )
 
-        buffer = self._filepath_to_buffer(new_pdf_file)
+    def _example_approval_document_from_template(self, approval, template):
+        """
+        Test function to create a very basic Approval license document from a template
 
-        os.remove(new_doc_file)
-        os.remove(new_pdf_file)
+        Returns:
+            BytesIO object
+        """
 
-        return buffer
+        return self._example_approval_documents_from_template([approval], template)[0]
 
     def has_template(self, approval_type_name, document_name=None):
         """
@@ -293,6 +304,26 @@ class ApprovalDocumentGenerator:
                 Prefix to the name of the license document file
         """
 
+        return self.create_license_documents_from_template(
+            [approval], filename_prefix, **kwargs
+        )[0]
+
+    def create_license_documents_from_template(
+        self, approvals, filename_prefix=None, **kwargs
+    ):
+        """
+        Creates license documents from a template for a batch of approvals (e.g. when
+        issuing or reissuing several approvals) and attaches them to the approvals.
+        The documents are converted in parallel.
+        Args:
+            approvals:
+                List of Approval objects
+            filename_prefix:
+                Prefix to the name of the license document files
+        Returns:
+            list: The ApprovalDocument of each approval
+        """
+
         # TODO: Replace with actual approval type name derived from approval
         approval_type_name = kwargs.get("approval_type_name", "default type")
         document_name = kwargs.get("document_name", "default document")
@@ -306,18 +337,23 @@ class ApprovalDocumentGenerator:
             templates = self._license_templates[approval_type_name]
             # TODO: For-loop over templates or similar
             template = templates[document_name]
-            buffer = self._example_approval_document_from_template(approval, template)
+            buffers = self._example_approval_documents_from_template(
+                approvals, template
+            )
         else:
             raise NotImplementedError(
                 f"Approval document generation from template for approval type {approval_type_name} "
                 "is not implemented yet."
             )
 
-        document = self.update_approval_document_file(
-            approval, buffer, filename_prefix, **kwargs
-        )
-        buffer.close()
-        # Attach the document to the approval
-        approval.licence_document = document
+        documents = []
+        for approval, buffer in zip(approvals, buffers):
+            document = self.update_approval_document_file(
+                approval, buffer, filename_prefix, **kwargs
+            )
+            buffer.close()
+            # Attach the document to the approval
+            approval.licence_document = document
+            documents.append(document)
 
-        return document
+        return documents
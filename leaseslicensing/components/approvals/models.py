@@ -3,15 +3,18 @@ import logging
 
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
 from django.core.cache import cache
 from django.core.exceptions import FieldError, ValidationError
 from django.db import models, transaction
-from django.db.models import JSONField, Q
+from django.db.models import F, JSONField, Q
 from django.db.models.deletion import ProtectedError
 from django.db.models.signals import pre_delete
 from django.dispatch import receiver
 from django.utils import timezone
 from ledger_api_client.ledger_models import EmailUserRO as EmailUser
+from reversion import revisions
+from reversion.errors import RevertError
 
 from leaseslicensing.components.approvals.email import (
     send_approval_cancel_email_notification,
@@ -50,7 +53,7 @@ from leaseslicensing.components.proposals.models import (
     copy_proposal_requirements,
 )
 from leaseslicensing.helpers import is_customer, user_ids_in_group
-from leaseslicensing.ledger_api_utils import retrieve_email_user
+from leaseslicensing.ledger_api_utils import prefetch_email_users, retrieve_email_user
 from leaseslicensing.settings import PROPOSAL_TYPE_AMENDMENT, PROPOSAL_TYPE_RENEWAL
 
 logger = logging.getLogger(__name__)
@@ -573,8 +576,10 @@ class Approval(LicensingModelVersioned):
 
     @property
     def allowed_assessors(self):
+        allowed_assessor_ids = self.allowed_assessor_ids()
+        prefetch_email_users(allowed_assessor_ids)
         emailusers = []
-        for id in self.allowed_assessor_ids():
+        for id in allowed_assessor_ids:
             emailuser = retrieve_email_user(id)
             emailusers.append(
                 {
@@ -1032,6 +1037,142 @@ class Approval(LicensingModelVersioned):
             user.id,
         )
 
+    @classmethod
+    def bulk_transition(
+        cls,
+        queryset,
+        status,
+        user,
+        approval_action,
+        proposal_action,
+        version_comment="",
+        hooks=(),
+        emails=(),
+        **updates,
+    ):
+        """
+        Changes the status of all approvals in `queryset` with a single update
+        query and records them in a single revision, rather than saving every
+        approval on its own.
+
+        The `hooks` (e.g. discarding compliances and invoices) run in the same
+        transaction before the update, in a savepoint per approval. An approval whose hooks fail keeps
+        its status, so it is transitioned again on the next run. The `emails` are
+        only sent once the transaction has been committed.
+
+        Args:
+            queryset (QuerySet):
+                The approvals to transition
+            status (str):
+                The new approval status
+            user (EmailUser):
+                The user to log the user actions for
+            approval_action (str):
+                The approval user action, formatted with the approval id
+            proposal_action (str):
+                The proposal user action, formatted with the proposal id
+            version_comment (str, optional):
+                The revision comment. As in `RevisionedMixin.save`, a commented
+                revision increments the lodgement sequence.
+            hooks (iterable, optional):
+                Functions changing the data of an approval, called with each approval
+            emails (iterable, optional):
+                Functions sending the emails of an approval, called with each
+                transitioned approval
+            **updates:
+                Any further field values to set on the approvals
+
+        Returns:
+            tuple: The transitioned approvals and the error messages of the
+            approvals that failed
+        """
+
+        updates["status"] = status
+        errors = []
+        with transaction.atomic():
+            approvals = []
+            for approval in queryset.select_for_update(of=("self",)).select_related(
+                "current_proposal"
+            ):
+                try:
+                    with transaction.atomic():
+                        for hook in hooks:
+                            hook(approval)
+                except Exception as e:
+                    err_msg = f"Error running status change side effects for Approval {approval.lodgement_number}"
+                    logger.exception(f"{err_msg}\n{e}")
+                    errors.append(err_msg)
+                    continue
+                approvals.append(approval)
+            if not approvals:
+                return [], errors
+
+            fields = dict(updates)
+            if version_comment:
+                fields["lodgement_sequence"] = F("lodgement_sequence") + 1
+            # `update()` does not send `post_save`. Skipping it is safe, because
+            # none of its listeners depend on the fields changed here.
+            # - `ReminderEventListener`: the reminder dates depend on the approval
+            #   dates and invoicing details, not on the status. The reminder
+            #   commands filter the due approvals by status when they send.
+            # - The search index: the entries of approvals do not include the
+            #   status.
+            # The proposal map features are not affected either, because they only
+            # depend on proposals. The approval history is still recorded, because
+            # the revision below sends `post_revision_commit`.
+            cls.objects.filter(id__in=[a.id for a in approvals]).update(**fields)
+
+            with revisions.create_revision():
+                if version_comment:
+                    revisions.set_comment(version_comment)
+                for approval in approvals:
+                    for field, value in updates.items():
+                        setattr(approval, field, value)
+                    if version_comment:
+                        approval.lodgement_sequence += 1
+                    revisions.add_to_revision(approval)
+
+            ApprovalUserAction.log_actions(
+                [
+                    ApprovalUserAction(
+                        approval=approval,
+                        who=user.id,
+                        what=approval_action.format(approval.id),
+                    )
+                    for approval in approvals
+                ]
+            )
+            ProposalUserAction.log_actions(
+                [
+                    ProposalUserAction(
+                        proposal=approval.current_proposal,
+                        who=user.id,
+                        what=proposal_action.format(approval.current_proposal.id),
+                    )
+                    for approval in approvals
+                    if approval.current_proposal
+                ]
+            )
+
+            transaction.on_commit(
+                lambda: cls._send_status_change_emails(approvals, emails, errors)
+            )
+
+        logger.info(f"Changed the status of {len(approvals)} Approvals to {status}")
+        return approvals, errors
+
+    @staticmethod
+    def _send_status_change_emails(approvals, emails, errors):
+        # A failing approval does not stop the emails of the others
+        for approval in approvals:
+            try:
+                for email in emails:
+                    email(approval)
+            except Exception as e:
+                err_msg = f"Error sending status change emails for Approval {approval.lodgement_number}"
+                logger.exception(f"{err_msg}\n{e}")
+                errors.append(err_msg)
+
     @property
     def as_related_item(self):
         related_item = RelatedItem(
@@ -1065,6 +1206,307 @@ class Approval(LicensingModelVersioned):
         self.delete()
 
 
+class ApprovalHistory(models.Model):
+    """
+    The history of an approval, one entry per lodgement sequence, projected from
+    the most recent commented revision of the approval with that sequence.
+    Entries are written when a commented revision is saved, so that the history
+    can be listed without reverting the revisions' object versions.
+    """
+
+    approval = models.ForeignKey(
+        Approval, related_name="history", on_delete=models.CASCADE
+    )
+    revision = models.ForeignKey(
+        "reversion.Revision", related_name="+", on_delete=models.CASCADE
+    )
+    lodgement_sequence = models.IntegerField()
+    # The approval's field values at the revision
+    status = models.CharField(max_length=40, choices=Approval.STATUS_CHOICES)
+    approval_type = models.ForeignKey(
+        ApprovalType, null=True, related_name="+", on_delete=models.SET_NULL
+    )
+    current_proposal = models.ForeignKey(
+        Proposal, null=True, related_name="+", on_delete=models.SET_NULL
+    )
+    start_date = models.DateField(null=True)
+    expiry_date = models.DateField(null=True)
+    licence_document = models.ForeignKey(
+        ApprovalDocument, null=True, related_name="+", on_delete=models.SET_NULL
+    )
+    cover_letter_document = models.ForeignKey(
+        ApprovalDocument, null=True, related_name="+", on_delete=models.SET_NULL
+    )
+    sign_off_sheet = models.ForeignKey(
+        ApprovalDocument, null=True, related_name="+", on_delete=models.SET_NULL
+    )
+
+    class Meta:
+        app_label = "leaseslicensing"
+        unique_together = ("approval", "lodgement_sequence")
+        ordering = ["approval", "-lodgement_sequence"]
+        verbose_name_plural = "Approval history"
+
+    def __str__(self):
+        return f"{self.approval_id}-{self.lodgement_sequence} ({self.revision_id})"
+
+    @property
+    def holder(self):
+        # The holder at the time of the revision, i.e. the applicant of the then
+        # current proposal (see `Approval.holder`)
+        proposal = self.current_proposal
+        if proposal and proposal.org_applicant:
+            return proposal.org_applicant.ledger_organisation_name
+        elif proposal and proposal.ind_applicant:
+            return proposal.proposal_applicant.full_name
+        return "Applicant not yet assigned"
+
+    @classmethod
+    def record_versions(cls, versions):
+        """
+        Records the approval versions among reversion `versions`. The versions have
+        to be in the order of their revisions, as an entry of a lodgement sequence
+        replaces any entry recorded for the same sequence before.
+
+        Returns:
+            list: The recorded entries
+        """
+
+        content_type = ContentType.objects.get_for_model(Approval)
+        entries = {}
+        for version in versions:
+            if version.content_type_id != content_type.id:
+                continue
+            try:
+                fields = version.field_dict
+            except RevertError:
+                logger.exception(f"Error reverting approval version {version.id}")
+                continue
+            entry = cls(
+                approval_id=int(version.object_id),
+                revision_id=version.revision_id,
+                lodgement_sequence=fields["lodgement_sequence"],
+                status=fields["status"],
+                approval_type_id=fields.get("approval_type_id"),
+                current_proposal_id=fields.get("current_proposal_id"),
+                start_date=fields.get("start_date"),
+                expiry_date=fields.get("expiry_date"),
+                licence_document_id=fields.get("licence_document_id"),
+                cover_letter_document_id=fields.get("cover_letter_document_id"),
+                sign_off_sheet_id=fields.get("sign_off_sheet_id"),
+            )
+            entries[(entry.approval_id, entry.lodgement_sequence)] = entry
+        if not entries:
+            return []
+
+        # Don't reference rows that have been deleted since the revision
+        entries = cls._existing_references(list(entries.values()))
+
+        return cls.objects.bulk_create(
+            entries,
+            update_conflicts=True,
+            unique_fields=["approval", "lodgement_sequence"],
+            update_fields=[
+                "revision",
+                "status",
+                "approval_type",
+                "current_proposal",
+                "start_date",
+                "expiry_date",
+                "licence_document",
+                "cover_letter_document",
+                "sign_off_sheet",
+            ],
+        )
+
+    @classmethod
+    def _existing_references(cls, entries):
+        def existing_ids(model, ids):
+            return set(
+                model.objects.filter(id__in=set(ids) - {None}).values_list(
+                    "id", flat=True
+                )
+            )
+
+        approval_ids = existing_ids(Approval, [e.approval_id for e in entries])
+        approval_type_ids = existing_ids(
+            ApprovalType, [e.approval_type_id for e in entries]
+        )
+        proposal_ids = existing_ids(Proposal, [e.current_proposal_id for e in entries])
+        document_fields = [
+            "licence_document_id",
+            "cover_letter_document_id",
+            "sign_off_sheet_id",
+        ]
+        document_ids = existing_ids(
+            ApprovalDocument,
+            [getattr(e, field) for e in entries for field in document_fields],
+        )
+
+        entries = [e for e in entries if e.approval_id in approval_ids]
+        for entry in entries:
+            if entry.approval_type_id not in approval_type_ids:
+                entry.approval_type_id = None
+            if entry.current_proposal_id not in proposal_ids:
+                entry.current_proposal_id = None
+            for field in document_fields:
+                if getattr(entry, field) not in document_ids:
+                    setattr(entry, field, None)
+
+        return entries
+
+
+def dates_before(date, delta):
+    """Returns the dates `d` for which `d + delta == date`, e.g. the 28th and 29th of
+    February 2024 for the 28th of February 2025 and a delta of 12 months"""
+
+    earliest = date - delta - relativedelta(days=3)
+    candidates = [earliest + relativedelta(days=i) for i in range(7)]
+    return {d for d in candidates if d + delta == date}
+
+
+class ReminderEvent(models.Model):
+    """
+    The dates reminders may be due for an approval, so that the daily reminder
+    commands only check the approvals that have a reminder event today instead of
+    computing the invoicing schedule of every current approval. The commands still
+    check every condition of a reminder (e.g. whether the custom CPI has already
+    been entered) for the approvals they select.
+
+    The events of an approval are refreshed whenever the approval or its invoicing
+    details are saved (see `ReminderEventListener`).
+    """
+
+    REMINDER_TYPE_CROWN_LAND_RENT_REVIEW = "crown_land_rent_review"
+    REMINDER_TYPE_CUSTOM_CPI_ENTRY = "custom_cpi_entry"
+    REMINDER_TYPE_GTO_ADVANCE_TURNOVER_ENTRY = "gto_advance_turnover_entry"
+
+    REMINDER_TYPE_CHOICES = (
+        (REMINDER_TYPE_CROWN_LAND_RENT_REVIEW, "Crown Land Rent Review"),
+        (REMINDER_TYPE_CUSTOM_CPI_ENTRY, "Custom CPI Entry"),
+        (REMINDER_TYPE_GTO_ADVANCE_TURNOVER_ENTRY, "Gross Turnover Entry (Advance)"),
+    )
+
+    # Months before a crown land rent review the reminders are sent
+    CROWN_LAND_RENT_REVIEW_REMINDER_MONTHS = (12, 6, 0)
+
+    approval = models.ForeignKey(
+        Approval, related_name="reminder_events", on_delete=models.CASCADE
+    )
+    reminder_type = models.CharField(max_length=40, choices=REMINDER_TYPE_CHOICES)
+    date = models.DateField()
+
+    class Meta:
+        app_label = "leaseslicensing"
+        ordering = ["date", "approval"]
+        unique_together = ("approval", "reminder_type", "date")
+        indexes = [models.Index(fields=["date", "reminder_type"])]
+
+    def __str__(self):
+        return f"{self.get_reminder_type_display()} reminder for {self.approval} on {self.date}"
+
+    @classmethod
+    def reminder_dates(cls, approval):
+        """Returns a dict of reminder types to the dates a reminder may be due"""
+
+        invoicing_details = (
+            approval.current_proposal.invoicing_details
+            if approval.current_proposal
+            else None
+        )
+        if not invoicing_details or not invoicing_details.charge_method:
+            return {}
+
+        reminder_dates = {}
+        charge_method_key = invoicing_details.charge_method.key
+        if (
+            charge_method_key
+            in settings.CHARGE_METHODS_REQUIRING_CROWN_LAND_RENT_REVIEW
+        ):
+            reminder_dates[cls.REMINDER_TYPE_CROWN_LAND_RENT_REVIEW] = {
+                d
+                for review_date in approval.crown_land_rent_review_dates
+                for months in cls.CROWN_LAND_RENT_REVIEW_REMINDER_MONTHS
+                for d in dates_before(review_date, relativedelta(months=months))
+            }
+
+        days_prior = None
+        if charge_method_key == settings.CHARGE_METHOD_BASE_FEE_PLUS_ANNUAL_CPI_CUSTOM:
+            reminder_type = cls.REMINDER_TYPE_CUSTOM_CPI_ENTRY
+            days_prior = settings.CUSTOM_CPI_REMINDER_DAYS_PRIOR_TO_INVOICE_ISSUE_DATE
+        elif (
+            charge_method_key
+            == settings.CHARGE_METHOD_PERCENTAGE_OF_GROSS_TURNOVER_IN_ADVANCE
+        ):
+            reminder_type = cls.REMINDER_TYPE_GTO_ADVANCE_TURNOVER_ENTRY
+            days_prior = settings.PERCENTAGE_OF_GROSS_TURNOVER_REMINDERS_DAYS_PRIOR
+        if days_prior:
+            # The reminders are due a number of days before the (original) issue
+            # date of an invoice
+            reminder_dates[reminder_type] = {
+                issue_date - relativedelta(days=days)
+                for issue_date in invoicing_details.original_issue_dates
+                for days in days_prior
+            }
+
+        return reminder_dates
+
+    @classmethod
+    def refresh(cls, approvals):
+        """Replaces the reminder events of the approvals"""
+
+        events = []
+        for approval in approvals:
+            try:
+                reminder_dates = cls.reminder_dates(approval)
+            except Exception as e:
+                # E.g. an approval without a start or expiry date
+                logger.exception(
+                    f"Failed to compute the reminder dates of Approval {approval}: {e}"
+                )
+                continue
+            for reminder_type, dates in reminder_dates.items():
+                events += [
+                    cls(approval=approval, reminder_type=reminder_type, date=d)
+                    for d in dates
+                ]
+
+        with transaction.atomic():
+            cls.objects.filter(approval__in=[a.id for a in approvals]).delete()
+            cls.objects.bulk_create(events)
+
+        logger.debug(
+            f"Refreshed {len(events)} reminder events of {len(approvals)} Approvals"
+        )
+        return events
+
+    @classmethod
+    def refresh_approval(cls, approval_id):
+        """Refreshes the reminder events of an approval if it still exists"""
+
+        approval = (
+            Approval.objects.select_related(
+                "current_proposal__invoicing_details__charge_method"
+            )
+            .filter(id=approval_id)
+            .first()
+        )
+        if approval is not None:
+            cls.refresh([approval])
+
+    @classmethod
+    def due_approvals(cls, reminder_type, date=None):
+        """Returns the approvals that have a reminder event of the type on the date (by default today)"""
+
+        if date is None:
+            date = timezone.localtime(timezone.now()).date()
+        return Approval.objects.filter(
+            id__in=cls.objects.filter(reminder_type=reminder_type, date=date).values(
+                "approval_id"
+            )
+        )
+
+
 class ApprovalLogEntry(CommunicationsLogEntry):
     approval = models.ForeignKey(
         Approval, related_name="comms_logs", on_delete=models.CASCADE
@@ -10,6 +10,7 @@ from rest_framework import serializers
 from leaseslicensing.components.approvals.models import (
     Approval,
     ApprovalDocument,
+    ApprovalHistory,
     ApprovalLogEntry,
     ApprovalTransfer,
     ApprovalTransferApplicant,
@@ -22,6 +23,7 @@ from leaseslicensing.components.competitive_processes.utils import (
 from leaseslicensing.components.invoicing.serializers import InvoicingDetailsSerializer
 from leaseslicensing.components.main.serializers import (
     CommunicationLogEntrySerializer,
+    EmailUserPrefetchListSerializer,
     EmailUserSerializer,
 )
 from leaseslicensing.components.main.utils import get_secure_file_url
@@ -37,6 +39,7 @@ from leaseslicensing.components.proposals.utils import (
 )
 from leaseslicensing.components.users.serializers import UserSerializer
 from leaseslicensing.helpers import is_approver, is_assessor, is_finance_officer
+from leaseslicensing.ledger_api_utils import retrieve_email_user
 
 logger = logging.getLogger(__name__)
 
@@ -279,6 +282,8 @@ class ApprovalSerializer(serializers.ModelSerializer):
             "renewed_from_id",
             "renewed_from",
         )
+        list_serializer_class = EmailUserPrefetchListSerializer
+        email_user_fields = ("submitter",)
         # the serverSide functionality of datatables is such that only columns that have
         # field 'data' defined are requested from the serializer. We
         # also require the following additional fields for some of the mRender functions
@@ -333,7 +338,7 @@ class ApprovalSerializer(serializers.ModelSerializer):
     def get_submitter(self, obj):
         if not obj.submitter:
             return None
-        user = EmailUser.objects.get(id=obj.submitter)
+        user = retrieve_email_user(obj.submitter)
         return EmailUserSerializer(user).data
 
     def get_linked_applications(self, obj):
@@ -426,8 +431,8 @@ class ApprovalSerializer(serializers.ModelSerializer):
         approved_by_id = proposed_issuance_approval.get("approved_by", None)
         if not approved_by_id:
             return "Approver not assigned"
-        user = EmailUser.objects.get(id=approved_by_id)
-        return user.get_full_name()
+        user = retrieve_email_user(approved_by_id)
+        return user.get_full_name() if user else ""
 
     def get_approval_type__type(self, obj):
         if obj.approval_type.type is None:
@@ -513,22 +518,23 @@ class ApprovalDocumentHistorySerializer(serializers.ModelSerializer):
 
 
 class ApprovalHistorySerializer(serializers.ModelSerializer):
-    revision_id = serializers.SerializerMethodField()
+    id = serializers.IntegerField(source="approval_id", read_only=True)
+    revision_id = serializers.IntegerField(read_only=True)
     lodgement_number = serializers.SerializerMethodField()
     licence_document = serializers.SerializerMethodField()
     sign_off_sheet = serializers.SerializerMethodField()
     cover_letter = serializers.SerializerMethodField()
     application = serializers.SerializerMethodField()
     approval_type = serializers.SerializerMethodField()
-    holder = serializers.SerializerMethodField()
-    status = serializers.SerializerMethodField()
+    holder = serializers.CharField(read_only=True)
+    status = serializers.CharField(source="get_status_display", read_only=True)
     start_date_str = serializers.SerializerMethodField()
     expiry_date_str = serializers.SerializerMethodField()
     reason = serializers.SerializerMethodField()
     application_detail_url = serializers.SerializerMethodField()
 
     class Meta:
-        model = Approval
+        model = ApprovalHistory
         fields = (
             "id",
             "revision_id",
@@ -546,65 +552,38 @@ class ApprovalHistorySerializer(serializers.ModelSerializer):
             "application_detail_url",
         )
 
-    def get_revision_id(self, obj):
-        return obj.revision_id
-
     def get_lodgement_number(self, obj):
-        return f"{obj.lodgement_number}-{obj.lodgement_sequence}"
+        return f"{obj.approval.lodgement_number}-{obj.lodgement_sequence}"
 
-    def get_licence_document(self, obj):
-        try:
-            document = obj.licence_document
-        except ApprovalDocument.DoesNotExist:
+    def get_document(self, obj, document):
+        if not document or not document._file:
             return None
-        else:
-            if not document or not document._file:
-                return None
-            return ApprovalDocumentHistorySerializer(
-                document, context={"revision_id": obj.revision_id}
-            ).data
+        return ApprovalDocumentHistorySerializer(
+            document, context={"revision_id": obj.revision_id}
+        ).data
+
+    def get_licence_document(self, obj):
+        return self.get_document(obj, obj.licence_document)
 
     def get_sign_off_sheet(self, obj):
-        try:
-            document = obj.sign_off_sheet
-        except ApprovalDocument.DoesNotExist:
-            return None
-        else:
-            if not document or not document._file:
-                return None
-            return ApprovalDocumentHistorySerializer(
-                document, context={"revision_id": obj.revision_id}
-            ).data
+        return self.get_document(obj, obj.sign_off_sheet)
 
     def get_cover_letter(self, obj):
-        try:
-            document = obj.cover_letter_document
-        except ApprovalDocument.DoesNotExist:
-            return None
-        else:
-            if not document or not document._file:
-                return None
-            return ApprovalDocumentHistorySerializer(
-                document, context={"revision_id": obj.revision_id}
-            ).data
+        return self.get_document(obj, obj.cover_letter_document)
 
     def get_application(self, obj):
+        if not obj.current_proposal:
+            return None
         return obj.current_proposal.lodgement_number
 
     def get_approval_type(self, obj):
         return ApprovalTypeSerializer(obj.approval_type).data
 
-    def get_holder(self, obj):
-        return obj.holder
-
-    def get_status(self, obj):
-        return obj.get_status_display()
-
     def get_start_date_str(self, obj):
-        return obj.start_date.strftime("%d/%m/%Y")
+        return obj.start_date.strftime("%d/%m/%Y") if obj.start_date else ""
 
     def get_expiry_date_str(self, obj):
-        return obj.expiry_date.strftime("%d/%m/%Y")
+        return obj.expiry_date.strftime("%d/%m/%Y") if obj.expiry_date else ""
 
     def get_reason(self, obj):
         if obj.status == Approval.APPROVAL_STATUS_CURRENT:
@@ -618,8 +597,10 @@ class ApprovalHistorySerializer(serializers.ModelSerializer):
         return obj.get_status_display()
 
     def get_application_detail_url(self, obj):
+        if not obj.current_proposal_id:
+            return None
         return reverse(
-            "internal-proposal-detail", kwargs={"pk": obj.current_proposal.id}
+            "internal-proposal-detail", kwargs={"pk": obj.current_proposal_id}
         )
 
 
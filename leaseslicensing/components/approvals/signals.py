@@ -0,0 +1,53 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from reversion.signals import post_revision_commit
+
+from leaseslicensing.components.approvals.models import (
+    Approval,
+    ApprovalHistory,
+    ReminderEvent,
+)
+from leaseslicensing.components.invoicing.models import InvoicingDetails
+
+
+class ApprovalHistoryListener:
+    """
+    Event listener for reversion revisions.
+    Records the approval history of commented revisions (the revisions of
+    concluding saves, see `RevisionedMixin.save`).
+    """
+
+    @staticmethod
+    @receiver(post_revision_commit)
+    def _post_revision_commit(sender, revision, versions, **kwargs):
+        if not revision.comment:
+            return
+        ApprovalHistory.record_versions(versions)
+
+
+class ReminderEventListener:
+    """
+    Event listener for Approval and InvoicingDetails.
+    Refreshes the reminder events of an approval once the transaction that saved
+    the approval or its invoicing details has been committed.
+    """
+
+    @staticmethod
+    @receiver(post_save, sender=Approval)
+    def _post_save_approval(sender, instance, raw=False, **kwargs):
+        if raw:
+            return
+        approval_id = instance.id
+        transaction.on_commit(lambda: ReminderEvent.refresh_approval(approval_id))
+
+    @staticmethod
+    @receiver(post_save, sender=InvoicingDetails)
+    def _post_save_invoicing_details(sender, instance, raw=False, **kwargs):
+        if raw:
+            return
+        approval = instance.approval
+        if approval is None:
+            return
+        approval_id = approval.id
+        transaction.on_commit(lambda: ReminderEvent.refresh_approval(approval_id))
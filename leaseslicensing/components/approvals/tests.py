@@ -0,0 +1,246 @@
+from datetime import date
+from unittest import mock
+
+import reversion
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from reversion.models import Version
+
+from leaseslicensing.components.approvals.models import (
+    Approval,
+    ApprovalDocument,
+    ApprovalHistory,
+    ReminderEvent,
+    dates_before,
+)
+
+
+class ReminderDatesTestCase(SimpleTestCase):
+    def test_dates_before(self):
+        self.assertEqual(
+            dates_before(date(2025, 6, 15), relativedelta(months=6)),
+            {date(2024, 12, 15)},
+        )
+        # Both the 28th and 29th of February 2024 are 12 months before
+        self.assertEqual(
+            dates_before(date(2025, 2, 28), relativedelta(months=12)),
+            {date(2024, 2, 28), date(2024, 2, 29)},
+        )
+        # No date is a month before the 30th of March
+        self.assertEqual(
+            dates_before(date(2023, 3, 30), relativedelta(months=1)), set()
+        )
+
+    def approval(self, charge_method_key, review_dates=(), issue_dates=()):
+        approval = mock.Mock(crown_land_rent_review_dates=list(review_dates))
+        invoicing_details = approval.current_proposal.invoicing_details
+        invoicing_details.charge_method.key = charge_method_key
+        invoicing_details.original_issue_dates = list(issue_dates)
+        return approval
+
+    @override_settings(CUSTOM_CPI_REMINDER_DAYS_PRIOR_TO_INVOICE_ISSUE_DATE=(30, 15))
+    def test_reminder_dates(self):
+        approval = self.approval(
+            settings.CHARGE_METHOD_BASE_FEE_PLUS_ANNUAL_CPI_CUSTOM,
+            review_dates=[date(2029, 7, 1)],
+            issue_dates=[date(2025, 7, 1)],
+        )
+        self.assertEqual(
+            ReminderEvent.reminder_dates(approval),
+            {
+                ReminderEvent.REMINDER_TYPE_CROWN_LAND_RENT_REVIEW: {
+                    date(2028, 7, 1),
+                    date(2029, 1, 1),
+                    date(2029, 7, 1),
+                },
+                ReminderEvent.REMINDER_TYPE_CUSTOM_CPI_ENTRY: {
+                    date(2025, 6, 1),
+                    date(2025, 6, 16),
+                },
+            },
+        )
+
+    def test_no_reminder_dates_without_a_charge_method(self):
+        approval = self.approval(None)
+        approval.current_proposal.invoicing_details.charge_method = None
+        self.assertEqual(ReminderEvent.reminder_dates(approval), {})
+
+        approval.current_proposal = None
+        self.assertEqual(ReminderEvent.reminder_dates(approval), {})
+
+
+class ApprovalHistoryTestCase(TestCase):
+    def setUp(self):
+        self.approval = Approval.objects.create(
+            issue_date=timezone.now(),
+            start_date=date(2024, 1, 1),
+            expiry_date=date(2029, 1, 1),
+        )
+
+    def save_in_commented_revision(self, comment, **fields):
+        # Unlike `save(version_comment=...)`, doesn't increment the lodgement sequence
+        with reversion.create_revision():
+            reversion.set_comment(comment)
+            for field, value in fields.items():
+                setattr(self.approval, field, value)
+            self.approval.save()
+
+    def approval_versions(self):
+        return Version.objects.get_for_object(self.approval).order_by("revision_id")
+
+    def test_commented_revisions_are_recorded(self):
+        # Uncommented revisions (e.g. of `Approval.objects.create`) are not recorded
+        self.assertFalse(ApprovalHistory.objects.exists())
+
+        self.approval.save(version_comment="Approved")
+        entry = ApprovalHistory.objects.get(approval=self.approval)
+        self.assertEqual(entry.lodgement_sequence, 1)
+        self.assertEqual(entry.status, Approval.APPROVAL_STATUS_CURRENT)
+        self.assertEqual(entry.revision_id, self.approval_versions().last().revision_id)
+
+        self.approval.save()
+        self.assertEqual(ApprovalHistory.objects.get(approval=self.approval), entry)
+
+    def test_lodgement_sequence_is_replaced_by_latest_revision(self):
+        self.approval.save(version_comment="Approved")
+        self.save_in_commented_revision(
+            "Suspended", status=Approval.APPROVAL_STATUS_SUSPENDED
+        )
+
+        entry = ApprovalHistory.objects.get(approval=self.approval)
+        self.assertEqual(entry.lodgement_sequence, 1)
+        self.assertEqual(entry.status, Approval.APPROVAL_STATUS_SUSPENDED)
+
+        # Recording in the order of the revisions keeps the most recent revision
+        ApprovalHistory.objects.all().delete()
+        commented = self.approval_versions().exclude(revision__comment="")
+        recorded = ApprovalHistory.record_versions(list(commented))
+        self.assertEqual(len(recorded), 1)
+        self.assertEqual(
+            ApprovalHistory.objects.get(approval=self.approval).revision_id,
+            commented.last().revision_id,
+        )
+
+    def test_deleted_references_are_not_recorded(self):
+        document = ApprovalDocument.objects.create(
+            approval=self.approval, name="licence.pdf"
+        )
+        self.approval.licence_document = document
+        self.approval.save(version_comment="Approved")
+        versions = list(self.approval_versions().exclude(revision__comment=""))
+        ApprovalHistory.objects.all().delete()
+        document.delete()
+
+        entry = ApprovalHistory.record_versions(versions)[0]
+        self.assertIsNone(entry.licence_document_id)
+        self.assertEqual(entry.approval_id, self.approval.id)
+
+        # Nor are the versions of deleted approvals
+        ApprovalHistory.objects.all().delete()
+        Approval.objects.filter(id=self.approval.id).delete()
+        self.assertEqual(ApprovalHistory.record_versions(versions), [])
+
+
+class ReminderEventTestCase(TestCase):
+    def setUp(self):
+        self.approvals = [
+            Approval.objects.create(
+                issue_date=timezone.now(),
+                start_date=date(2024, 1, 1),
+                expiry_date=date(2029, 1, 1),
+            )
+            for _ in range(2)
+        ]
+
+    @mock.patch.object(ReminderEvent, "reminder_dates")
+    def test_refresh_replaces_the_events(self, reminder_dates):
+        cpi = ReminderEvent.REMINDER_TYPE_CUSTOM_CPI_ENTRY
+        reminder_dates.return_value = {cpi: {date(2025, 6, 1), date(2025, 6, 16)}}
+        ReminderEvent.refresh(self.approvals)
+        self.assertEqual(ReminderEvent.objects.count(), 4)
+
+        reminder_dates.return_value = {cpi: {date(2025, 6, 16)}}
+        ReminderEvent.refresh(self.approvals[:1])
+        self.assertEqual(
+            list(
+                self.approvals[0].reminder_events.values_list("reminder_type", "date")
+            ),
+            [(cpi, date(2025, 6, 16))],
+        )
+        self.assertEqual(self.approvals[1].reminder_events.count(), 2)
+
+    @mock.patch.object(ReminderEvent, "reminder_dates")
+    def test_refresh_skips_failing_approvals(self, reminder_dates):
+        gto = ReminderEvent.REMINDER_TYPE_GTO_ADVANCE_TURNOVER_ENTRY
+        reminder_dates.side_effect = [TypeError, {gto: {date(2025, 6, 1)}}]
+
+        events = ReminderEvent.refresh(self.approvals)
+        self.assertEqual([event.approval for event in events], self.approvals[1:])
+
+    def test_due_approvals(self):
+        cpi = ReminderEvent.REMINDER_TYPE_CUSTOM_CPI_ENTRY
+        review = ReminderEvent.REMINDER_TYPE_CROWN_LAND_RENT_REVIEW
+        ReminderEvent.objects.bulk_create(
+            [
+                ReminderEvent(
+                    approval=self.approvals[0], reminder_type=cpi, date=date(2025, 6, 1)
+                ),
+                ReminderEvent(
+                    approval=self.approvals[1],
+                    reminder_type=review,
+                    date=date(2025, 6, 1),
+                ),
+            ]
+        )
+
+        self.assertEqual(
+            list(ReminderEvent.due_approvals(cpi, date(2025, 6, 1))),
+            self.approvals[:1],
+        )
+        self.assertFalse(ReminderEvent.due_approvals(cpi, date(2025, 6, 2)).exists())
+
+
+class BulkTransitionTestCase(TestCase):
+    def setUp(self):
+        self.approvals = [
+            Approval.objects.create(
+                issue_date=timezone.now(),
+                start_date=date(2024, 1, 1),
+                expiry_date=date(2029, 1, 1),
+            )
+            for _ in range(2)
+        ]
+
+    def test_failing_hooks_keep_the_status(self):
+        failing = self.approvals[0]
+
+        def hook(approval):
+            approval.documents.create(name="discarded.pdf")
+            if approval == failing:
+                raise ValueError()
+
+        email = mock.Mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            transitioned, errors = Approval.bulk_transition(
+                Approval.objects.filter(id__in=[a.id for a in self.approvals]),
+                Approval.APPROVAL_STATUS_CANCELLED,
+                mock.Mock(id=1),
+                "Cancel approval {}",
+                "Cancel approval {}",
+                hooks=[hook],
+                emails=[email],
+            )
+
+        self.assertEqual(transitioned, self.approvals[1:])
+        self.assertEqual(len(errors), 1)
+        email.assert_called_once_with(self.approvals[1])
+        # The changes of the failing approval's hooks are rolled back
+        failing.refresh_from_db()
+        self.assertEqual(failing.status, Approval.APPROVAL_STATUS_CURRENT)
+        self.assertFalse(failing.documents.exists())
+        self.assertEqual(
+            Approval.objects.get(id=self.approvals[1].id).status,
+            Approval.APPROVAL_STATUS_CANCELLED,
+        )
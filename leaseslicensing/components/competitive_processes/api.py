@@ -4,12 +4,11 @@ from datetime import datetime
 from django.conf import settings
 from django.db import transaction
 from django.db.models import CharField, F, Q, Value
-from rest_framework import views
+from rest_framework import status, views
 from rest_framework.decorators import action as detail_route
 from rest_framework.decorators import renderer_classes
 from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-from rest_framework_datatables.pagination import DatatablesPageNumberPagination
 from rest_framework_datatables.renderers import DatatablesRenderer
 
 from leaseslicensing.components.competitive_processes.email import (
@@ -31,17 +30,22 @@ from leaseslicensing.components.main.decorators import (
     logging_action,
 )
 from leaseslicensing.components.main.filters import LedgerDatatablesFilterBackend
+from leaseslicensing.components.main.pagination import (
+    DatatablesPagination,
+    get_cached_total_count,
+)
 from leaseslicensing.components.main.process_document import process_generic_document
 from leaseslicensing.components.main.serializers import RelatedItemSerializer
 from leaseslicensing.components.main.utils import (
+    import_map_files,
     populate_gis_data,
     save_geometry,
     save_groups_data,
     save_site_name,
-    validate_map_files,
 )
 from leaseslicensing.components.proposals.models import Proposal
 from leaseslicensing.helpers import is_internal
+from leaseslicensing.jobs import start_job
 from leaseslicensing.permissions import IsCompetitiveProcessEditor
 
 logger = logging.getLogger("leaseslicensing")
@@ -49,7 +53,7 @@ logger = logging.getLogger("leaseslicensing")
 
 class CompetitiveProcessFilterBackend(LedgerDatatablesFilterBackend):
     def filter_queryset(self, request, queryset, view):
-        total_count = queryset.count()
+        total_count = get_cached_total_count(queryset)
         filter_status = (
             request.GET.get("filter_status")
             if request.GET.get("filter_status") != "all"
@@ -195,14 +199,22 @@ class CompetitiveProcessViewSet(UserActionLoggingViewset, Select2ListMixin):
     @basic_exception_handler
     def validate_map_files(self, request, *args, **kwargs):
         instance = self.get_object()
-        valid_geometry_saved = validate_map_files(
-            request, instance, "competitive_process"
-        )
-        instance.save()
-        if valid_geometry_saved:
-            populate_gis_data(
-                instance, "competitive_process_geometries", "competitive_process"
+        if request.data.get("background", None) in [True, "true"]:
+            # Large shapefiles can be imported in the background, the job can be
+            # polled from the background job api
+            job_id = start_job(
+                "validate_map_files",
+                request.user.id,
+                import_map_files,
+                request,
+                instance,
+                "competitive_process_geometries",
+                "competitive_process",
             )
+            return Response({"job_id": job_id}, status=status.HTTP_202_ACCEPTED)
+        import_map_files(
+            request, instance, "competitive_process_geometries", "competitive_process"
+        )
         serializer = self.get_serializer(instance)
         logger.debug(f"validate_map_files response: {serializer.data}")
         return Response(serializer.data)
@@ -323,7 +335,7 @@ class CompetitiveProcessViewSet(UserActionLoggingViewset, Select2ListMixin):
         methods=["GET"],
         detail=True,
         renderer_classes=[DatatablesRenderer],
-        pagination_class=DatatablesPageNumberPagination,
+        pagination_class=DatatablesPagination,
     )
     def related_items(self, request, *args, **kwargs):
         """Uses union to combine a queryset of multiple different model types
@@ -5,13 +5,15 @@ from django.conf import settings
 from django.core.mail import EmailMessage, EmailMultiAlternatives
 from django.urls import reverse
 from django.utils.encoding import smart_str
-from ledger_api_client.managed_models import SystemGroup
 
 from leaseslicensing.components.emails.emails import TemplateEmailBase
 from leaseslicensing.components.organisations.utils import (
     get_admin_emails_for_organisation,
 )
-from leaseslicensing.helpers import convert_internal_url_to_external_url
+from leaseslicensing.helpers import (
+    convert_internal_url_to_external_url,
+    user_ids_in_group,
+)
 from leaseslicensing.ledger_api_utils import retrieve_email_user
 
 logger = logging.getLogger(__name__)
@@ -77,8 +79,7 @@ def send_competitive_process_create_notification(
     # Once a competitive process is created (either as result of a registration of interest proposal or from
     # the competitive process dashboard page) the assessor group for competitive processes will receive a
     # notification email from the system, including the link to access the competitive process.
-    group = SystemGroup.objects.get(name=settings.GROUP_COMPETITIVE_PROCESS_EDITOR)
-    ids = group.get_system_group_member_ids()
+    ids = user_ids_in_group(settings.GROUP_COMPETITIVE_PROCESS_EDITOR)
     logger.debug(f"Sending email to {ids}")
     email_user_emails = [retrieve_email_user(id).email for id in ids]
     msg = email.send(email_user_emails, cc=cc_emails, bcc=bcc_emails, context=context)
@@ -4,7 +4,6 @@ from django.contrib.gis.db.models.fields import PolygonField
 from django.core.exceptions import ValidationError
 from django.db import models, transaction
 from django.db.models import Q
-from ledger_api_client.managed_models import SystemGroup
 
 from leaseslicensing import settings
 from leaseslicensing.components.competitive_processes.email import (
@@ -33,8 +32,12 @@ from leaseslicensing.components.tenure.models import (
     Tenure,
     Vesting,
 )
-from leaseslicensing.helpers import belongs_to_by_user_id, is_internal
-from leaseslicensing.ledger_api_utils import retrieve_email_user
+from leaseslicensing.helpers import (
+    belongs_to_by_user_id,
+    is_internal,
+    user_ids_in_group,
+)
+from leaseslicensing.ledger_api_utils import prefetch_email_users, retrieve_email_user
 
 logger = logging.getLogger("leaseslicensing")
 
@@ -338,26 +341,15 @@ class CompetitiveProcess(LicensingModelVersioned):
 
     @property
     def allowed_editors(self):
-        group = None
-        if self.status in [
+        if self.status not in [
             CompetitiveProcess.STATUS_IN_PROGRESS,
             CompetitiveProcess.STATUS_IN_PROGRESS_UNLOCKED,
         ]:
-            group = SystemGroup.objects.get(
-                name=settings.GROUP_COMPETITIVE_PROCESS_EDITOR
-            )
+            return []
 
-        users = (
-            list(
-                map(
-                    lambda id: retrieve_email_user(id),
-                    group.get_system_group_member_ids(),
-                )
-            )
-            if group
-            else []
-        )
-        return users
+        ids = user_ids_in_group(settings.GROUP_COMPETITIVE_PROCESS_EDITOR)
+        prefetch_email_users(ids)
+        return [retrieve_email_user(id) for id in ids]
 
     def winner_proposal(self, winner_id=None):
         """
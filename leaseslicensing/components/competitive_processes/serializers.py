@@ -1,7 +1,6 @@
 import logging
 
 from django.urls import reverse
-from ledger_api_client.managed_models import SystemGroup
 from rest_framework import serializers
 from rest_framework_gis.serializers import GeoFeatureModelSerializer
 
@@ -36,6 +35,7 @@ from leaseslicensing.components.proposals.serializers import (
 from leaseslicensing.components.tenure.models import Group
 from leaseslicensing.components.tenure.serializers import GroupSerializer
 from leaseslicensing.components.users.serializers import UserSerializerSimple
+from leaseslicensing.helpers import user_group_names
 from leaseslicensing.ledger_api_utils import retrieve_email_user
 from leaseslicensing.settings import GROUP_NAME_CHOICES
 
@@ -588,14 +588,12 @@ class CompetitiveProcessSerializer(CompetitiveProcessSerializerBase):
 
     def get_accessing_user_roles(self, obj):
         request = self.context.get("request")
-        accessing_user = request.user
         roles = []
 
+        group_names = user_group_names(request)
         for choice in GROUP_NAME_CHOICES:
-            group = SystemGroup.objects.get(name=choice[0])
-            ids = group.get_system_group_member_ids()
-            if accessing_user.id in ids:
-                roles.append(group.name)
+            if choice[0] in group_names:
+                roles.append(choice[0])
 
         return roles
 
@@ -13,7 +13,6 @@ from rest_framework.decorators import action as list_route
 from rest_framework.decorators import renderer_classes
 from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-from rest_framework_datatables.pagination import DatatablesPageNumberPagination
 
 from leaseslicensing.components.compliances.models import (
     Compliance,
@@ -50,6 +49,10 @@ from leaseslicensing.components.main.models import (
     ApplicationType,
     upload_protected_files_storage,
 )
+from leaseslicensing.components.main.pagination import (
+    DatatablesPagination,
+    get_cached_total_count,
+)
 from leaseslicensing.components.organisations.utils import get_organisation_ids_for_user
 from leaseslicensing.components.proposals.api import ProposalRenderer
 from leaseslicensing.components.proposals.serializers import SendReferralSerializer
@@ -98,7 +101,7 @@ class ComplianceFilterBackend(LedgerDatatablesFilterBackend):
     """
 
     def filter_queryset(self, request, queryset, view):
-        total_count = queryset.count()
+        total_count = get_cached_total_count(queryset)
 
         filter_due_date_from = request.GET.get("filter_due_date_from")
         filter_due_date_to = request.GET.get("filter_due_date_to")
@@ -143,7 +146,7 @@ class ComplianceFilterBackend(LedgerDatatablesFilterBackend):
 
 class CompliancePaginatedViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = (ComplianceFilterBackend,)
-    pagination_class = DatatablesPageNumberPagination
+    pagination_class = DatatablesPagination
     renderer_classes = (ProposalRenderer,)
     page_size = 10
     queryset = Compliance.objects.all()
@@ -210,8 +213,7 @@ class CompliancePaginatedViewSet(viewsets.ReadOnlyModelViewSet):
 
         qs = self.filter_queryset(qs)
 
-        self.paginator.page_size = qs.count()
-        result_page = self.paginator.paginate_queryset(qs, request)
+        result_page = self.paginator.paginate_queryset(qs, request, view=self)
         serializer = ComplianceSerializer(
             result_page, context={"request": request}, many=True
         )
@@ -232,8 +234,7 @@ class CompliancePaginatedViewSet(viewsets.ReadOnlyModelViewSet):
         qs = self.get_queryset()
         qs = self.filter_queryset(qs)
 
-        self.paginator.page_size = qs.count()
-        result_page = self.paginator.paginate_queryset(qs, request)
+        result_page = self.paginator.paginate_queryset(qs, request, view=self)
         serializer = ComplianceSerializer(
             result_page, context={"request": request}, many=True
         )
@@ -257,7 +258,6 @@ class CompliancePaginatedViewSet(viewsets.ReadOnlyModelViewSet):
         qs = self.get_queryset().exclude(
             processing_status=Compliance.PROCESSING_STATUS_FUTURE
         )
-        qs = self.filter_queryset(qs)
 
         # on the internal organisations dashboard, filter the Proposal/Approval/Compliance datatables
         # by applicant/organisation
@@ -267,8 +267,11 @@ class CompliancePaginatedViewSet(viewsets.ReadOnlyModelViewSet):
         submitter_id = request.GET.get("submitter_id", None)
         if submitter_id:
             qs = qs.filter(proposal__submitter_id=submitter_id)
-        self.paginator.page_size = qs.count()
-        result_page = self.paginator.paginate_queryset(qs, request)
+
+        # Filter last so the counts stored on the view match the paginated queryset
+        qs = self.filter_queryset(qs)
+
+        result_page = self.paginator.paginate_queryset(qs, request, view=self)
         serializer = ComplianceSerializer(
             result_page, context={"request": request}, many=True
         )
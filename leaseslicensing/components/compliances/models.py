@@ -6,6 +6,7 @@ from django.core.exceptions import ValidationError
 from django.db import models, transaction
 from django.utils import timezone
 from ledger_api_client.ledger_models import EmailUserRO as EmailUser
+from reversion import revisions
 
 from leaseslicensing.components.compliances.email import (
     send_amendment_email_notification,
@@ -27,6 +28,7 @@ from leaseslicensing.components.main.models import (
     Document,
     LicensingModelVersioned,
     RevisionedMixin,
+    SearchIndexEntry,
     SecureFileField,
     UserAction,
 )
@@ -241,6 +243,150 @@ class Compliance(LicensingModelVersioned):
                 compliance=self,
             )
 
+    @classmethod
+    def bulk_transition(cls, queryset, processing_status, customer_status, user):
+        """
+        Changes the statuses of all compliances in `queryset` with a single update
+        query, records them in a single revision and logs a status change user
+        action for each of them.
+
+        Returns:
+            list: The transitioned compliances
+        """
+
+        with transaction.atomic():
+            compliances = list(queryset.select_for_update(of=("self",)))
+            if not compliances:
+                return []
+
+            ids = [c.id for c in compliances]
+            cls.objects.filter(id__in=ids).update(
+                processing_status=processing_status, customer_status=customer_status
+            )
+            # `save` creates a missing assessment, which `update` does not
+            ComplianceAssessment.objects.bulk_create(
+                [
+                    ComplianceAssessment(compliance_id=compliance_id)
+                    for compliance_id in cls.objects.filter(
+                        id__in=ids, assessment__isnull=True
+                    ).values_list("id", flat=True)
+                ]
+            )
+
+            with revisions.create_revision():
+                for compliance in compliances:
+                    compliance.processing_status = processing_status
+                    compliance.customer_status = customer_status
+                    revisions.add_to_revision(compliance)
+
+            ComplianceUserAction.log_actions(
+                [
+                    ComplianceUserAction(
+                        compliance=compliance,
+                        who=user.id,
+                        what=ComplianceUserAction.ACTION_STATUS_CHANGE.format(
+                            compliance.id
+                        ),
+                    )
+                    for compliance in compliances
+                ]
+            )
+
+        logger.info(
+            f"Changed the status of {len(compliances)} Compliances to {processing_status}"
+        )
+        return compliances
+
+    @classmethod
+    def bulk_generate(cls, proposal, approval, due_dates, user_id):
+        """
+        Creates the future compliances of requirements that don't exist yet with a
+        fixed number of queries: one to find the existing compliances and one each
+        to insert the compliances, their lodgement numbers, assessments, versions
+        and create user actions.
+
+        Args:
+            proposal (Proposal): The proposal of the new compliances
+            approval (Approval): The approval of the new compliances
+            due_dates (dict): Maps requirements to the due dates of their compliances
+                (see `ProposalRequirement.compliance_due_dates`)
+            user_id (int): The id of the user who creates the compliances
+
+        Returns:
+            list: The created compliances
+        """
+
+        existing = set(
+            cls.objects.filter(
+                requirement__in=list(due_dates),
+                due_date__in={d for dates in due_dates.values() for d in dates},
+            ).values_list("requirement_id", "due_date")
+        )
+        new_compliances = []
+        for requirement, dates in due_dates.items():
+            for due_date in dates:
+                if (requirement.id, due_date) in existing:
+                    continue
+                existing.add((requirement.id, due_date))
+                new_compliances.append(
+                    cls(
+                        proposal=proposal,
+                        due_date=due_date,
+                        processing_status=cls.PROCESSING_STATUS_FUTURE,
+                        approval=approval,
+                        requirement=requirement,
+                    )
+                )
+        if not new_compliances:
+            return []
+
+        with transaction.atomic():
+            compliances = cls.objects.bulk_create(new_compliances)
+            # `save` sets the lodgement number and creates the assessment, which
+            # `bulk_create` bypasses
+            for compliance in compliances:
+                compliance.lodgement_number = (
+                    f"{compliance._MODEL_PREFIX()}{compliance.pk:06d}"
+                )
+            cls.objects.bulk_update(compliances, ["lodgement_number"])
+            ComplianceAssessment.objects.bulk_create(
+                [
+                    ComplianceAssessment(compliance=compliance)
+                    for compliance in compliances
+                ]
+            )
+
+            with revisions.create_revision():
+                for compliance in compliances:
+                    revisions.add_to_revision(compliance)
+
+            ComplianceUserAction.log_actions(
+                [
+                    ComplianceUserAction(
+                        compliance=compliance,
+                        who=user_id,
+                        what=ComplianceUserAction.ACTION_CREATE.format(compliance.id),
+                    )
+                    for compliance in compliances
+                ]
+            )
+
+        logger.info(
+            f"Created {len(compliances)} Compliances for Proposal {proposal.lodgement_number}"
+        )
+
+        # `bulk_create` does not send the signals that keep the search index up to date
+        from leaseslicensing.components.main.search import (
+            update_search_index_on_commit,
+        )
+
+        update_search_index_on_commit(
+            SearchIndexEntry.OBJECT_TYPE_COMPLIANCE,
+            [compliance.id for compliance in compliances],
+        )
+
+        return compliances
+
     def submit(self, request):
         with transaction.atomic():
             if self.processing_status == Compliance.PROCESSING_STATUS_DISCARDED:
@@ -0,0 +1,36 @@
+from django.contrib import admin
+
+from leaseslicensing.components.emails.models import OutboundEmail
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "subject",
+        "recipients",
+        "status",
+        "attempts",
+        "created_at",
+        "sent_at",
+    ]
+    list_filter = ["status"]
+    search_fields = ["subject", "recipients"]
+    exclude = ["message"]
+    readonly_fields = [
+        "created_at",
+        "subject",
+        "from_email",
+        "recipients",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "sent_at",
+        "last_error",
+    ]
+    actions = ["requeue"]
+
+    @admin.action(description="Queue the selected failed emails again")
+    def requeue(self, request, queryset):
+        count = OutboundEmail.requeue_failed(queryset)
+        self.message_user(request, f"Queued {count} emails again")
@@ -0,0 +1,16 @@
+from django.core.mail.backends.base import BaseEmailBackend
+
+from leaseslicensing.components.emails.models import OutboundEmail
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """
+    Queues messages in the outbox instead of sending them. The messages are saved
+    with the current transaction, so they are discarded if it is rolled back, and
+    are delivered by the `send_queued_emails` command.
+    """
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        return len(OutboundEmail.enqueue(email_messages))
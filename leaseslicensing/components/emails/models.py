@@ -0,0 +1,156 @@
+import copy
+import logging
+import pickle
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import models, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class OutboundEmail(models.Model):
+    """
+    An email message queued in the outbox (see `OutboxEmailBackend`). The message is
+    stored when it is sent and saved with the transaction that sends it, and it is
+    delivered later by the `send_queued_emails` command.
+    """
+
+    STATUS_QUEUED = "queued"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = (
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    subject = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254, blank=True)
+    recipients = models.TextField(blank=True)
+    # The pickled EmailMessage
+    message = models.BinaryField()
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        app_label = "leaseslicensing"
+        ordering = ["id"]
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"{self.subject} to {self.recipients} ({self.status})"
+
+    @classmethod
+    def enqueue(cls, email_messages):
+        """Inserts a list of EmailMessages into the outbox with a single query"""
+
+        outbound_emails = []
+        for email_message in email_messages:
+            # The connection of the message is the outbox backend
+            email_message = copy.copy(email_message)
+            email_message.connection = None
+            outbound_emails.append(
+                cls(
+                    subject=email_message.subject,
+                    from_email=email_message.from_email,
+                    recipients=",".join(email_message.recipients()),
+                    message=pickle.dumps(email_message, pickle.HIGHEST_PROTOCOL),
+                )
+            )
+        return cls.objects.bulk_create(outbound_emails)
+
+    def get_message(self):
+        return pickle.loads(self.message)
+
+    @classmethod
+    def deliver_queued(cls, batch_size=None):
+        """
+        Sends a batch of the queued messages that are due over one connection of
+        the `EMAIL_OUTBOX_DELIVERY_BACKEND`. A message that can't be sent is retried
+        after `EMAIL_OUTBOX_RETRY_DELAY` seconds, doubled after each attempt, and is
+        marked as failed after `EMAIL_OUTBOX_MAX_ATTEMPTS` attempts.
+
+        The batch is locked until it has been sent, so concurrent calls never send
+        the same message twice.
+
+        Returns:
+            tuple: The number of messages sent and the number of failed attempts
+        """
+
+        sent = failed = 0
+        with transaction.atomic():
+            outbound_emails = list(
+                cls.objects.select_for_update(skip_locked=True).filter(
+                    status=cls.STATUS_QUEUED, next_attempt_at__lte=timezone.now()
+                )[: batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE]
+            )
+            if not outbound_emails:
+                return sent, failed
+
+            connection = get_connection(
+                settings.EMAIL_OUTBOX_DELIVERY_BACKEND, fail_silently=False
+            )
+            with connection:
+                for outbound_email in outbound_emails:
+                    outbound_email.attempts += 1
+                    try:
+                        connection.send_messages([outbound_email.get_message()])
+                    except Exception as e:
+                        failed += 1
+                        outbound_email.last_error = str(e)
+                        if (
+                            outbound_email.attempts
+                            >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+                        ):
+                            outbound_email.status = cls.STATUS_FAILED
+                            logger.error(
+                                f"Failed to send email {outbound_email.id} after "
+                                f"{outbound_email.attempts} attempts: {e}"
+                            )
+                        else:
+                            outbound_email.next_attempt_at = timezone.now() + timedelta(
+                                seconds=settings.EMAIL_OUTBOX_RETRY_DELAY
+                                * 2 ** (outbound_email.attempts - 1)
+                            )
+                            logger.warning(
+                                f"Failed to send email {outbound_email.id}: {e}"
+                            )
+                        # The connection may be unusable after an error, so the
+                        # next message opens a new one
+                        connection.close()
+                        continue
+
+                    sent += 1
+                    outbound_email.status = cls.STATUS_SENT
+                    outbound_email.sent_at = timezone.now()
+                    outbound_email.last_error = ""
+
+            cls.objects.bulk_update(
+                outbound_emails,
+                ["status", "attempts", "next_attempt_at", "sent_at", "last_error"],
+            )
+
+        logger.info(f"Sent {sent} queued emails ({failed} failed attempts)")
+        return sent, failed
+
+    @classmethod
+    def requeue_failed(cls, queryset=None):
+        """Queues failed messages to be sent again"""
+
+        if queryset is None:
+            queryset = cls.objects.all()
+        return queryset.filter(status=cls.STATUS_FAILED).update(
+            status=cls.STATUS_QUEUED,
+            attempts=0,
+            next_attempt_at=timezone.now(),
+        )
@@ -0,0 +1,63 @@
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from leaseslicensing.components.emails.models import OutboundEmail
+
+
+@override_settings(
+    EMAIL_BACKEND="leaseslicensing.components.emails.backends.OutboxEmailBackend",
+    EMAIL_OUTBOX_DELIVERY_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    EMAIL_OUTBOX_MAX_ATTEMPTS=2,
+    EMAIL_OUTBOX_RETRY_DELAY=0,
+)
+class OutboxTestCase(TestCase):
+    def send(self, subject="Approval issued"):
+        msg = EmailMultiAlternatives(
+            subject, "text", "no-reply@example.com", ["proponent@example.com"]
+        )
+        msg.attach_alternative("<p>text</p>", "text/html")
+        return msg.send()
+
+    def test_queued_emails_are_sent_by_the_drain(self):
+        self.assertEqual(self.send(), 1)
+        self.assertEqual(len(mail.outbox), 0)
+
+        self.assertEqual(OutboundEmail.deliver_queued(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, "Approval issued")
+        self.assertEqual(mail.outbox[0].alternatives[0][0], "<p>text</p>")
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.STATUS_SENT)
+        self.assertEqual(OutboundEmail.deliver_queued(), (0, 0))
+
+    def test_emails_are_discarded_with_their_transaction(self):
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                self.send()
+                raise ValueError()
+
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    @mock.patch(
+        "django.core.mail.backends.locmem.EmailBackend.send_messages",
+        side_effect=ConnectionRefusedError("SMTP server unavailable"),
+    )
+    def test_failed_emails_are_retried(self, send_messages):
+        self.send()
+
+        self.assertEqual(OutboundEmail.deliver_queued(), (0, 1))
+        outbound_email = OutboundEmail.objects.get()
+        self.assertEqual(outbound_email.status, OutboundEmail.STATUS_QUEUED)
+        self.assertEqual(outbound_email.last_error, "SMTP server unavailable")
+
+        self.assertEqual(OutboundEmail.deliver_queued(), (0, 1))
+        outbound_email.refresh_from_db()
+        self.assertEqual(outbound_email.status, OutboundEmail.STATUS_FAILED)
+        self.assertEqual(OutboundEmail.deliver_queued(), (0, 0))
+
+        self.assertEqual(OutboundEmail.requeue_failed(), 1)
+        send_messages.side_effect = None
+        self.assertEqual(OutboundEmail.deliver_queued(), (1, 0))
@@ -47,6 +47,7 @@ from leaseslicensing.components.main.api import (
     LicensingViewSet,
     NoPaginationListMixin,
 )
+from leaseslicensing.components.main.pagination import get_cached_total_count
 from leaseslicensing.components.organisations.utils import get_organisation_ids_for_user
 from leaseslicensing.helpers import is_customer, is_finance_officer
 from leaseslicensing.permissions import IsAssessor, IsFinanceOfficer
@@ -60,7 +61,7 @@ class InvoiceFilterBackend(DatatablesFilterBackend):
         if approval_id:
             queryset = queryset.filter(approval_id=approval_id)
 
-        total_count = queryset.count()
+        total_count = get_cached_total_count(queryset)
 
         filter_invoice_organisation = (
             request.GET.get("filter_invoice_organisation")
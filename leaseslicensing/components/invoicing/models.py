@@ -1,12 +1,14 @@
 import logging
 import math
 import uuid
+from collections import defaultdict
 from datetime import date, datetime
 from decimal import Decimal
 from typing import Union
 
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
+from django.core.cache import cache
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models, transaction
 from django.db.models import F, Q, Sum, Window
@@ -94,7 +96,7 @@ class ConsumerPriceIndex(BaseModel):
 
     @classmethod
     def get_most_recent_quarter_by_date(
-        cls, date: datetime | date, quarter: int
+        cls, date: datetime | date, quarter: int, table: dict | None = None
     ) -> Union["ConsumerPriceIndex", None]:
         if isinstance(date, datetime):
             date = date.date()
@@ -102,7 +104,9 @@ class ConsumerPriceIndex(BaseModel):
         end_of_quarter_month = utils.month_from_cpi_quarter(quarter)
         if end_of_quarter_month > date.month:
             year -= 1
-        recent_quarter = cls.objects.filter(year=year, quarter=quarter).first()
+        if table is None:
+            table = ConsumerPriceIndexTable.get_table()
+        recent_quarter = table.get((year, quarter), None)
         if not recent_quarter:
             logger.info(
                 f"CPI data for {year}-Q{quarter} not yet available but will be available before supplied date: {date}"
@@ -110,6 +114,57 @@ class ConsumerPriceIndex(BaseModel):
 
         return recent_quarter
 
+    @classmethod
+    def values_for(
+        cls, dates: list[datetime | date], quarter: int
+    ) -> list[Union["ConsumerPriceIndex", None]]:
+        """Returns the most recent CPI record for the quarter for each of the dates"""
+        table = ConsumerPriceIndexTable.get_table()
+        return [
+            cls.get_most_recent_quarter_by_date(date, quarter, table=table)
+            for date in dates
+        ]
+
+
+class ConsumerPriceIndexTable:
+    """
+    Process-wide lookup table of CPI records keyed by (year, quarter).
+
+    The table is loaded once per process and reloaded when the version stamp in the
+    shared cache changes, i.e. after `fetch_cpi_data` has stored new quarters or a CPI
+    record has been edited.
+    """
+
+    _table = None
+    _version = None
+
+    @classmethod
+    def version(cls):
+        return cache.get(settings.CACHE_KEY_CPI_TABLE_VERSION)
+
+    @classmethod
+    def get_table(cls) -> dict[tuple[int, int], ConsumerPriceIndex]:
+        version = cls.version()
+        if cls._table is None or version != cls._version:
+            table = {}
+            # Later records for the same quarter take precedence
+            for cpi in ConsumerPriceIndex.objects.order_by("year", "quarter", "id"):
+                table[(cpi.year, cpi.quarter)] = cpi
+            cls._table = table
+            cls._version = version
+            logger.debug(f"Loaded {len(table)} CPI records into the CPI lookup table")
+
+        return cls._table
+
+    @classmethod
+    def invalidate(cls):
+        cls._table = None
+        cache.set(
+            settings.CACHE_KEY_CPI_TABLE_VERSION,
+            uuid.uuid4().hex,
+            settings.CACHE_TIMEOUT_NEVER,
+        )
+
 
 class CPICalculationMethod(models.Model):
     name = models.CharField(max_length=255, null=False, blank=False, editable=False)
@@ -153,6 +208,12 @@ class InvoicingDetailsManager(models.Manager):
         )
 
 
+# Version stamps for the rows an invoice schedule is computed from (increments, custom CPI years,
+# gross turnover percentages) keyed by invoicing details id. Bumped by the signals in
+# `leaseslicensing.components.invoicing.signals` so cached schedules are recomputed.
+invoice_schedule_versions = defaultdict(int)
+
+
 class InvoicingDetails(BaseModel):
     """
     This is the main model to store invoicing details, generated by a proposal first
@@ -270,9 +331,57 @@ class InvoicingDetails(BaseModel):
     def invoices_yet_to_be_generated(self):
         return self.total_invoice_count - self.invoices_created
 
+    def invalidate_invoice_schedule(self):
+        """Discards the cached invoicing periods and invoice schedules of this instance"""
+        self._invoice_schedule_cache = {}
+
+    def invoice_schedule_cache_key(self):
+        """
+        Returns a key that changes whenever any of the inputs the invoice schedule
+        is computed from changes
+        """
+        approval = self.approval
+        proposal = getattr(self, "proposal", None)
+        return (
+            self.charge_method_id,
+            self.base_fee_amount,
+            self.once_off_charge_amount,
+            self.invoicing_once_every,
+            self.invoicing_repetition_type_id,
+            self.invoicing_quarters_start_month,
+            self.cpi_calculation_method_id,
+            approval.start_date if approval else None,
+            approval.expiry_date if approval else None,
+            proposal.processing_status if proposal else None,
+            proposal.proposal_type_id if proposal else None,
+            invoice_schedule_versions.get(self.pk, 0),
+            ConsumerPriceIndexTable.version(),
+            helpers.today(),
+        )
+
+    def _cached_invoice_schedule(self, name, compute):
+        cache_key = self.invoice_schedule_cache_key()
+        cache = getattr(self, "_invoice_schedule_cache", None)
+        if not cache or cache.get("key") != cache_key:
+            cache = {"key": cache_key}
+            self._invoice_schedule_cache = cache
+        if name not in cache:
+            cache[name] = compute()
+        # Return a shallow copy so callers can't modify the cached list
+        return list(cache[name])
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.invalidate_invoice_schedule()
+
     @property
     def invoicing_periods(self):
         """Returns an array of invoicing periods based on the invoicing details object"""
+        return self._cached_invoice_schedule(
+            "invoicing_periods", self._compute_invoicing_periods
+        )
+
+    def _compute_invoicing_periods(self):
         invoicing_periods = []
 
         if not self.charge_method or self.charge_method.key in [
@@ -446,9 +555,10 @@ class InvoicingDetails(BaseModel):
     def get_custom_cpi_year_for_next_invoicing_period(self):
         today = helpers.today()
         index = None
-        for i in range(0, len(self.invoicing_periods)):
+        invoicing_periods = self.invoicing_periods
+        for i in range(0, len(invoicing_periods)):
             start_date = datetime.strptime(
-                self.invoicing_periods[i]["start_date"], "%Y-%m-%d"
+                invoicing_periods[i]["start_date"], "%Y-%m-%d"
             ).date()
             if start_date >= today:
                 index = i
@@ -490,13 +600,24 @@ class InvoicingDetails(BaseModel):
         """
         Returns a full preview array of invoices based on the invoicing periods for the invoicing details object
         Including all past and future periods.
+        The schedule is computed once per instance and recomputed only when its inputs change.
         """
+        return self._cached_invoice_schedule(
+            f"invoice_schedule_{include_past_periods}",
+            lambda: self._compute_invoice_schedule(include_past_periods),
+        )
+
+    def _compute_invoice_schedule(self, include_past_periods):
         invoices = []
         days_running_total = 0
         amount_running_total = Decimal("0.00")
-        issue_date = self.get_first_issue_date()
         number = 0
-        for i, invoicing_period in enumerate(self.invoicing_periods):
+        invoicing_periods = self.invoicing_periods
+        original_issue_dates = self.original_issue_dates
+        # Load the CPI lookup table once for the whole schedule
+        cpi_table = ConsumerPriceIndexTable.get_table()
+        for i, invoicing_period in enumerate(invoicing_periods):
+            issue_date = original_issue_dates[i]
             # Net 30 payment terms
             due_date = issue_date + relativedelta(days=30)
             days_running_total += invoicing_period["days"]
@@ -511,6 +632,7 @@ class InvoicingDetails(BaseModel):
                 invoicing_period["end_date"],
                 invoicing_period["days"],
                 i,  # index needed to calculate the amount
+                cpi_table=cpi_table,
             )
 
             # Find out if this is a backdated invoicing period
@@ -569,14 +691,28 @@ class InvoicingDetails(BaseModel):
                     }
                 )
 
-            if i < len(self.invoicing_periods) - 1:
-                issue_date = self.add_repetition_interval(issue_date)
-            else:
-                # The last issue date is the day after the expiry date for the approval
-                issue_date = self.approval.expiry_date + relativedelta(days=1)
-
         return invoices
 
+    @property
+    def original_issue_dates(self):
+        """
+        Returns the issue date of each invoicing period, without computing the
+        amounts of the invoice schedule (see `invoice_schedule_original_issue_dates`)
+        """
+        return self._cached_invoice_schedule(
+            "original_issue_dates", self._compute_original_issue_dates
+        )
+
+    def _compute_original_issue_dates(self):
+        invoicing_periods = self.invoicing_periods
+        if not invoicing_periods:
+            return []
+
+        issue_dates = [self.get_first_issue_date()]
+        for i in range(1, len(invoicing_periods)):
+            issue_dates.append(self.add_repetition_interval(issue_dates[-1]))
+        return issue_dates
+
     @property
     def preview_invoices(self):
         """
@@ -796,7 +932,9 @@ class InvoicingDetails(BaseModel):
 
         return amount.quantize(Decimal("0.01"))
 
-    def get_amount_for_invoice(self, issue_date, start_date, end_date, days, index):
+    def get_amount_for_invoice(
+        self, issue_date, start_date, end_date, days, index, cpi_table=None
+    ):
         amount_object = {
             "prefix": "$",
             "amount": Decimal("0.00"),
@@ -857,7 +995,7 @@ class InvoicingDetails(BaseModel):
             # for a totally unrelated period.
             cpi_date = start_date if start_date < issue_date else issue_date
             cpi = ConsumerPriceIndex.get_most_recent_quarter_by_date(
-                cpi_date, self.cpi_calculation_method.quarter
+                cpi_date, self.cpi_calculation_method.quarter, table=cpi_table
             )
             if cpi:
                 amount_object["amount"] = Decimal(
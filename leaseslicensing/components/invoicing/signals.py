@@ -0,0 +1,51 @@
+import logging
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from leaseslicensing.components.invoicing.models import (
+    ConsumerPriceIndex,
+    ConsumerPriceIndexTable,
+    CustomCPIYear,
+    FixedAnnualIncrementAmount,
+    FixedAnnualIncrementPercentage,
+    PercentageOfGrossTurnover,
+    invoice_schedule_versions,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class InvoiceScheduleInputListener:
+    """
+    Event listener for the rows an invoice schedule is computed from.
+    Bumps the schedule version of the related invoicing details so any
+    cached schedule is recomputed on next access.
+    """
+
+    @staticmethod
+    @receiver(post_save, sender=FixedAnnualIncrementAmount)
+    @receiver(post_save, sender=FixedAnnualIncrementPercentage)
+    @receiver(post_save, sender=PercentageOfGrossTurnover)
+    @receiver(post_save, sender=CustomCPIYear)
+    @receiver(post_delete, sender=FixedAnnualIncrementAmount)
+    @receiver(post_delete, sender=FixedAnnualIncrementPercentage)
+    @receiver(post_delete, sender=PercentageOfGrossTurnover)
+    @receiver(post_delete, sender=CustomCPIYear)
+    def _invalidate_invoice_schedule(sender, instance, **kwargs):
+        if not instance.invoicing_details_id:
+            return
+
+        invoice_schedule_versions[instance.invoicing_details_id] += 1
+
+
+class ConsumerPriceIndexListener:
+    """
+    Event listener for ConsumerPriceIndex
+    """
+
+    @staticmethod
+    @receiver(post_save, sender=ConsumerPriceIndex)
+    @receiver(post_delete, sender=ConsumerPriceIndex)
+    def _invalidate_cpi_table(sender, instance, **kwargs):
+        ConsumerPriceIndexTable.invalidate()
@@ -1,9 +1,38 @@
+from datetime import date
+from decimal import Decimal
+
 from django.test import SimpleTestCase
 
-from leaseslicensing.components.invoicing.models import ChargeMethod
+from leaseslicensing.components.invoicing.models import ChargeMethod, ConsumerPriceIndex
 
 
 class ChargeMethodTestCase(SimpleTestCase):
     def test_charge_method(self):
         charge_method = ChargeMethod(key="test", display_name="Test")
         self.assertEqual(charge_method.key, "test")
+
+
+class ConsumerPriceIndexTestCase(SimpleTestCase):
+    def test_get_most_recent_quarter_by_date_from_table(self):
+        cpi_2022 = ConsumerPriceIndex(year=2022, quarter=2, value=Decimal("7.5"))
+        cpi_2023 = ConsumerPriceIndex(year=2023, quarter=2, value=Decimal("5.2"))
+        table = {(2022, 2): cpi_2022, (2023, 2): cpi_2023}
+
+        # The JUN quarter of the current year is not available before June
+        self.assertEqual(
+            ConsumerPriceIndex.get_most_recent_quarter_by_date(
+                date(2023, 3, 1), 2, table=table
+            ),
+            cpi_2022,
+        )
+        self.assertEqual(
+            ConsumerPriceIndex.get_most_recent_quarter_by_date(
+                date(2023, 7, 1), 2, table=table
+            ),
+            cpi_2023,
+        )
+        self.assertIsNone(
+            ConsumerPriceIndex.get_most_recent_quarter_by_date(
+                date(2024, 7, 1), 2, table=table
+            )
+        )
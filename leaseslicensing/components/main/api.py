@@ -2,6 +2,7 @@ import logging
 
 from django.apps import apps
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import transaction
 from django.db.models import F
@@ -33,7 +34,9 @@ from leaseslicensing.components.main.serializers import (
     SecureDocumentSerializer,
     TemporaryDocumentCollectionSerializer,
 )
-from leaseslicensing.permissions import IsInternalOrHasObjectPermission
+from leaseslicensing.components.main.utils import get_gis_layer_latencies
+from leaseslicensing.jobs import get_job
+from leaseslicensing.permissions import IsInternal, IsInternalOrHasObjectPermission
 
 logger = logging.getLogger(__name__)
 
@@ -364,3 +367,34 @@ class SecureDocumentsAPIView(views.APIView):
         ).data
 
         return Response(data)
+
+
+class GISLayerLatencyView(views.APIView):
+    """Returns the latency histograms of the geoserver requests for each GIS layer"""
+
+    permission_classes = [IsInternal]
+
+    def get(self, request, format=None):
+        return Response(get_gis_layer_latencies())
+
+
+class CacheStatisticsView(views.APIView):
+    """Returns the hit, miss and eviction counters of the cache of this process"""
+
+    permission_classes = [IsInternal]
+
+    def get(self, request, format=None):
+        if not hasattr(cache, "stats"):
+            return Response({})
+        return Response(cache.stats())
+
+
+class BackgroundJobView(views.APIView):
+    """Returns the status and progress of a background job started by the request
+    user (see `leaseslicensing.jobs.start_job`)"""
+
+    def get(self, request, job_id, format=None):
+        job = get_job(job_id)
+        if job is None or job["user_id"] != request.user.id:
+            raise Http404
+        return Response(job)
@@ -0,0 +1,251 @@
+"""Converts documents (e.g. docx to pdf) with a pool of headless LibreOffice workers."""
+
+import atexit
+import logging
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import Future
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentConversionError(Exception):
+    pass
+
+
+class ConversionJob:
+    def __init__(self, name, content, to_format):
+        self.name = name
+        self.content = content
+        self.to_format = to_format
+        self.future = Future()
+
+    @property
+    def suffix(self):
+        return os.path.splitext(self.name)[1] or ".docx"
+
+    @property
+    def extension(self):
+        # E.g. "pdf:writer_pdf_Export" converts to .pdf files
+        return self.to_format.split(":")[0]
+
+
+class ConversionWorker:
+    """
+    Owns a LibreOffice user profile, which is initialised by the worker's first
+    conversion and reused by the later ones. LibreOffice hands a command over to a
+    running process with the same profile (which then converts nothing for the
+    command), so a profile is only ever used by one conversion command at a time.
+    Workers never share a profile, so they can convert in parallel.
+    """
+
+    def __init__(self, command, timeout):
+        self.command = command
+        self.timeout = timeout
+        self.profile_directory = tempfile.mkdtemp(prefix="libreoffice-profile-")
+
+    @property
+    def profile_argument(self):
+        return f"-env:UserInstallation={Path(self.profile_directory).as_uri()}"
+
+    def close(self):
+        shutil.rmtree(self.profile_directory, ignore_errors=True)
+
+    def convert(self, jobs):
+        """
+        Converts a batch of jobs with the same target format with one command.
+        Every batch is written to a temporary directory of its own, so concurrent
+        batches never collide on file names.
+        """
+
+        to_format = jobs[0].to_format
+        with tempfile.TemporaryDirectory(prefix="document-conversion-") as directory:
+            paths = []
+            for i, job in enumerate(jobs):
+                paths.append(os.path.join(directory, f"{i}{job.suffix}"))
+                with open(paths[-1], "wb") as f:
+                    f.write(job.content)
+
+            output_directory = os.path.join(directory, "converted")
+            # A session of its own, so that a timed out command can be killed along
+            # with the LibreOffice process started by the launcher script
+            process = subprocess.Popen(
+                [
+                    self.command,
+                    self.profile_argument,
+                    "--headless",
+                    "--norestore",
+                    "--convert-to",
+                    to_format,
+                    "--outdir",
+                    output_directory,
+                    *paths,
+                ],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                start_new_session=True,
+            )
+            try:
+                _, stderr = process.communicate(timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                # Don't leave a process that holds the profile
+                os.killpg(process.pid, signal.SIGKILL)
+                process.communicate()
+                raise DocumentConversionError(
+                    f"Converting {len(jobs)} documents timed out after {self.timeout}s"
+                )
+
+            for i, job in enumerate(jobs):
+                converted = os.path.join(output_directory, f"{i}.{job.extension}")
+                try:
+                    with open(converted, "rb") as f:
+                        job.future.set_result(BytesIO(f.read()))
+                except OSError:
+                    job.future.set_exception(
+                        DocumentConversionError(
+                            f"Failed to convert {job.name} to {to_format}: "
+                            f"{stderr.decode(errors='replace')}"
+                        )
+                    )
+
+
+class DocumentConverter:
+    """
+    Converts documents with a pool of `ConversionWorker`s. Documents are queued with
+    `submit` (or `convert` for a batch of documents) and each worker converts the
+    queued documents in batches of up to `batch_size` documents.
+
+    Args:
+        workers (int, optional): The number of concurrent LibreOffice commands
+        batch_size (int, optional): The maximum number of documents per command
+        command (str, optional): The LibreOffice executable
+        timeout (int, optional): The maximum number of seconds a command may take
+    """
+
+    def __init__(self, workers=None, batch_size=None, command=None, timeout=None):
+        self.batch_size = max(batch_size or settings.DOCUMENT_CONVERSION_BATCH_SIZE, 1)
+        self._queue = queue.Queue()
+        self._closed = False
+        self._workers = [
+            ConversionWorker(
+                command or settings.LIBREOFFICE_COMMAND,
+                timeout or settings.DOCUMENT_CONVERSION_TIMEOUT,
+            )
+            for _ in range(max(workers or settings.DOCUMENT_CONVERSION_WORKERS, 1))
+        ]
+        self._threads = [
+            threading.Thread(
+                target=self._run,
+                args=(worker,),
+                name=f"document-conversion-{i}",
+                daemon=True,
+            )
+            for i, worker in enumerate(self._workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, content, name="document.docx", to_format="pdf"):
+        """
+        Queues a document for conversion
+
+        Args:
+            content (bytes | file-like): The document
+            name (str, optional): The document's file name, which determines its type
+            to_format (str, optional): The LibreOffice target format
+
+        Returns:
+            Future: Resolves to a BytesIO of the converted document
+        """
+
+        if self._closed:
+            raise DocumentConversionError("The document converter has been shut down")
+        if hasattr(content, "getvalue"):
+            content = content.getvalue()
+        elif hasattr(content, "read"):
+            content = content.read()
+        job = ConversionJob(name, content, to_format)
+        self._queue.put(job)
+        return job.future
+
+    def convert(self, documents, to_format="pdf"):
+        """
+        Converts documents in parallel and returns a BytesIO for each of them in the
+        order of `documents`, a list of (name, content) tuples. Raises the error of
+        the first document that could not be converted.
+        """
+
+        futures = [self.submit(content, name, to_format) for name, content in documents]
+        return [future.result() for future in futures]
+
+    def _next_batch(self, job):
+        # Share the queued jobs between the workers rather than let the first one
+        # take them all
+        size = min(self.batch_size, self._queue.qsize() // len(self._workers) + 1)
+        jobs = [job]
+        while len(jobs) < size:
+            try:
+                next_job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if next_job is None:
+                # Leave the shut down signal for the loop in `_run`
+                self._queue.put(None)
+                break
+            jobs.append(next_job)
+        return [job for job in jobs if job.future.set_running_or_notify_cancel()]
+
+    def _run(self, worker):
+        try:
+            while True:
+                job = self._queue.get()
+                if job is None:
+                    # Pass the shut down signal on to the other workers
+                    self._queue.put(None)
+                    break
+                jobs = self._next_batch(job)
+                for to_format in {job.to_format for job in jobs}:
+                    batch = [job for job in jobs if job.to_format == to_format]
+                    try:
+                        worker.convert(batch)
+                    except Exception as e:
+                        logger.exception(f"Failed to convert {len(batch)} documents")
+                        for job in batch:
+                            if not job.future.done():
+                                job.future.set_exception(e)
+        finally:
+            worker.close()
+
+    def shutdown(self):
+        """Converts the queued documents and removes the LibreOffice profiles"""
+
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+
+_converter = None
+_converter_lock = threading.Lock()
+
+
+def get_document_converter():
+    """Returns the document converter of the current process"""
+
+    global _converter
+    with _converter_lock:
+        if _converter is None:
+            _converter = DocumentConverter()
+            atexit.register(_converter.shutdown)
+    return _converter
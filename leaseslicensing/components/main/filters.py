@@ -1,11 +1,8 @@
-import functools
 import itertools
 import logging
 
-from django.conf import settings
-from django.core.cache import cache
 from django.core.exceptions import FieldError
-from django.db.models import Case, CharField, Q, Value, When
+from django.db.models import Case, CharField, IntegerField, Q, Value, When
 from django.db.models.functions import Concat
 from ledger_api_client.ledger_models import EmailUserRO as EmailUser
 from rest_framework import serializers
@@ -37,8 +34,6 @@ class LedgerDatatablesFilterBackend(DatatablesFilterBackend):
         Args:
             ledger_lookup_fields (list, optional):
                 The fields in the model that functions as the foreign key to ledger
-            cache_prefix (str, optional):
-                String prefix for ledger emailuser cache key
             search_threshold (int, optional):
                 Minimum amount of character to initiate search in queryset,
                 defaults to 2
@@ -70,9 +65,6 @@ class LedgerDatatablesFilterBackend(DatatablesFilterBackend):
                 "assigned_officer_id",
             ],
         )
-        self.CACHE_PREFIX = kwargs.get(
-            "cache_prefix", "ledger_api_accounts_filtered_emailuser_"
-        )
         # Minimum amount of characters required to initiate searching the queryset
         self.SEARCH_THRESHOLD = kwargs.get("search_threshold", 2)
 
@@ -105,16 +97,6 @@ class LedgerDatatablesFilterBackend(DatatablesFilterBackend):
             result_dict.setdefault(key, []).append(value)
         return result_dict
 
-    @basic_exception_handler
-    def rgetattr(self, obj, attr, *args):
-        def _getattr(obj, attr):
-            if isinstance(obj, dict):
-                return obj.get(attr, None)
-            else:
-                return getattr(obj, attr, *args) if hasattr(obj, attr) else None
-
-        return functools.reduce(_getattr, [obj] + attr.split("."))
-
     @basic_exception_handler
     def get_ordering(self, request, view, fields):
         """Overwrite `filters::get_ordering` fn
@@ -136,73 +118,50 @@ class LedgerDatatablesFilterBackend(DatatablesFilterBackend):
         return ordering
 
     @basic_exception_handler
-    def ledger_cache(self, queryset, filter_keys=[], **kwargs):
+    def ledger_user_ids(self, queryset, filter_keys=[], search_filter=None):
         """
-        Retrieves ledger accounts emailuser from cache. Creates a new cache if
-        no cache exists
+        Resolves the ledger emailuser accounts referenced by a queryset to a set of
+        primary keys. The ledger database is segregated, so the ids referenced in the
+        model are collected with a `DISTINCT` query and used to narrow down the ledger
+        query, rather than loading every model instance.
 
         Args:
             queryset (QuerySet):
                 The database model's queryset
-            filter_keys (list<str>, keyword argument):
+            filter_keys (list<str>):
                 A list of fields in the model that function as foreign keys to ledger,
-                can be different from model_keys when ordering for a particular column,
                 e.g. `["submitter"]`
-            model_keys (list<str>, keyword argument):
-                A list of all fields in the model that function as foreign keys to ledger,
-                e.g. `["submitter", "assigned_approver", ...]`
-            cache_prefix (str, optional):
-                String prefix for ledger emailuser cache key
+            search_filter (Q, optional):
+                A filter to apply to the ledger emailuser accounts, e.g. a search term
 
         Returns:
-            A ledger emailuser accounts queryset from cache
+            A set of ledger emailuser primary keys
         """
 
-        model = kwargs.get("model", queryset.model)
-        model_keys = kwargs.get("model_keys", self.LEDGER_LOOKUP_FIELDS)
-        cache_prefix = kwargs.get("cache_prefix", self.CACHE_PREFIX)
-
-        name = (
-            model.__name__
-            if hasattr(model, "__name__")
-            else model.__class__.__name__
-            if hasattr(model, "__class__")
-            else "default"
-        )
-        cache_key = f"{cache_prefix}{name}"
-
-        # Get the ledger cache
-        _ledger_cache = cache.get(cache_key)
-
-        if _ledger_cache is None:
-            logger.info(f"Setting new ledger user account cache for `{name}`")
-            # All ledger foreign keys for this model
-            _lfks = queryset.values_list(*model_keys)
-            _lfks = list(set(itertools.chain(*_lfks)))
-            # Query ledger for all user accounts referenced in this model
-            _ledger_cache = EmailUser.objects.filter(pk__in=_lfks)
-            # Cache
-            cache.set(
-                cache_key,
-                _ledger_cache,
-                settings.LOV_CACHE_TIMEOUT,
+        referenced_ids = set()
+        for key in filter_keys:
+            referenced_ids.update(
+                queryset.order_by()
+                .exclude(**{f"{key}__isnull": True})
+                .values_list(key, flat=True)
+                .distinct()
             )
-        else:
-            logger.info(f"Returning ledger user accounts for `{name}` from cache")
+        if not referenced_ids:
+            return set()
 
-        # Only the filtered ledger foreign keys for this model
-        lfks = queryset.values_list(*filter_keys)
-        lfks = list(set(itertools.chain(*lfks)))
-        # Filter by this model's ledger foreign keys
-        ledger = _ledger_cache.filter(pk__in=lfks)
+        ledger = EmailUser.objects.filter(pk__in=referenced_ids)
+        if search_filter is not None:
+            ledger = ledger.filter(search_filter)
 
-        return ledger
+        return set(ledger.values_list("pk", flat=True))
 
     @basic_exception_handler
     def apply_request(self, request, queryset, view, **kwargs):
         """
         Applies a query request to a queryset, searching for the request's
         `search_value` (if applicable) and ordering it.
+        Searching and ordering are done in the database, ledger attributes
+        are resolved to sets of ledger ids first and mapped back onto the model.
 
         Args:
             request (Request):
@@ -213,8 +172,6 @@ class LedgerDatatablesFilterBackend(DatatablesFilterBackend):
                 The view to query for
             ledger_lookup_fields (list, keyword argument):
                 The field in the model that functions as the foreign key to ledger
-            cache_prefix (str, optional):
-                String prefix for ledger emailuser cache key
             search_threshold (int, optional):
                 Minimum amount of character to initiate search in queryset,
                 defaults to 2
@@ -232,10 +189,8 @@ class LedgerDatatablesFilterBackend(DatatablesFilterBackend):
         ledger_lookup_fields = kwargs.get(
             "ledger_lookup_fields", self.LEDGER_LOOKUP_FIELDS
         )
-        cache_prefix = kwargs.get("cache_prefix", self.CACHE_PREFIX)
         search_threshold = kwargs.get("search_threshold", self.SEARCH_THRESHOLD)
 
-        query_model_list = []
         datatables_query = self.parse_datatables_query(request, view)
         search_value = ""
         if (
@@ -258,9 +213,6 @@ class LedgerDatatablesFilterBackend(DatatablesFilterBackend):
 
         # Require at least two characters before searching
         if len(search_value) >= search_threshold:
-            # The resulting (searched for and ordered) queryset as a list
-            query_model_list = []
-
             # Filter for model database fields first
             model_filter_dict = {
                 f"{attr}__icontains": search_value for attr in model_attrs
@@ -273,77 +225,43 @@ class LedgerDatatablesFilterBackend(DatatablesFilterBackend):
                 # Concatenate search term filter with model filter
                 model_filter_dict = {**model_filter_dict, **search_term_filter}
 
-            try:
-                model_qs_filtered = queryset.filter(
-                    Q(**model_filter_dict, _connector=Q.OR)
-                )
-            except FieldError:
-                raise FieldError(
-                    f"Error filtering queryset. Consider adding any of {model_attrs} "
-                    f"to `ledger_lookup_fields`: {ledger_lookup_fields}"
-                )
-
-            # Add filtered model results to list
-            query_model_list += [
-                m for m in list(model_qs_filtered) if m not in query_model_list
-            ]
-
-            # Ledger lookup fields for this model in double underscore-notation
-            _ledger_fields_undscr = self._ledger_attrs_to_list(ledger_attrs)
-            # Get the cached ledger user
-            ledger_cache = None
-            if len(_ledger_fields_undscr) > 0:
-                ledger_cache = self.ledger_cache(
-                    queryset,
-                    filter_keys=_ledger_fields_undscr,
-                    model_keys=self._ledger_attrs_to_list(ledger_attrs),
-                    cache_prefix=cache_prefix,
-                    model=model,
-                )
+            search_filter = Q(**model_filter_dict, _connector=Q.OR)
 
             for attribute in ledger_attrs:
-                # Ledger foreign keys
-                _fks = list(
-                    {
-                        self.rgetattr(m, k.replace("__", "."))
-                        for m in list(queryset)
-                        for k in _ledger_fields_undscr
-                    }
-                )
-
                 # A dictionary of search fields and values
                 ledger_filter_dict = {
-                    f"{field}__icontains": search_value
+                    f"{field.replace('.', '__')}__icontains": search_value
                     for key in ledger_attrs[attribute]
                     for field in ledger_attrs[attribute][key]
                     if self._check_model_field(attribute, field)
                 }
-
-                # Filter the ledger cache
-                ledger_qs_filtered = ledger_cache.filter(Q(pk__in=_fks)).filter(
-                    Q(**ledger_filter_dict, _connector=Q.OR)
+                # The ledger accounts referenced by this model that match the search value
+                ledger_pks = self.ledger_user_ids(
+                    queryset,
+                    filter_keys=list(ledger_attrs[attribute].keys()),
+                    search_filter=Q(**ledger_filter_dict, _connector=Q.OR),
                 )
-                if ledger_qs_filtered.count() > 0:
+                if len(ledger_pks) > 0:
                     logger.info(
-                        f"Found `{search_value}` in LEDGER attribute {_ledger_fields_undscr}: {_fks}"
+                        f"Found `{search_value}` in LEDGER attribute {attribute}: {ledger_pks}"
                     )
-
-                # List of ledger pk dicts, e.g. `[{'pk': 2}, {'pk': 1}]`, and filter model
-                _pks = list(ledger_qs_filtered.values("pk"))
                 # Map ledger pks back to model attribute, e.g. `{'submitter__in': [2]}`
-                model_filter_dict = {
-                    f"{key}__in": [d["pk"] for d in _pks]
-                    for key in ledger_attrs[attribute]
-                }
-                model_qs_filtered = queryset.filter(Q(**model_filter_dict))
-                # Append to the resulting queryset list
-                query_model_list += [
-                    m for m in list(model_qs_filtered) if m not in query_model_list
-                ]
+                search_filter |= Q(
+                    **{f"{key}__in": ledger_pks for key in ledger_attrs[attribute]}
+                )
 
-        else:
-            # Cast queryset to list
-            query_model_list = list(queryset)
+            try:
+                # Use a subquery so joins across multi-valued relations don't duplicate rows
+                queryset = queryset.filter(
+                    pk__in=queryset.filter(search_filter).values("pk")
+                )
+            except FieldError:
+                raise FieldError(
+                    f"Error filtering queryset. Consider adding any of {model_attrs} "
+                    f"to `ledger_lookup_fields`: {ledger_lookup_fields}"
+                )
+
+        queryset = queryset.distinct()
 
         # Ordering
         fields = self.get_fields(request)
@@ -361,144 +279,71 @@ class LedgerDatatablesFilterBackend(DatatablesFilterBackend):
                 for sublist in inner.split(".")
             ]
         ):
-            ordering = ",".join(orderings_dotnot)
-            # Ascending or descending
-            reverse = ordering.startswith("-")
-            # Handle ordering by ledger field
-            if any([lf in ordering for lf in ledger_attrs.keys()]):
-                # Transform a list of dot-notation strings (key.field) to a dictionary in the form of {key:[fields]}
-                ord_dict = self.split_list_to_dict(
-                    orderings_dotnot, ledger_keys=ledger_attrs.keys()
-                )
-                # Get ledger accounts from cache
-                _ledger_keys = [
-                    f.replace("-", "").replace(".", "__") for f in list(ord_dict.keys())
-                ]
-                ledger_cache = self.ledger_cache(
-                    queryset,
-                    filter_keys=_ledger_keys,
-                    model_keys=self._ledger_attrs_to_list(ledger_attrs),
-                    cache_prefix=cache_prefix,
-                    model=model,
-                )
-                # Order queryset list according to foreign key lookups in ledger entries
-                model_fpks_sort = self.order_ledger_fks(
-                    ledger_cache, query_model_list, ord_dict
+            # Transform a list of dot-notation strings (key.field) to a dictionary in the form of {key:[fields]}
+            ord_dict = self.split_list_to_dict(
+                orderings_dotnot, ledger_keys=ledger_attrs.keys()
+            )
+            queryset = queryset.annotate(
+                ledger_ordering=self.ledger_ordering(queryset, ord_dict)
+            ).order_by("ledger_ordering")
+        elif len(orderings):
+            try:
+                queryset = queryset.order_by(*orderings[0].split(","))
+            except (KeyError, FieldError) as e:
+                logger.exception(
+                    f"Could not order queryset by {orderings} due to exception: {e}"
                 )
 
-                # Get a list of pkeys
-                pk_list = [l_l.pk for l_l in query_model_list]
-                # Preserve the order of the pkey list
-                fpk_attr = list(ord_dict.keys())[0].replace("-", "").replace(".", "__")
-                preserved_order = Case(
-                    *[
-                        When(**{fpk_attr: fpk, "then": pos})
-                        for pos, fpk in enumerate(model_fpks_sort)
-                    ]
-                )
-            else:
-                # Order list of models
-                query_model_list = sorted(
-                    query_model_list,
-                    key=lambda p: self.rgetattr(p, ordering.replace("-", "")),
-                    reverse=reverse,
-                )
-                # Get a list of keys
-                pk_list = [l_l.pk for l_l in query_model_list]
-                # Preserve the order of the list of keys
-                preserved_order = Case(
-                    *[When(pk=pk, then=pos) for pos, pk in enumerate(pk_list)]
+                raise APIException(
+                    code=500, detail=f"Could not order queryset by {orderings}"
                 )
 
-            # Convert back to Model Queryset using the sorting of `query_model_list`
-            # queryset = (
-            #     model.objects.filter(pk__in=pk_list)
-            #     .distinct()
-            #     .order_by(preserved_order)
-            # )
-            queryset = (
-                queryset.filter(pk__in=pk_list).distinct().order_by(preserved_order)
-            )
-        else:
-            # Convert back to Model Queryset
-            pk_list = [l_l.pk for l_l in query_model_list]
-            # queryset = model.objects.filter(pk__in=pk_list).distinct()
-            queryset = queryset.filter(pk__in=pk_list).distinct()
-            if len(orderings):
-                try:
-                    queryset = queryset.order_by(*orderings[0].split(","))
-                except (KeyError, FieldError) as e:
-                    logger.exception(
-                        f"Could not order queryset by {orderings} due to exception: {e}"
-                    )
-
-                    raise APIException(
-                        code=500, detail=f"Could not order queryset by {orderings}"
-                    )
-
         return queryset
 
     @basic_exception_handler
-    def order_ledger_fks(self, ledger, query_model_list, ord_dict):
+    def ledger_ordering(self, queryset, ord_dict):
         """
-        Orders a list of querysets for a model according to ordering values in ledger,
+        Builds an ordering expression for a queryset according to ordering values in ledger,
         connecting integer "foreign keys" in the model to primary keys in the
-        segregated ledger database.
+        segregated ledger database. The expression holds one branch per distinct ledger
+        account referenced in the queryset, not one per row.
 
         Args:
-            ledger (QuerySet):
-                A ledger queryset
-            query_model_list (list):
-                This model as a list
+            queryset (QuerySet):
+                This model's queryset
             ord_dict (dictionary):
                 A dictionary in the form of `{ledger_fk_in_model: [search_fields_in_ledger]}`
 
         Returns:
-            A list of ledger foreign keys in the model ordered by ordering values in ledger
+            A `Case` expression that evaluates to the position of a row's ledger account
         """
 
         reverse = list(ord_dict.keys())[0].startswith("-")
-        # Ledger "foreign keys" in model
-        model_fpks = [
-            self.rgetattr(model, attr.replace("-", ""))
-            for model in query_model_list
-            for attr in list(ord_dict.keys())
-        ]
-        # Get a distinct list of ledger keys on which to order
-        ledger_pks = list(set(model_fpks))
+        # The ledger "foreign key" in the model to order on
+        fpk_attr = list(ord_dict.keys())[0].replace("-", "").replace(".", "__")
         # Get a list of ledger fields to order for
         ledger_orderings = [
-            inner for outer in list(ord_dict.values()) for inner in outer
-        ]
-        # Filter and sort ledger
-        # ledger = EmailUser.objects.filter(pk__in=ledger_pks).order_by(*ledger_orderings)
-        ledger = ledger.filter(pk__in=ledger_pks).order_by(
-            *[f"-{l_l}" if reverse else l_l for l_l in ledger_orderings]
-        )
-        # List of ordered keys in ledger
-        ledger_pk_list = [l_l.pk for l_l in list(ledger)]
-        # Dictionary of counted ledger "foreign keys" in model
-        model_fpks_cnt = {pk: model_fpks.count(pk) for pk in ledger_pks}
-        # An expanded list of ledger "foreign keys"
-        model_fpks_sort = [
-            inner
-            for outer in [[p] * model_fpks_cnt[p] for p in ledger_pk_list]
+            inner.replace(".", "__")
+            for outer in list(ord_dict.values())
             for inner in outer
         ]
-        # Handle None-type ledger "foreign key", prepend or append the respective amount of None
-        if reverse:
-            model_fpks_sort = [None] * model_fpks_cnt.get(None, 0) + model_fpks_sort
-        else:
-            model_fpks_sort = model_fpks_sort + [None] * model_fpks_cnt.get(None, 0)
-
-        # `model_fpks` grows with the amount of Ledger foreign keys, so have to divide here
-        # to correctly compare with the size of the view's queryset
-        if not len(model_fpks_sort) / len(ord_dict.keys()) == len(query_model_list):
-            raise serializers.ValidationError(
-                "`model_attr_sort` does not match length of QuerySet"
-            )
+        ledger_pks = self.ledger_user_ids(queryset, filter_keys=[fpk_attr])
+        # List of ordered keys in ledger
+        ledger_pk_list = list(
+            EmailUser.objects.filter(pk__in=ledger_pks)
+            .order_by(*[f"-{l_l}" if reverse else l_l for l_l in ledger_orderings])
+            .values_list("pk", flat=True)
+        )
 
-        return model_fpks_sort
+        # None-type ledger "foreign keys" go last when ascending and first when descending
+        return Case(
+            *[
+                When(**{fpk_attr: fpk, "then": Value(pos)})
+                for pos, fpk in enumerate(ledger_pk_list)
+            ],
+            default=Value(-1 if reverse else len(ledger_pk_list)),
+            output_field=IntegerField(),
+        )
 
     def segregate_attributes(self, datatables_search_attributes, ledger_lookup_fields):
         """
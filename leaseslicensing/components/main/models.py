@@ -1,12 +1,17 @@
 import logging
 import os
 
+import reversion
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.core.files.storage import FileSystemStorage
 from django.db import models
 from django.db.models import Q
+from django.db.models.functions import Upper
 from django.forms import ValidationError
 from django_countries.fields import CountryField
 from ledger_api_client.ledger_models import EmailUserRO as EmailUser
+from reversion.errors import RevertError
 from reversion.models import Version
 
 from leaseslicensing import settings
@@ -87,18 +92,88 @@ class RevisionedMixin(models.Model):
                 f"{self.__class__.__name__} has no attribute {reverse_attr}"
             )
 
-        # A list of filtered attribute versions
-        rfk_versions = []
-        for obj in reverse_fk_qs:
-            version = [
-                p
-                for p in Version.objects.get_for_object(obj)
-                .select_related("revision")
-                .filter(lookup_filter)
-            ]
-            rfk_versions += version
+        # The filtered versions of all related objects in one query
+        object_ids = [str(pk) for pk in reverse_fk_qs.values_list("pk", flat=True)]
+        return list(
+            Version.objects.get_for_model(reverse_fk_qs.model)
+            .filter(object_id__in=object_ids)
+            .select_related("revision")
+            .filter(lookup_filter)
+        )
+
+    def reverse_fk_versions_at(self, revision_id, reverse_attr):
+        """
+        Returns the versions of the objects of the one-to-many foreign key relation
+        `reverse_attr` as they were at revision `revision_id`, i.e. the most recent
+        version up to the revision of each object that belonged to this model at the
+        time. The versions are loaded with one query, no matter how many objects
+        there are.
+
+        Objects that have been deleted since are found through this model's
+        revisions (the related model has to follow this model, e.g.
+        `reversion.register(ProposalGeometry, follow=["proposal"])`). As reversion
+        doesn't record deletions, a deleted object is only taken to have existed at
+        the revision if it was saved in the most recent revision of the relation
+        up to `revision_id`.
+
+        Args:
+            revision_id (int):
+                The django reversion revision id
+            reverse_attr (str):
+                The attribute in the model to query for, e.g. "proposalgeometry"
+        """
+
+        if not hasattr(self, reverse_attr):
+            raise ValidationError(
+                f"{self.__class__.__name__} has no attribute {reverse_attr}"
+            )
+        related_manager = getattr(self, reverse_attr)
+        related_model = related_manager.model
+        foreign_key = related_manager.field.attname
+
+        current_ids = {
+            str(pk)
+            for pk in related_model.objects.filter(
+                **{foreign_key: self.pk}
+            ).values_list("pk", flat=True)
+        }
+        versions = (
+            Version.objects.get_for_model(related_model)
+            .filter(
+                Q(object_id__in=current_ids)
+                | Q(
+                    revision_id__in=Version.objects.get_for_object(self).values(
+                        "revision_id"
+                    )
+                ),
+                revision_id__lte=revision_id,
+            )
+            .select_related("revision")
+            .order_by("-revision_id", "-pk")
+        )
 
-        return list(set(rfk_versions))
+        latest_versions = {}
+        for version in versions:
+            latest_versions.setdefault(version.object_id, version)
+        if not latest_versions:
+            return []
+        last_revision_id = max(v.revision_id for v in latest_versions.values())
+
+        reverse_fk_versions = []
+        for object_id, version in latest_versions.items():
+            if object_id not in current_ids and version.revision_id != last_revision_id:
+                # Deleted before `revision_id`
+                continue
+            try:
+                if version.field_dict.get(foreign_key) != self.pk:
+                    # Belonged to another object at the time
+                    continue
+            except RevertError:
+                logger.exception(f"Error reverting object version {version.id}")
+                continue
+            reverse_fk_versions.append(version)
+
+        return sorted(reverse_fk_versions, key=lambda v: int(v.object_id))
 
     @property
     def created_date(self):
@@ -200,14 +275,37 @@ class UserAction(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.who_full_name:
-            email_user = retrieve_email_user(self.who)
-            if email_user:
-                self.who_full_name = email_user.get_full_name()
-            else:
-                self.who_full_name = "Anonymous User"
+            self.who_full_name = self.retrieve_full_name(self.who)
         super().save(*args, **kwargs)
         logger.info("Logged User Action: %s", self)
 
+    @staticmethod
+    def retrieve_full_name(who):
+        email_user = retrieve_email_user(who)
+        if email_user:
+            return email_user.get_full_name()
+        return "Anonymous User"
+
+    @classmethod
+    def log_actions(cls, user_actions):
+        """
+        Inserts a list of unsaved user actions with a single query.
+        `bulk_create` bypasses `save`, so the full names are resolved here,
+        once per user.
+        """
+
+        full_names = {}
+        for user_action in user_actions:
+            if not user_action.who_full_name:
+                if user_action.who not in full_names:
+                    full_names[user_action.who] = cls.retrieve_full_name(
+                        user_action.who
+                    )
+                user_action.who_full_name = full_names[user_action.who]
+        user_actions = cls.objects.bulk_create(user_actions)
+        logger.info("Logged %s %s entries", len(user_actions), cls.__name__)
+        return user_actions
+
     class Meta:
         abstract = True
         app_label = "leaseslicensing"
@@ -426,6 +524,36 @@ class LicensingModelVersioned(LicensingModel, RevisionedMixin):
 
         return self.revision_versions().filter(revision_id=revision_id)[0]
 
+    def revision_snapshot(self, revision_id, reverse_attrs=()):
+        """
+        Returns an unsaved instance of this model as it was at revision id
+        `revision_id`. The objects of the one-to-many relations `reverse_attrs` as
+        they were at the revision (see `reverse_fk_versions_at`) are put into the
+        instance's prefetch cache, e.g. `snapshot.proposalgeometry.all()` returns
+        the geometries at the revision. Relations to models that aren't tracked by
+        reversion are left to be queried as they are now.
+
+        Raises:
+            IndexError: When there is no version of this model for `revision_id`
+        """
+
+        instance = self.__class__(**self.revision_version(revision_id).field_dict)
+        instance._prefetched_objects_cache = {}
+        for reverse_attr in reverse_attrs:
+            related_manager = getattr(instance, reverse_attr)
+            related_model = related_manager.model
+            if not reversion.is_registered(related_model):
+                continue
+            queryset = related_manager.all()
+            queryset._result_cache = [
+                related_model(**version.field_dict)
+                for version in self.reverse_fk_versions_at(revision_id, reverse_attr)
+            ]
+            queryset._prefetch_done = True
+            instance._prefetched_objects_cache[reverse_attr] = queryset
+
+        return instance
+
 
 class BaseApplicant(RevisionedMixin):
     emailuser_id = models.IntegerField(null=True, blank=True)
@@ -536,3 +664,49 @@ class BaseApplicant(RevisionedMixin):
             )
             return
         return emailuser.log_user_action(action, request)
+
+
+class SearchIndexEntry(models.Model):
+    """
+    The searchable text of a proposal, approval or compliance, i.e. its lodgement
+    numbers, applicant or holder name, site name and tenure identifiers.
+    Kept up to date on save (see `leaseslicensing.components.main.search`).
+    """
+
+    OBJECT_TYPE_PROPOSAL = "proposal"
+    OBJECT_TYPE_APPROVAL = "approval"
+    OBJECT_TYPE_COMPLIANCE = "compliance"
+    OBJECT_TYPE_CHOICES = (
+        (OBJECT_TYPE_PROPOSAL, "Proposal"),
+        (OBJECT_TYPE_APPROVAL, "Approval"),
+        (OBJECT_TYPE_COMPLIANCE, "Compliance"),
+    )
+
+    object_type = models.CharField(max_length=20, choices=OBJECT_TYPE_CHOICES)
+    object_id = models.IntegerField()
+    # The lodgement number
+    reference = models.CharField(max_length=50, blank=True)
+    # The text displayed in the search results
+    title = models.CharField(max_length=255, blank=True)
+    text = models.TextField(blank=True)
+    search_vector = SearchVectorField(null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = "leaseslicensing"
+        unique_together = ("object_type", "object_id")
+        indexes = [
+            GinIndex(fields=["search_vector"], name="search_index_vector_idx"),
+            # Serves the `trigram_word_similar` lookup
+            GinIndex(
+                OpClass("text", name="gin_trgm_ops"), name="search_index_text_trgm_idx"
+            ),
+            # Serves the `icontains` lookup, which compares `UPPER(text)`
+            GinIndex(
+                OpClass(Upper("text"), name="gin_trgm_ops"),
+                name="search_index_utext_trgm_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_object_type_display()}: {self.reference}"
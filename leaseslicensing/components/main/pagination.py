@@ -0,0 +1,123 @@
+import hashlib
+import logging
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from rest_framework.response import Response
+from rest_framework_datatables.pagination import DatatablesPageNumberPagination
+from rest_framework_datatables.utils import get_param
+
+logger = logging.getLogger(__name__)
+
+
+def get_cached_total_count(queryset):
+    """
+    Returns the (unfiltered) total count of a queryset, cached by the queryset's SQL.
+    The total count is only used for the datatables `recordsTotal` value, so a
+    short-lived estimate is good enough and saves a `COUNT` on every dashboard request.
+    """
+
+    try:
+        sql = str(queryset.query)
+    except EmptyResultSet:
+        return 0
+
+    cache_key = settings.CACHE_KEY_DATATABLES_TOTAL_COUNT.format(
+        hashlib.md5(sql.encode("utf-8")).hexdigest()
+    )
+    total_count = cache.get(cache_key)
+    if total_count is None:
+        total_count = queryset.count()
+        cache.set(cache_key, total_count, settings.CACHE_TIMEOUT_1_MINUTE)
+
+    return total_count
+
+
+class DatatablesPagination(DatatablesPageNumberPagination):
+    """
+    Server-side pagination for datatables requests.
+
+    Slices the queryset by the request's `start` and `length` parameters (rather than
+    rounding `start` down to a page number) and reuses the counts the filter backends
+    store on the view.
+
+    An opt-in keyset mode is available for deep pages: when the request contains a
+    `cursor` parameter and the queryset is ordered by its primary key, rows are fetched
+    with `id > cursor` (or `id < cursor` for descending order) instead of an `OFFSET`.
+    The id of the last row on the page is returned as `cursor` in the response.
+    """
+
+    cursor_query_param = "cursor"
+    keyset_orderings = ["id", "-id", "pk", "-pk"]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.accepted_renderer.format != "datatables":
+            self.is_datatable_request = False
+            return super().paginate_queryset(queryset, request, view)
+
+        self.page_size_query_param = "length"
+        length = get_param(request, self.page_size_query_param)
+
+        if length == "-1":
+            return None
+        self.count, self.total_count = self.get_count_and_total_count(queryset, view)
+        self.is_datatable_request = True
+        self.request = request
+        self.cursor = None
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        cursor = get_param(request, self.cursor_query_param)
+        if cursor not in [None, ""]:
+            page = self.paginate_keyset(queryset, cursor, page_size)
+            if page is not None:
+                return page
+
+        try:
+            start = max(int(get_param(request, "start", 0)), 0)
+        except ValueError:
+            start = 0
+
+        end = start + page_size
+        return list(queryset[start:end])
+
+    def paginate_keyset(self, queryset, cursor, page_size):
+        """
+        Returns the page of rows following `cursor` or None if the queryset's ordering
+        does not allow keyset pagination.
+        """
+
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if len(ordering) == 0:
+            ordering = ["id"]
+        if len(ordering) > 1 or ordering[0] not in self.keyset_orderings:
+            logger.warning(
+                f"Keyset pagination requires ordering by primary key, not {ordering}. "
+                "Falling back to offset pagination."
+            )
+            return None
+
+        lookup = "pk__lt" if ordering[0].startswith("-") else "pk__gt"
+        page = list(queryset.filter(**{lookup: cursor})[:page_size])
+        if len(page) == page_size:
+            self.cursor = page[-1].pk
+
+        return page
+
+    def get_paginated_response(self, data):
+        if not self.is_datatable_request:
+            return super().get_paginated_response(data)
+
+        return Response(
+            OrderedDict(
+                [
+                    ("recordsTotal", self.total_count),
+                    ("recordsFiltered", self.count),
+                    ("cursor", self.cursor),
+                    ("data", data),
+                ]
+            )
+        )
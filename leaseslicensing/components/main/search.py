@@ -0,0 +1,365 @@
+"""
+A search index of the references, applicants, site names and tenure identifiers
+of proposals, approvals and compliances.
+"""
+
+import logging
+from collections import defaultdict
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Prefetch, Q, Value, When
+from django.urls import reverse
+
+from leaseslicensing.components.approvals.models import Approval
+from leaseslicensing.components.compliances.models import Compliance
+from leaseslicensing.components.main.models import SearchIndexEntry
+from leaseslicensing.components.proposals.models import Proposal, ProposalApplicant
+
+logger = logging.getLogger(__name__)
+
+SEARCH_RESULTS_PER_TYPE = 4
+
+# The lodgement number weighs more than the other text. The "simple" configuration
+# does not stem words, which would mangle names and reference numbers.
+SEARCH_VECTOR = SearchVector("reference", weight="A", config="simple") + SearchVector(
+    "text", weight="B", config="simple"
+)
+
+# The proposal fields in the entries of its approvals and compliances (see
+# `proposal_search_terms`). Applicants and tenure identifiers are separate models,
+# which update the entries themselves.
+PROPOSAL_TERM_FIELDS = {"org_applicant", "ind_applicant", "site_name"}
+# The proposal fields in its own entry (see `proposal_entry`)
+PROPOSAL_ENTRY_FIELDS = PROPOSAL_TERM_FIELDS | {
+    "lodgement_number",
+    "original_leaselicence_number",
+    "application_type",
+    "proposal_type",
+}
+
+DETAIL_URL_NAMES = {
+    SearchIndexEntry.OBJECT_TYPE_PROPOSAL: "internal-proposal-detail",
+    SearchIndexEntry.OBJECT_TYPE_APPROVAL: "internal-approval-detail",
+    SearchIndexEntry.OBJECT_TYPE_COMPLIANCE: "internal-compliance-detail",
+}
+
+
+def proposal_prefetches(prefix=""):
+    return [
+        Prefetch(
+            f"{prefix}proposalapplicant_set",
+            queryset=ProposalApplicant.objects.order_by("id"),
+            to_attr="prefetched_proposal_applicants",
+        ),
+        f"{prefix}identifiers__identifier",
+    ]
+
+
+def proposal_search_terms(proposal):
+    """Returns the applicant name, site name and tenure identifiers of a proposal"""
+
+    if proposal is None:
+        return []
+
+    terms = []
+    # Same as `ApprovalHistory.holder`, but without a placeholder for no applicant
+    if proposal.org_applicant:
+        terms.append(proposal.org_applicant.ledger_organisation_name)
+    elif proposal.ind_applicant and proposal.prefetched_proposal_applicants:
+        terms.append(proposal.prefetched_proposal_applicants[0].full_name)
+    if proposal.site_name:
+        terms.append(proposal.site_name.name)
+    terms.extend(
+        proposal_identifier.identifier.name
+        for proposal_identifier in proposal.identifiers.all()
+    )
+    return terms
+
+
+def search_text(*terms):
+    return " ".join(term.strip() for term in terms if term and term.strip())
+
+
+def proposal_entry(proposal):
+    return SearchIndexEntry(
+        object_type=SearchIndexEntry.OBJECT_TYPE_PROPOSAL,
+        object_id=proposal.id,
+        reference=proposal.lodgement_number or "",
+        title=f"{ proposal.lodgement_number }"
+        + f" - { proposal.application_type.name_display }"
+        + f" - { proposal.proposal_type.description } [Proposal]",
+        text=search_text(
+            proposal.lodgement_number,
+            proposal.original_leaselicence_number,
+            *proposal_search_terms(proposal),
+        ),
+    )
+
+
+def approval_entry(approval):
+    return SearchIndexEntry(
+        object_type=SearchIndexEntry.OBJECT_TYPE_APPROVAL,
+        object_id=approval.id,
+        reference=approval.lodgement_number or "",
+        title=f"{ approval.lodgement_number } [Approval]",
+        text=search_text(
+            approval.lodgement_number,
+            approval.original_leaselicence_number,
+            *proposal_search_terms(approval.current_proposal),
+        ),
+    )
+
+
+def compliance_entry(compliance):
+    return SearchIndexEntry(
+        object_type=SearchIndexEntry.OBJECT_TYPE_COMPLIANCE,
+        object_id=compliance.id,
+        reference=compliance.lodgement_number or "",
+        title=f"{ compliance.lodgement_number } [Compliance]",
+        text=search_text(
+            compliance.lodgement_number,
+            *proposal_search_terms(compliance.proposal),
+        ),
+    )
+
+
+def indexed_objects(object_type):
+    """Returns the queryset of an object type and the function building its entries"""
+
+    if object_type == SearchIndexEntry.OBJECT_TYPE_PROPOSAL:
+        queryset = Proposal.objects.select_related(
+            "application_type", "proposal_type", "org_applicant", "site_name"
+        ).prefetch_related(*proposal_prefetches())
+        return queryset, proposal_entry
+    if object_type == SearchIndexEntry.OBJECT_TYPE_APPROVAL:
+        queryset = Approval.objects.select_related(
+            "current_proposal__org_applicant", "current_proposal__site_name"
+        ).prefetch_related(*proposal_prefetches("current_proposal__"))
+        return queryset, approval_entry
+    if object_type == SearchIndexEntry.OBJECT_TYPE_COMPLIANCE:
+        queryset = Compliance.objects.select_related(
+            "proposal__org_applicant", "proposal__site_name"
+        ).prefetch_related(*proposal_prefetches("proposal__"))
+        return queryset, compliance_entry
+    raise ValueError(f"Unknown search index object type {object_type}")
+
+
+def update_search_index(object_type, ids):
+    """
+    Creates or updates the search index entries of the objects of `object_type` with
+    `ids` and removes the entries of objects that no longer exist.
+
+    Returns:
+        int: The number of created or updated entries
+    """
+
+    ids = set(ids)
+    if not ids:
+        return 0
+
+    queryset, build_entry = indexed_objects(object_type)
+    entries = [build_entry(obj) for obj in queryset.filter(id__in=ids)]
+    indexed_ids = [entry.object_id for entry in entries]
+    with transaction.atomic():
+        SearchIndexEntry.objects.filter(
+            object_type=object_type, object_id__in=ids.difference(indexed_ids)
+        ).delete()
+        SearchIndexEntry.objects.bulk_create(
+            entries,
+            update_conflicts=True,
+            unique_fields=["object_type", "object_id"],
+            update_fields=["reference", "title", "text", "updated_at"],
+        )
+        SearchIndexEntry.objects.filter(
+            object_type=object_type, object_id__in=indexed_ids
+        ).update(search_vector=SEARCH_VECTOR)
+
+    return len(entries)
+
+
+class PendingSearchIndexUpdates:
+    """
+    The search index updates requested in a transaction, which are run together
+    once it has been committed, rather than once per saved object. Like the
+    on_commit callback that runs them, they are discarded when the transaction, or
+    a savepoint that was active when they were requested, is rolled back.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        # The savepoints whose rollback discards the updates
+        self.savepoint_ids = set(connection.savepoint_ids)
+        self.ids = defaultdict(set)
+        # The proposals whose approvals and compliances have to be updated as well
+        self.related_proposal_ids = set()
+
+    @classmethod
+    def current(cls, connection):
+        """Returns the updates scheduled in the current transaction of `connection`"""
+
+        updates = getattr(connection, "pending_search_index_updates", None)
+        # Outside of a transaction, updates run as soon as they are scheduled
+        if updates is None or not connection.in_atomic_block:
+            return None
+        return updates
+
+    def schedule(self):
+        _discard_updates_on_rollback(self.connection)
+        self.connection.pending_search_index_updates = self
+        transaction.on_commit(self.run, using=self.connection.alias)
+
+    def discard(self):
+        if getattr(self.connection, "pending_search_index_updates", None) is self:
+            self.connection.pending_search_index_updates = None
+
+    def run(self):
+        self.discard()
+
+        # A stale search index entry must not fail the request that saved the object
+        try:
+            if self.related_proposal_ids:
+                self.ids[SearchIndexEntry.OBJECT_TYPE_APPROVAL].update(
+                    Approval.objects.filter(
+                        current_proposal_id__in=self.related_proposal_ids
+                    ).values_list("id", flat=True)
+                )
+                self.ids[SearchIndexEntry.OBJECT_TYPE_COMPLIANCE].update(
+                    Compliance.objects.filter(
+                        proposal_id__in=self.related_proposal_ids
+                    ).values_list("id", flat=True)
+                )
+            for object_type, ids in self.ids.items():
+                update_search_index(object_type, ids)
+        except Exception as e:
+            logger.exception(f"Failed to update the search index: {e}")
+
+
+def _discard_updates_on_rollback(connection):
+    """
+    Wraps the rollbacks of `connection`, so that they discard the pending search
+    index updates whose on_commit callback they drop
+    """
+
+    if getattr(connection, "discards_search_index_updates_on_rollback", False):
+        return
+    connection.discards_search_index_updates_on_rollback = True
+    rollback = connection.rollback
+    savepoint_rollback = connection.savepoint_rollback
+    close = connection.close
+
+    def discard(sid=None):
+        updates = getattr(connection, "pending_search_index_updates", None)
+        if updates is not None and (sid is None or sid in updates.savepoint_ids):
+            updates.discard()
+
+    def discarding_rollback():
+        try:
+            rollback()
+        finally:
+            discard()
+
+    def discarding_savepoint_rollback(sid):
+        try:
+            savepoint_rollback(sid)
+        finally:
+            discard(sid)
+
+    def discarding_close():
+        try:
+            close()
+        finally:
+            discard()
+
+    connection.rollback = discarding_rollback
+    connection.savepoint_rollback = discarding_savepoint_rollback
+    connection.close = discarding_close
+
+
+def _schedule_updates(object_type, ids, related_proposal_ids=()):
+    connection = transaction.get_connection()
+    updates = PendingSearchIndexUpdates.current(connection)
+    scheduled = updates is not None
+    if not scheduled:
+        updates = PendingSearchIndexUpdates(connection)
+    updates.ids[object_type].update(ids)
+    updates.related_proposal_ids.update(related_proposal_ids)
+    if not scheduled:
+        # Outside of a transaction, the updates run immediately
+        updates.schedule()
+
+
+def update_search_index_on_commit(object_type, ids):
+    _schedule_updates(object_type, ids)
+
+
+def update_proposal_search_index_on_commit(proposal_id, related=True):
+    """
+    Updates the entry of a proposal and, if `related`, the entries of the approvals
+    and compliances that include its applicant, site name and tenure identifiers
+    """
+
+    _schedule_updates(
+        SearchIndexEntry.OBJECT_TYPE_PROPOSAL,
+        [proposal_id],
+        [proposal_id] if related else [],
+    )
+
+
+def search(term, limit=SEARCH_RESULTS_PER_TYPE):
+    """
+    Returns up to `limit` entries per object type that match `term` by lodgement
+    number prefix, substring, trigram word similarity or full-text query.
+    Exact and prefix matches of the lodgement number rank first, then the entries
+    most similar to `term`.
+    """
+
+    term = term.strip()
+    entries = SearchIndexEntry.objects.all()
+    if term:
+        query = SearchQuery(term, config="simple", search_type="websearch")
+        entries = (
+            entries.filter(
+                Q(text__icontains=term)
+                | Q(text__trigram_word_similar=term)
+                | Q(search_vector=query)
+            )
+            .annotate(
+                reference_match=Case(
+                    When(reference__iexact=term, then=Value(2)),
+                    When(reference__istartswith=term, then=Value(1)),
+                    default=Value(0),
+                    output_field=IntegerField(),
+                ),
+                similarity=TrigramWordSimilarity(term, "text"),
+                rank=SearchRank(F("search_vector"), query),
+            )
+            .order_by("-reference_match", "-similarity", "-rank", "object_id")
+        )
+    else:
+        entries = entries.order_by("object_id")
+
+    results = []
+    for object_type, _ in SearchIndexEntry.OBJECT_TYPE_CHOICES:
+        results.extend(entries.filter(object_type=object_type)[:limit])
+    return results
+
+
+def search_results(term):
+    """Returns the search results in the format of the search reference endpoint"""
+
+    return [
+        {
+            "id": entry.object_id,
+            "text": entry.title,
+            "redirect_url": reverse(
+                DETAIL_URL_NAMES[entry.object_type], kwargs={"pk": entry.object_id}
+            ),
+        }
+        for entry in search(term)
+    ]
@@ -14,10 +14,34 @@ from leaseslicensing.components.main.models import (
 )
 from leaseslicensing.components.main.utils import get_secure_document_url
 from leaseslicensing.helpers import get_model_by_lodgement_number
+from leaseslicensing.ledger_api_utils import prefetch_email_users
 
 logger = logging.getLogger(__name__)
 
 
+class EmailUserPrefetchListSerializer(serializers.ListSerializer):
+    """
+    Loads the ledger email users referenced by a page of objects with one query before
+    the objects are serialized, so that the child serializer's `retrieve_email_user`
+    calls are answered from the request's identity map.
+
+    The child serializer lists the fields holding email user ids in
+    `Meta.email_user_fields`.
+    """
+
+    def to_representation(self, data):
+        if hasattr(data, "all"):
+            data = data.all()
+        data = list(data)
+
+        email_user_fields = getattr(self.child.Meta, "email_user_fields", [])
+        prefetch_email_users(
+            getattr(obj, field) for obj in data for field in email_user_fields
+        )
+
+        return super().to_representation(data)
+
+
 class CommunicationLogEntrySerializer(serializers.ModelSerializer):
     customer = serializers.PrimaryKeyRelatedField(
         queryset=EmailUser.objects.all(), required=False
@@ -0,0 +1,92 @@
+import logging
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from leaseslicensing.cache import invalidate_cache_namespace
+from leaseslicensing.components.approvals.models import Approval, ApprovalType
+from leaseslicensing.components.compliances.models import Compliance
+from leaseslicensing.components.main.models import ApplicationType, SearchIndexEntry
+from leaseslicensing.components.main.search import (
+    PROPOSAL_ENTRY_FIELDS,
+    PROPOSAL_TERM_FIELDS,
+    update_proposal_search_index_on_commit,
+    update_search_index_on_commit,
+)
+from leaseslicensing.components.proposals.models import (
+    Proposal,
+    ProposalApplicant,
+    ProposalIdentifier,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def invalidate_on_commit(namespace):
+    transaction.on_commit(partial(invalidate_cache_namespace, namespace))
+
+
+@receiver(post_save, sender=ApplicationType)
+@receiver(post_delete, sender=ApplicationType)
+def invalidate_application_types(sender, **kwargs):
+    invalidate_on_commit(settings.CACHE_NAMESPACE_APPLICATION_TYPES)
+
+
+@receiver(post_save, sender=ApprovalType)
+@receiver(post_delete, sender=ApprovalType)
+def invalidate_approval_types(sender, **kwargs):
+    invalidate_on_commit(settings.CACHE_NAMESPACE_APPROVAL_TYPES)
+
+
+@receiver(pre_save, sender=Proposal)
+def record_proposal_indexed_changes(sender, instance, **kwargs):
+    # The dirty fields are reset once the proposal has been saved
+    instance._indexed_changes = (
+        set(instance.get_dirty_fields(check_relationship=True)) & PROPOSAL_ENTRY_FIELDS
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Proposal)
+def update_proposal_search_index(sender, instance, created=False, **kwargs):
+    changes = getattr(instance, "_indexed_changes", None)
+    if created or changes is None:
+        update_proposal_search_index_on_commit(instance.id)
+    elif changes:
+        # The entries of the proposal's approvals and compliances only change with
+        # the applicant and site name
+        update_proposal_search_index_on_commit(
+            instance.id, related=bool(changes & PROPOSAL_TERM_FIELDS)
+        )
+
+
+@receiver(post_delete, sender=Proposal)
+def delete_proposal_search_index(sender, instance, **kwargs):
+    update_proposal_search_index_on_commit(instance.id)
+
+
+@receiver(post_save, sender=ProposalApplicant)
+@receiver(post_delete, sender=ProposalApplicant)
+@receiver(post_save, sender=ProposalIdentifier)
+@receiver(post_delete, sender=ProposalIdentifier)
+def update_proposal_details_search_index(sender, instance, **kwargs):
+    if instance.proposal_id:
+        update_proposal_search_index_on_commit(instance.proposal_id)
+
+
+@receiver(post_save, sender=Approval)
+@receiver(post_delete, sender=Approval)
+def update_approval_search_index(sender, instance, **kwargs):
+    update_search_index_on_commit(SearchIndexEntry.OBJECT_TYPE_APPROVAL, [instance.id])
+
+
+@receiver(post_save, sender=Compliance)
+@receiver(post_delete, sender=Compliance)
+def update_compliance_search_index(sender, instance, **kwargs):
+    update_search_index_on_commit(
+        SearchIndexEntry.OBJECT_TYPE_COMPLIANCE, [instance.id]
+    )
@@ -0,0 +1,357 @@
+import os
+import stat
+import sys
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+import geopandas as gpd
+import shapely
+from django.conf import settings
+from django.contrib.gis.geos import MultiPolygon, Polygon
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.utils import timezone
+
+from leaseslicensing.cache import LRUCache, TwoTierCache
+from leaseslicensing.components.main.document_conversion import (
+    ConversionJob,
+    DocumentConversionError,
+    DocumentConverter,
+)
+from leaseslicensing.components.main.models import ApplicationType, SearchIndexEntry
+from leaseslicensing.components.main.search import (
+    proposal_search_terms,
+    search_text,
+)
+from leaseslicensing.components.main.utils import (
+    DEFAULT_WFS_SRS_NAME,
+    get_features_by_multipolygon,
+    intersects_any,
+    polygons_intersections_with_layer,
+    read_shapefile_polygons,
+)
+from leaseslicensing.components.proposals.models import Proposal
+from leaseslicensing.components.tenure.models import GISLayer, GISLayerFeature
+from leaseslicensing.cron import CronJobResult, run_cron_job
+from leaseslicensing.helpers import SystemGroupMembers, belongs_to
+
+LAYER_NAME = "kaartdijin-boodja-public:CPT_DBCA_REGIONS"
+
+
+class GISLayerCacheTestCase(TestCase):
+    def setUp(self):
+        self.layer = GISLayer.objects.create(
+            layer_name=LAYER_NAME,
+            properties=["DRG_REGION_NAME"],
+            srs_name=DEFAULT_WFS_SRS_NAME,
+            synced_at=timezone.now(),
+        )
+        GISLayerFeature.objects.create(
+            layer=self.layer,
+            properties={"DRG_REGION_NAME": "SWAN"},
+            geometry=Polygon(((0, 0), (0, 2), (2, 2), (2, 0), (0, 0)), srid=4326),
+        )
+
+    def get_features(self, polygon):
+        return get_features_by_multipolygon(
+            MultiPolygon(polygon, srid=4326),
+            "https://geoserver.example",
+            LAYER_NAME,
+            "DRG_REGION_NAME",
+            version="2.0.0",
+            the_geom="SHAPE",
+        )
+
+    @mock.patch("leaseslicensing.components.main.utils.get_gis_session")
+    def test_warm_cache_does_not_call_geoserver(self, get_gis_session):
+        features = self.get_features(
+            Polygon(((1, 1), (1, 3), (3, 3), (3, 1), (1, 1)), srid=4326)
+        )
+        self.assertEqual(features["totalFeatures"], 1)
+        self.assertEqual(
+            features["features"][0]["properties"], {"DRG_REGION_NAME": "SWAN"}
+        )
+
+        features = self.get_features(
+            Polygon(((5, 5), (5, 6), (6, 6), (6, 5), (5, 5)), srid=4326)
+        )
+        self.assertEqual(features["totalFeatures"], 0)
+        get_gis_session.return_value.post.assert_not_called()
+
+    @mock.patch("leaseslicensing.components.main.utils.get_gis_session")
+    def test_stale_cache_falls_back_to_geoserver(self, get_gis_session):
+        self.layer.synced_at = timezone.now() - timedelta(days=30)
+        self.layer.save()
+        post = get_gis_session.return_value.post
+        post.return_value.json.return_value = {"totalFeatures": 0, "features": []}
+
+        self.get_features(Polygon(((1, 1), (1, 3), (3, 3), (3, 1), (1, 1)), srid=4326))
+        post.assert_called_once()
+
+    @mock.patch("leaseslicensing.components.main.utils.get_gis_session")
+    def test_polygons_intersections_with_layer(self, get_gis_session):
+        polygons = [
+            Polygon(((1, 1), (1, 3), (3, 3), (3, 1), (1, 1)), srid=4326),
+            Polygon(((5, 5), (5, 6), (6, 6), (6, 5), (5, 5)), srid=4326),
+        ]
+        intersections = polygons_intersections_with_layer(
+            polygons, "https://geoserver.example", LAYER_NAME, "2.0.0", "SHAPE"
+        )
+
+        self.assertEqual(intersections, [True, False])
+        get_gis_session.return_value.post.assert_not_called()
+
+
+class ShapefilePolygonsTestCase(SimpleTestCase):
+    def test_read_shapefile_polygons(self):
+        geometries = [
+            shapely.MultiPolygon([shapely.box(0, 0, 1, 1), shapely.box(2, 0, 3, 1)]),
+            shapely.box(5, 5, 6, 6),
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "test.shp")
+            gpd.GeoDataFrame(geometry=geometries, crs="epsg:4326").to_file(path)
+            polygons = read_shapefile_polygons(path, "test.shp")
+
+        # The multipolygon is exploded into its polygons
+        self.assertEqual(len(polygons), 3)
+        self.assertEqual(set(shapely.get_type_id(polygons)), {3})
+
+        layer = [shapely.box(0.5, 0.5, 2.5, 2.5)]
+        self.assertEqual(intersects_any(polygons, layer).tolist(), [True, True, False])
+        self.assertEqual(intersects_any(polygons, []).tolist(), [False] * 3)
+
+
+# Stands in for LibreOffice: keeps running when started as a listener and "converts"
+# documents by copying them, unless they contain "fail". Like LibreOffice, it locks its
+# profile while it runs, and a command with a profile that is locked by another process
+# is handed over to that process, so converts nothing itself.
+FAKE_LIBREOFFICE = """
+import os, shutil, sys, time, urllib.parse
+args = sys.argv[1:]
+profile = next(
+    urllib.parse.urlparse(arg.split("=", 1)[1]).path
+    for arg in args
+    if arg.startswith("-env:UserInstallation=")
+)
+lock = os.path.join(profile, ".lock")
+try:
+    os.close(os.open(lock, os.O_CREAT | os.O_EXCL))
+except FileExistsError:
+    sys.exit()
+try:
+    if any(arg.startswith("--accept") for arg in args):
+        time.sleep(60)
+        sys.exit()
+    time.sleep(0.1)
+    outdir = args[args.index("--outdir") + 1]
+    os.makedirs(outdir, exist_ok=True)
+    for path in args:
+        if path.endswith(".docx") and b"fail" not in open(path, "rb").read():
+            shutil.copy(path, os.path.join(outdir, os.path.basename(path)[:-5] + ".pdf"))
+finally:
+    os.remove(lock)
+"""
+
+
+class DocumentConverterTestCase(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        command = os.path.join(directory.name, "libreoffice")
+        with open(command, "w") as f:
+            f.write(f"#!{sys.executable}\n{FAKE_LIBREOFFICE}")
+        os.chmod(command, os.stat(command).st_mode | stat.S_IEXEC)
+
+        self.converter = DocumentConverter(
+            workers=2, batch_size=3, command=command, timeout=10
+        )
+        self.addCleanup(self.converter.shutdown)
+
+    def test_convert(self):
+        documents = [(f"licence_{i}.docx", f"licence {i}".encode()) for i in range(7)]
+        converted = self.converter.convert(documents)
+
+        self.assertEqual(
+            [buffer.getvalue() for buffer in converted],
+            [content for _, content in documents],
+        )
+
+    def test_failed_conversion(self):
+        future = self.converter.submit(b"fail", "licence.docx")
+        with self.assertRaises(DocumentConversionError):
+            future.result()
+        self.assertEqual(self.converter.submit(b"ok").result().getvalue(), b"ok")
+
+    def test_profile_in_use(self):
+        # E.g. a LibreOffice process that was left running with the worker's profile
+        worker = self.converter._workers[0]
+        lock = os.path.join(worker.profile_directory, ".lock")
+        open(lock, "w").close()
+        self.addCleanup(os.remove, lock)
+
+        job = ConversionJob("licence.docx", b"licence", "pdf")
+        worker.convert([job])
+        with self.assertRaises(DocumentConversionError):
+            job.future.result()
+
+
+class SearchTextTestCase(SimpleTestCase):
+    def test_proposal_search_terms(self):
+        # `name` is a constructor argument of Mock, so it is set afterwards
+        identifier = mock.Mock()
+        identifier.name = "R 30490"
+        identifiers = mock.Mock()
+        identifiers.all.return_value = [mock.Mock(identifier=identifier)]
+        proposal = mock.Mock(
+            org_applicant=None,
+            ind_applicant=1,
+            prefetched_proposal_applicants=[mock.Mock(full_name="Jo Bloggs")],
+            site_name=None,
+            identifiers=identifiers,
+        )
+
+        terms = proposal_search_terms(proposal)
+        self.assertEqual(terms, ["Jo Bloggs", "R 30490"])
+        self.assertEqual(
+            search_text("P000001", None, " ", *terms), "P000001 Jo Bloggs R 30490"
+        )
+        self.assertEqual(proposal_search_terms(None), [])
+
+
+@mock.patch("leaseslicensing.components.main.search.update_search_index")
+class SearchIndexUpdatesTestCase(TestCase):
+    def setUp(self):
+        self.application_type = ApplicationType.objects.create(
+            name=settings.APPLICATION_TYPE_LEASE_LICENCE
+        )
+
+    def test_updates_run_once_per_transaction(self, update_search_index):
+        with self.captureOnCommitCallbacks(execute=True):
+            proposal = Proposal.objects.create(application_type=self.application_type)
+            proposal.ind_applicant = 1
+            proposal.save()
+        # Once for each object type, the proposal has no approvals or compliances
+        self.assertEqual(update_search_index.call_count, 3)
+        update_search_index.assert_any_call(
+            SearchIndexEntry.OBJECT_TYPE_PROPOSAL, {proposal.id}
+        )
+
+    def test_only_indexed_changes_update_the_index(self, update_search_index):
+        with self.captureOnCommitCallbacks(execute=True):
+            proposal = Proposal.objects.create(application_type=self.application_type)
+        update_search_index.reset_mock()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            proposal.processing_status = Proposal.PROCESSING_STATUS_WITH_ASSESSOR
+            proposal.save()
+        update_search_index.assert_not_called()
+
+        # The approvals and compliances don't include the original lease number
+        with self.captureOnCommitCallbacks(execute=True):
+            proposal.original_leaselicence_number = "L000001"
+            proposal.save()
+        update_search_index.assert_called_once_with(
+            SearchIndexEntry.OBJECT_TYPE_PROPOSAL, {proposal.id}
+        )
+
+    def test_rolled_back_updates_are_discarded(self, update_search_index):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(ValueError):
+                with transaction.atomic():
+                    Proposal.objects.create(application_type=self.application_type)
+                    raise ValueError
+            proposal = Proposal.objects.create(application_type=self.application_type)
+        # The updates of the rolled back savepoint don't swallow the later ones
+        update_search_index.assert_any_call(
+            SearchIndexEntry.OBJECT_TYPE_PROPOSAL, {proposal.id}
+        )
+
+
+class LRUCacheTestCase(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        lru_cache = LRUCache(maxsize=2, timeout=60)
+        lru_cache.set_many({1: "one", 2: "two"})
+        self.assertEqual(lru_cache.get_many([1]), {1: "one"})
+
+        lru_cache.set_many({3: "three"})
+        self.assertEqual(lru_cache.get_many([1, 2, 3]), {1: "one", 3: "three"})
+
+    def test_expires_entries(self):
+        lru_cache = LRUCache(maxsize=2, timeout=-1)
+        lru_cache.set_many({1: "one"})
+        self.assertEqual(lru_cache.get_many([1]), {})
+
+
+class SystemGroupMembershipTestCase(SimpleTestCase):
+    @mock.patch.object(
+        SystemGroupMembers,
+        "get_members",
+        return_value={"Assessor": frozenset([1]), "Approver": frozenset([2])},
+    )
+    def test_memberships_are_loaded_once_per_request(self, get_members):
+        request = RequestFactory().get("/")
+        request.user = mock.Mock(id=1, is_authenticated=True, is_superuser=False)
+
+        self.assertTrue(belongs_to(request, "Assessor"))
+        self.assertFalse(belongs_to(request, "Approver"))
+        self.assertFalse(belongs_to(request, "Finance"))
+        get_members.assert_called_once()
+
+
+class TwoTierCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        self.shared = LocMemCache("shared", {})
+        self.cache = TwoTierCache(
+            "two-tier-cache-test", {"OPTIONS": {"LOCAL_MAX_ENTRIES": 2}}
+        )
+        self.cache._local.clear()
+        patcher = mock.patch.object(
+            TwoTierCache, "shared", new_callable=mock.PropertyMock
+        )
+        patcher.start().return_value = self.shared
+        self.addCleanup(patcher.stop)
+
+    def test_reads_from_the_local_tier_first(self):
+        self.cache.set("key", {"a": 1})
+        self.shared.clear()
+        self.assertEqual(self.cache.get("key"), {"a": 1})
+
+        self.cache._local.clear()
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_fills_the_local_tier_from_the_shared_tier(self):
+        self.cache.set("key", 1)
+        self.cache._local.clear()
+        stats = self.cache.stats()
+
+        self.assertEqual(self.cache.get("key"), 1)
+        self.assertEqual(self.cache.get("key"), 1)
+        self.assertEqual(self.cache.stats()["shared_hits"], stats["shared_hits"] + 1)
+        self.assertEqual(self.cache.stats()["local_hits"], stats["local_hits"] + 1)
+
+    def test_invalidate_namespace(self):
+        self.cache.set("ledger:emailuser-1", 1)
+        self.cache.set("proposals:map-proposals", 2)
+        self.cache.invalidate_namespace("ledger")
+
+        self.assertIsNone(self.cache.get("ledger:emailuser-1"))
+        self.assertEqual(self.cache.get("proposals:map-proposals"), 2)
+
+
+@mock.patch("leaseslicensing.cron.load_command_class")
+@mock.patch("leaseslicensing.cron.get_commands", return_value={"job": "app"})
+class RunCronJobTestCase(SimpleTestCase):
+    @mock.patch("leaseslicensing.cron.call_command", side_effect=SystemExit(1))
+    def test_system_exit_fails_the_job(self, call_command, *mocks):
+        result = run_cron_job("job")
+
+        self.assertEqual(result.status, CronJobResult.STATUS_FAILED)
+        self.assertIn("SystemExit", result.error)
+
+    @mock.patch("leaseslicensing.cron.call_command", side_effect=KeyboardInterrupt)
+    def test_keyboard_interrupt_is_raised(self, call_command, *mocks):
+        with self.assertRaises(KeyboardInterrupt):
+            run_cron_job("job")
@@ -3,28 +3,38 @@ import logging
 import os
 import re
 import sys
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 from zipfile import ZipFile
 
 import geopandas as gpd
+import numpy as np
 import pytz
 import requests
+import shapely
 from django.apps import apps
 from django.conf import settings
-from django.contrib.gis.gdal import SpatialReference
 from django.contrib.gis.geos import GEOSGeometry, Polygon
 from django.contrib.gis.geos.collections import MultiPolygon
 from django.core.cache import cache
+from django.db import connections, transaction
 from django.db.models import Q
 from django.utils import timezone
 from ledger_api_client.ledger_models import EmailUserRO as EmailUser
+from requests.adapters import HTTPAdapter
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from reversion import revisions
 
 from leaseslicensing.components.tenure.models import (
     LGA,
     Act,
     Category,
     District,
+    GISLayer,
+    GISLayerFeature,
     Identifier,
     Name,
     Region,
@@ -32,6 +42,7 @@ from leaseslicensing.components.tenure.models import (
     Tenure,
     Vesting,
 )
+from leaseslicensing.ledger_api_utils import prefetch_email_users, retrieve_email_user
 
 logger = logging.getLogger(__name__)
 
@@ -85,12 +96,11 @@ def get_dbca_lands_and_waters_geojson():
 
 def get_dbca_lands_and_waters_geos():
     geojson = get_dbca_lands_and_waters_geojson()
-    geoms = []
-    for feature in geojson.get("features"):
-        feature_geom = feature.get("geometry")
-        geos_geom = GEOSGeometry(f"{feature_geom}").prepared
-        geoms.append(geos_geom)
-    return geoms
+    return [
+        GEOSGeometry(json.dumps(feature["geometry"])).prepared
+        for feature in geojson.get("features")
+        if feature.get("geometry")
+    ]
 
 
 def tenure_layer_specification():
@@ -116,26 +126,105 @@ def invert_xy_coordinates(polygons):
     return polygons
 
 
-def get_features_by_multipolygon(
-    multipolygon,
-    server_url,
-    layer_name,
-    properties,
-    version="1.0.0",
-    the_geom="wkb_geometry",
-    srsName="urn:x-ogc:def:crs:EPSG:4326",
-):
-    """Queries a geoserver for features that intersect with a multipolygon
-    and returns the response as a dict
+DEFAULT_WFS_SRS_NAME = "urn:x-ogc:def:crs:EPSG:4326"
+
+GIS_LANDS_AND_WATERS_PROPERTIES = [
+    "leg_identifier",
+    "leg_vesting",
+    "leg_name",
+    "leg_tenure",
+    "leg_act",
+    "leg_category",
+]
+GIS_REGION_PROPERTIES = [
+    "DRG_REGION_NAME",  # KB
+]
+GIS_DISTRICT_PROPERTIES = [["district", "ADMIN_ZONE"]]
+GIS_LGA_PROPERTIES = [
+    "lga_label",
+]
+
+# Upper bounds (in seconds) of the geoserver request latency histogram buckets
+GIS_LAYER_LATENCY_BUCKETS = [0.25, 0.5, 1, 2.5, 5, 10, 30]
+
+_gis_session = None
+_gis_session_lock = threading.Lock()
+
+
+def gis_layer_specifications():
+    """The layers queried by `populate_gis_data` and the tenure layer geometries are
+    validated against, which are synced to the local GIS layer cache by the
+    `sync_gis_layers` management command"""
+
+    tenure_layer = tenure_layer_specification()
+    return [
+        {
+            "layer_name": layer_name,
+            "properties": [(p[1] if isinstance(p, list) else p) for p in properties],
+        }
+        for layer_name, properties, save in gis_data_layers()
+    ] + [
+        {
+            "layer_name": tenure_layer["layer_name"],
+            "properties": tenure_layer["properties"].split(","),
+        }
+    ]
+
+
+def get_gis_session():
+    """Returns the requests session shared by all threads querying the geoserver,
+    so connections are pooled and kept alive between requests"""
+
+    global _gis_session
+    with _gis_session_lock:
+        if _gis_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _gis_session = session
+    return _gis_session
+
+
+def record_gis_layer_latency(layer_name, seconds):
+    """Adds a geoserver request duration to the layer's latency histogram. Concurrent
+    requests may overwrite each other's update, so the counts are approximate."""
+
+    cache_key = settings.CACHE_KEY_GIS_LAYER_LATENCY.format(layer_name)
+    histogram = cache.get(cache_key)
+    if histogram is None:
+        histogram = {
+            "buckets": GIS_LAYER_LATENCY_BUCKETS + ["+Inf"],
+            "counts": [0] * (len(GIS_LAYER_LATENCY_BUCKETS) + 1),
+            "count": 0,
+            "sum": 0,
+        }
+    histogram["counts"][bisect_left(GIS_LAYER_LATENCY_BUCKETS, seconds)] += 1
+    histogram["count"] += 1
+    histogram["sum"] += seconds
+    cache.set(cache_key, histogram, settings.CACHE_TIMEOUT_NEVER)
+
+
+def get_gis_layer_latencies():
+    """Returns the latency histogram of each layer queried by `populate_gis_data`"""
+
+    return {
+        spec["layer_name"]: cache.get(
+            settings.CACHE_KEY_GIS_LAYER_LATENCY.format(spec["layer_name"])
+        )
+        for spec in gis_layer_specifications()
+    }
+
+
+def get_wfs_features(server_url, layer_name, params, timeout=None):
+    """Posts a WFS GetFeature request for a layer to a geoserver and returns the
+    response as a dict
 
     Args:
-        multipolygon (shapely.geometry.MultiPolygon): A multipolygon geometry
         server_url (str): The URL of the geoserver
-        layer_name (str): The name of the layer to query
-        properties (str): A comma separated list of properties to return
-        version (str): The WFS version to use
-        the_geom (str): The name of the geometry column in the layer
-        srsName (str): The name of the spatial reference system to return the data in
+        layer_name (str): The name of the layer to query, optionally with namespace
+        params (dict): The request parameters, without `typeName`
+        timeout (int): Seconds to wait for the response, defaults to settings.GIS_SERVER_TIMEOUT
     """
 
     namespace = ""
@@ -147,32 +236,32 @@ def get_features_by_multipolygon(
         server_path = f"/geoserver/{namespace}/ows"
 
     logger.debug(f"Namespace: {namespace}, Layer Title: {layer_title}")
-    params = {
-        "service": "WFS",
-        "version": version,
-        "request": "GetFeature",
-        "typeName": layer_title,
-        "maxFeatures": "5000",
-        "srsName": srsName,  # using the default projection for open layers and geodjango
-        "outputFormat": "application/json",
-        "propertyName": properties,
-        "CQL_FILTER": f"INTERSECTS({the_geom}, {multipolygon.wkt})",
-    }
+    params = {**params, "typeName": layer_title}
     logger.info(
         f"Requesting features from {server_url}{server_path} with params: {params}"
     )
+    auth = None
     if "public" not in namespace:
         logger.debug("Using Basic HTTP Auth to access namespace: %s", namespace)
-        url = f"{server_url}{server_path}"
         # Not sure we land here anymore with kb being the geoserver,
         # but if we do, the authentication needs to be adjusted
-        response = requests.post(
-            url,
+        auth = (settings.KMI_AUTH_USERNAME, settings.KMI_AUTH_PASSWORD)
+
+    started = time.perf_counter()
+    try:
+        response = get_gis_session().post(
+            f"{server_url}{server_path}",
             data=params,
-            auth=(settings.KMI_AUTH_USERNAME, settings.KMI_AUTH_PASSWORD),
+            auth=auth,
+            timeout=timeout or settings.GIS_SERVER_TIMEOUT,
         )
-    else:
-        response = requests.post(f"{server_url}{server_path}", data=params)
+    except requests.Timeout:
+        logger.error(f"Timed out getting features from {server_url}: {layer_name}")
+        raise serializers.ValidationError(
+            f"Timed out getting features from geoserver (Server URL: {server_url}, Layer: {layer_name}"
+        )
+    finally:
+        record_gis_layer_latency(layer_name, time.perf_counter() - started)
     if not response.ok:
         logger.error(f"Error getting features from {server_url}: {response.text}")
         raise serializers.ValidationError(
@@ -191,28 +280,180 @@ def get_features_by_multipolygon(
         )
 
 
-def get_gis_data_for_geometries(
-    instance,
-    geometries_attribute,
+def get_current_gis_layer(layer_name, srsName=DEFAULT_WFS_SRS_NAME, properties=()):
+    """Returns the local copy of a layer or None when the layer has not been synced,
+    is out of date, or does not hold all of `properties`"""
+
+    try:
+        layer = GISLayer.objects.get(layer_name=layer_name, srs_name=srsName)
+    except GISLayer.DoesNotExist:
+        return None
+
+    if not layer.is_current or not set(properties).issubset(layer.properties):
+        logger.debug(f"Local copy of layer {layer_name} can not be used")
+        return None
+
+    return layer
+
+
+def get_cached_features_by_multipolygon(
+    multipolygon, layer_name, properties, srsName=DEFAULT_WFS_SRS_NAME
+):
+    """Queries the local copy of a layer for features that intersect with a
+    multipolygon and returns them in the format of a geoserver response.
+
+    Returns None when the layer has not been synced, is out of date, or does not
+    hold all of the requested properties.
+
+    Args:
+        multipolygon (MultiPolygon): A GEOS or shapely multipolygon geometry
+        layer_name (str): The name of the layer to query
+        properties (str): A comma separated list of properties to return
+        srsName (str): The name of the spatial reference system of the geometry
+    """
+
+    properties = properties.split(",")
+    layer = get_current_gis_layer(layer_name, srsName, properties)
+    if layer is None:
+        return None
+
+    if not isinstance(multipolygon, GEOSGeometry):
+        # E.g. a shapely geometry returned by `make_valid`
+        multipolygon = GEOSGeometry(multipolygon.wkt, srid=4326)
+
+    features = [
+        {"properties": {prop: feature_properties.get(prop) for prop in properties}}
+        for feature_properties in layer.features.filter(
+            geometry__intersects=multipolygon
+        ).values_list("properties", flat=True)
+    ]
+    logger.info(f"Found {len(features)} features in local copy of layer {layer_name}")
+
+    return {"totalFeatures": len(features), "features": features}
+
+
+def get_features_by_multipolygon(
+    multipolygon,
     server_url,
     layer_name,
-    feature_properties,
+    properties,
     version="1.0.0",
     the_geom="wkb_geometry",
-    invert_xy=False,
+    srsName=DEFAULT_WFS_SRS_NAME,
 ):
-    """Takes a model instance, the name of the related geometries attribute, the layer name
-    and a list of property names and returns a dict of unique values for each property
+    """Queries a geoserver for features that intersect with a multipolygon
+    and returns the response as a dict. The local copy of the layer is queried
+    instead when it is available (see `sync_gis_layer`).
 
     Args:
-        instance (object): An instance of a model
-        geometries_attribute (str): The name of the related geometries attribute
+        multipolygon (shapely.geometry.MultiPolygon): A multipolygon geometry
         server_url (str): The URL of the geoserver
         layer_name (str): The name of the layer to query
-        feature_properties (list): A list of property names to get unique values for,
-            or a list of lists of model name and gis property name when they differ too much
+        properties (str): A comma separated list of properties to return
         version (str): The WFS version to use
         the_geom (str): The name of the geometry column in the layer
+        srsName (str): The name of the spatial reference system to return the data in
+    """
+
+    features = get_cached_features_by_multipolygon(
+        multipolygon, layer_name, properties, srsName
+    )
+    if features is not None:
+        return features
+
+    params = {
+        "service": "WFS",
+        "version": version,
+        "request": "GetFeature",
+        "maxFeatures": "5000",
+        "srsName": srsName,  # using the default projection for open layers and geodjango
+        "outputFormat": "application/json",
+        "propertyName": properties,
+        "CQL_FILTER": f"INTERSECTS({the_geom}, {multipolygon.wkt})",
+    }
+    return get_wfs_features(server_url, layer_name, params)
+
+
+def sync_gis_layer(
+    server_url,
+    layer_name,
+    properties,
+    version="2.0.0",
+    the_geom="SHAPE",
+    srsName=DEFAULT_WFS_SRS_NAME,
+    page_size=5000,
+):
+    """Downloads all features of a layer from a geoserver and replaces the local
+    copy of the layer with them
+
+    Args:
+        server_url (str): The URL of the geoserver
+        layer_name (str): The name of the layer to sync
+        properties (list): The feature properties to keep
+        version (str): The WFS version to use
+        the_geom (str): The name of the geometry column in the layer
+        srsName (str): The name of the spatial reference system to store the data in
+        page_size (int): The number of features to request at a time
+
+    Returns:
+        GISLayer: The synced layer
+    """
+
+    count_param = "count" if version.startswith("2") else "maxFeatures"
+    features = []
+    while True:
+        params = {
+            "service": "WFS",
+            "version": version,
+            "request": "GetFeature",
+            count_param: page_size,
+            "startIndex": len(features),
+            "srsName": srsName,
+            "outputFormat": "application/json",
+            "propertyName": ",".join(properties + [the_geom]),
+        }
+        # Whole pages of features take much longer than an intersection query
+        page = get_wfs_features(
+            server_url, layer_name, params, timeout=settings.GIS_SERVER_TIMEOUT * 10
+        )["features"]
+        features += page
+        if len(page) < page_size:
+            break
+
+    with transaction.atomic():
+        layer, created = GISLayer.objects.get_or_create(layer_name=layer_name)
+        layer.features.all().delete()
+        layer_features = GISLayerFeature.objects.bulk_create(
+            [
+                GISLayerFeature(
+                    layer=layer,
+                    properties={
+                        prop: feature["properties"].get(prop) for prop in properties
+                    },
+                    geometry=GEOSGeometry(json.dumps(feature["geometry"])),
+                )
+                for feature in features
+                if feature.get("geometry")
+            ],
+            batch_size=1000,
+        )
+        layer.properties = properties
+        layer.srs_name = srsName
+        layer.feature_count = len(layer_features)
+        layer.synced_at = timezone.now()
+        layer.save()
+
+    logger.info(f"Synced {layer.feature_count} features of layer {layer_name}")
+    return layer
+
+
+def get_gis_multipolygon(instance, geometries_attribute, invert_xy=False):
+    """Returns the related geometries of a model instance as one valid multipolygon,
+    or None if the instance has no geometries
+
+    Args:
+        instance (object): An instance of a model
+        geometries_attribute (str): The name of the related geometries attribute
         invert_xy (bool): Whether to first transform geometries in lon/lat to lat/lon
     """
     if not hasattr(instance, geometries_attribute):
@@ -221,7 +462,6 @@ def get_gis_data_for_geometries(
         )
 
     geometries = getattr(instance, geometries_attribute)
-    properties = [(p[1] if isinstance(p, list) else p) for p in feature_properties]
 
     if not geometries.exists():
         logger.warning(
@@ -250,6 +490,33 @@ def get_gis_data_for_geometries(
             f"Running MakeValid. New validity: {explain_validity(multipolygon)}"
         )
 
+    return multipolygon
+
+
+def get_gis_data_for_multipolygon(
+    instance,
+    multipolygon,
+    server_url,
+    layer_name,
+    feature_properties,
+    version="1.0.0",
+    the_geom="wkb_geometry",
+):
+    """Queries a layer for the features intersecting with a model instance's
+    multipolygon and returns a dict of unique values for each property
+
+    Args:
+        instance (object): The model instance the multipolygon belongs to
+        multipolygon (MultiPolygon): The instance's multipolygon, see `get_gis_multipolygon`
+        server_url (str): The URL of the geoserver
+        layer_name (str): The name of the layer to query
+        feature_properties (list): A list of property names to get unique values for,
+            or a list of lists of model name and gis property name when they differ too much
+        version (str): The WFS version to use
+        the_geom (str): The name of the geometry column in the layer
+    """
+    properties = [(p[1] if isinstance(p, list) else p) for p in feature_properties]
+
     if len(properties) > 1:
         properties_comma_list = ",".join(properties)
     else:
@@ -286,6 +553,45 @@ def get_gis_data_for_geometries(
     return data
 
 
+def get_gis_data_for_geometries(
+    instance,
+    geometries_attribute,
+    server_url,
+    layer_name,
+    feature_properties,
+    version="1.0.0",
+    the_geom="wkb_geometry",
+    invert_xy=False,
+):
+    """Takes a model instance, the name of the related geometries attribute, the layer name
+    and a list of property names and returns a dict of unique values for each property
+
+    Args:
+        instance (object): An instance of a model
+        geometries_attribute (str): The name of the related geometries attribute
+        server_url (str): The URL of the geoserver
+        layer_name (str): The name of the layer to query
+        feature_properties (list): A list of property names to get unique values for,
+            or a list of lists of model name and gis property name when they differ too much
+        version (str): The WFS version to use
+        the_geom (str): The name of the geometry column in the layer
+        invert_xy (bool): Whether to first transform geometries in lon/lat to lat/lon
+    """
+    multipolygon = get_gis_multipolygon(instance, geometries_attribute, invert_xy)
+    if multipolygon is None:
+        return None
+
+    return get_gis_data_for_multipolygon(
+        instance,
+        multipolygon,
+        server_url,
+        layer_name,
+        feature_properties,
+        version,
+        the_geom,
+    )
+
+
 def polygon_intersects_with_layer(
     polygon, server_url, layer_name, properties, version, the_geom
 ):
@@ -314,6 +620,104 @@ def polygons_intersect_with_layer(
     return True
 
 
+def get_layer_geometries(
+    geometry, server_url, layer_name, version, the_geom, srsName=DEFAULT_WFS_SRS_NAME
+):
+    """Returns the geometries of a layer's features that intersect with a geometry,
+    with one query of the local copy of the layer (see `sync_gis_layer`) or, when
+    it can't be used, one geoserver request
+
+    Args:
+        geometry (GEOSGeometry): E.g. a multipolygon or the envelope of polygons
+        server_url (str): The URL of the geoserver
+        layer_name (str): The name of the layer to query
+        version (str): The WFS version to use
+        the_geom (str): The name of the geometry column in the layer
+        srsName (str): The name of the spatial reference system of the geometry
+
+    Returns:
+        tuple: The shapely geometries and where they were queried from
+    """
+
+    layer = get_current_gis_layer(layer_name, srsName)
+    if layer is not None:
+        wkbs = layer.features.filter(geometry__intersects=geometry).values_list(
+            "geometry", flat=True
+        )
+        return shapely.from_wkb([bytes(g.wkb) for g in wkbs]), "local copy of the layer"
+
+    params = {
+        "service": "WFS",
+        "version": version,
+        "request": "GetFeature",
+        "maxFeatures": "5000",
+        "srsName": srsName,
+        "outputFormat": "application/json",
+        "propertyName": the_geom,
+        "CQL_FILTER": f"INTERSECTS({the_geom}, {geometry.wkt})",
+    }
+    features = get_wfs_features(server_url, layer_name, params)["features"]
+    return (
+        shapely.from_geojson(
+            [json.dumps(f["geometry"]) for f in features if f.get("geometry")]
+        ),
+        "geoserver",
+    )
+
+
+def intersects_any(polygons, geometries):
+    """Returns for each of the shapely polygons whether it intersects with any of
+    the shapely geometries, found with one bulk query of an STR-tree of the
+    geometries"""
+
+    intersects = np.zeros(len(polygons), dtype=bool)
+    if len(polygons) and len(geometries):
+        polygon_indices, _ = shapely.STRtree(geometries).query(
+            polygons, predicate="intersects"
+        )
+        intersects[polygon_indices] = True
+    return intersects
+
+
+def polygons_intersections_with_layer(
+    polygons, server_url, layer_name, version, the_geom, srsName=DEFAULT_WFS_SRS_NAME
+):
+    """Checks which of the polygons intersect with a layer. The geometries of the
+    layer's features that intersect with any of the polygons are fetched at once
+    (see `get_layer_geometries`) and each polygon is tested against them locally.
+
+    Args:
+        polygons (list): GEOS polygons
+        server_url (str): The URL of the geoserver
+        layer_name (str): The name of the layer to query
+        version (str): The WFS version to use
+        the_geom (str): The name of the geometry column in the layer
+        srsName (str): The name of the spatial reference system of the polygons
+
+    Returns:
+        list: Whether each polygon intersects with the layer
+    """
+
+    if not polygons:
+        return []
+
+    started = time.perf_counter()
+    geometries, source = get_layer_geometries(
+        MultiPolygon(polygons), server_url, layer_name, version, the_geom, srsName
+    )
+    intersections = intersects_any(
+        shapely.from_wkb([bytes(p.wkb) for p in polygons]), geometries
+    ).tolist()
+
+    logger.info(
+        f"Checked {len(polygons)} polygons against {len(geometries)} features of "
+        f"layer {layer_name} with one query of the {source} in "
+        f"{time.perf_counter() - started:.2f}s"
+    )
+
+    return intersections
+
+
 def multipolygon_intersects_with_layer(multipolygon, layer_name):
     """Checks if a multipolygon intersects with a layer"""
     features = get_features_by_multipolygon(
@@ -359,7 +763,8 @@ def save_geometry(
 
     action = request.data.get("action", None)
 
-    geometry_ids = []
+    features = []
+    polygons = []
     for feature in geometry.get("features"):
         # check if feature is a polygon, continue if not
         if feature.get("geometry").get("type") != "Polygon":
@@ -369,73 +774,102 @@ def save_geometry(
             continue
 
         # Create a Polygon object from the open layers feature
-        polygon = Polygon(feature.get("geometry").get("coordinates")[0])
-
-        specs = tenure_layer_specification()
-        test_polygon = (
-            invert_xy_coordinates([polygon])[0] if specs["invert_xy"] else polygon
+        features.append(feature)
+        polygons.append(Polygon(feature.get("geometry").get("coordinates")[0]))
+
+    # Check all polygons against the tenure layer at once
+    specs = tenure_layer_specification()
+    test_polygons = invert_xy_coordinates(polygons) if specs["invert_xy"] else polygons
+    intersections = polygons_intersections_with_layer(
+        test_polygons,
+        specs["server_url"],
+        specs["layer_name"],
+        specs["version"],
+        specs["the_geom"],
+    )
+    if not all(intersections):
+        # if it doesn't, raise a validation error (this should be prevented in the front end
+        # and is here just in case
+        raise ValidationError(
+            "One or more polygons do not intersect with the DBCA Lands and Waters layer"
         )
 
-        if not polygon_intersects_with_layer(
-            test_polygon,
-            specs["server_url"],
-            specs["layer_name"],
-            specs["properties"],
-            specs["version"],
-            specs["the_geom"],
-        ):
-            # if it doesn't, raise a validation error (this should be prevented in the front end
-            # and is here just in case
-            raise ValidationError(
-                "One or more polygons do not intersect with the DBCA Lands and Waters layer"
-            )
+    InstanceGeometrySaveSerializer = getattr(
+        sys.modules[f"leaseslicensing.components.{component}.serializers"],
+        f"{instance_name}GeometrySaveSerializer",
+    )
+    existing_geometries = InstanceGeometry.objects.in_bulk(
+        [feature["id"] for feature in features if feature.get("id")]
+    )
+    prefetch_email_users(
+        g.drawn_by for g in existing_geometries.values() if not g.source_name
+    )
 
+    new_geometries = []
+    updated_geometries = []
+    updated_fields = set()
+    for feature, polygon in zip(features, polygons):
         # If it does intersect, save it and set intersects to true
         geometry_data = {
             f"{foreign_key_field}_id": instance.id,
             "polygon": polygon,
             "intersects": True,  # probably redunant now that we are not allowing non-intersecting geometries
         }
-        InstanceGeometrySaveSerializer = getattr(
-            sys.modules[f"leaseslicensing.components.{component}.serializers"],
-            f"{instance_name}GeometrySaveSerializer",
-        )
         geometry_data["source_type"] = source_type
         if feature.get("id"):
             logger.info(
                 f"Updating existing {instance_name} geometry: {feature.get('id')} for Proposal: {instance}"
             )
-            try:
-                geometry = InstanceGeometry.objects.get(id=feature.get("id"))
-            except InstanceGeometry.DoesNotExist:
+            geometry = existing_geometries.get(feature.get("id"))
+            if geometry is None:
                 logger.warning(
                     f"{instance_name} geometry does not exist: {feature.get('id')}"
                 )
                 continue
             geometry_data["drawn_by"] = geometry.drawn_by
-            source_user = EmailUser.objects.get(id=geometry.drawn_by)
-            geometry_data["source_name"] = (
-                geometry.source_name
-                if geometry.source_name
-                else source_user.get_full_name()
-            )
+            geometry_data["source_name"] = geometry.source_name
+            if not geometry.source_name:
+                source_user = retrieve_email_user(geometry.drawn_by)
+                geometry_data["source_name"] = (
+                    source_user.get_full_name() if source_user else ""
+                )
             geometry_data["locked"] = (
                 action in ["submit"]
                 and geometry.drawn_by == request.user.id
                 or geometry.locked
             )
             serializer = InstanceGeometrySaveSerializer(geometry, data=geometry_data)
+            serializer.is_valid(raise_exception=True)
+            for field, value in serializer.validated_data.items():
+                setattr(geometry, field, value)
+            updated_fields.update(serializer.validated_data)
+            updated_geometries.append(geometry)
         else:
             logger.info(f"Creating new geometry for {instance_name}: {instance}")
             geometry_data["drawn_by"] = request.user.id
             geometry_data["source_name"] = request.user.get_full_name()
             geometry_data["locked"] = action in ["submit"]
             serializer = InstanceGeometrySaveSerializer(data=geometry_data)
-
-        serializer.is_valid(raise_exception=True)
-        proposalgeometry_instance = serializer.save()
-        logger.info(f"Saved {instance_name} geometry: {proposalgeometry_instance}")
-        geometry_ids.append(proposalgeometry_instance.id)
+            serializer.is_valid(raise_exception=True)
+            new_geometries.append(InstanceGeometry(**serializer.validated_data))
+
+    # Save the geometries in one revision (bulk operations bypass the signals
+    # reversion records versions with)
+    started = time.perf_counter()
+    with transaction.atomic(), revisions.create_revision():
+        InstanceGeometry.objects.bulk_create(new_geometries)
+        if updated_geometries:
+            InstanceGeometry.objects.bulk_update(
+                updated_geometries, sorted(updated_fields)
+            )
+        if revisions.is_registered(InstanceGeometry):
+            for saved_geometry in new_geometries + updated_geometries:
+                revisions.add_to_revision(saved_geometry)
+    geometry_ids = [g.id for g in new_geometries + updated_geometries]
+    logger.info(
+        f"Saved {instance_name} geometries: created {len(new_geometries)}, "
+        f"updated {len(updated_geometries)} in {time.perf_counter() - started:.2f}s"
+    )
 
     # Remove any proposal geometries from the db that are no longer in the proposal_geometry that was submitted
     # Prevent deletion of polygons that are locked after status change (e.g. after submit)
@@ -450,6 +884,57 @@ def save_geometry(
             f"Deleted {instance_name} geometries: {deleted_geometries} for {instance}"
         )
 
+    # The bulk operations above don't send the signals that mark the map features stale
+    from leaseslicensing.components.proposals.models import ProposalMapFeature
+
+    ProposalMapFeature.invalidate_instance(instance)
+
+
+def gis_data_layers():
+    """Returns the name of the layer to query, the feature properties to get from it
+    and the function that saves the GIS data to an instance for each kind of GIS data"""
+
+    return [
+        (
+            settings.GIS_LANDS_AND_WATERS_LAYER_NAME,
+            [
+                p.upper() for p in GIS_LANDS_AND_WATERS_PROPERTIES
+            ],  # A bit ugly but works
+            save_gis_data_lands_and_waters,  # Covers Identifiers, Names, Acts, Tenures and Categories
+        ),
+        (
+            "kaartdijin-boodja-public:CPT_DBCA_REGIONS",
+            GIS_REGION_PROPERTIES,
+            save_gis_data_regions,
+        ),
+        (
+            "kaartdijin-boodja-public:CPT_DBCA_DISTRICTS",
+            GIS_DISTRICT_PROPERTIES,
+            save_gis_data_districts,
+        ),
+        (
+            "kaartdijin-boodja-public:CPT_LOCAL_GOVT_AREAS",
+            [p.upper() for p in GIS_LGA_PROPERTIES],
+            save_gis_data_lgas,
+        ),
+    ]
+
+
+def _get_gis_data_for_layer(instance, multipolygon, layer_name, properties):
+    try:
+        return get_gis_data_for_multipolygon(
+            instance,
+            multipolygon,
+            settings.GIS_SERVER_URL,
+            layer_name,
+            properties,
+            version="2.0.0",
+            the_geom="SHAPE",
+        )
+    finally:
+        # Worker threads open their own database connections
+        connections.close_all()
+
 
 def populate_gis_data(instance, geometries_attribute, foreign_key_field=None):
     """Fetches required GIS data from the server defined in settings.GIS_SERVER_URL
@@ -463,12 +948,27 @@ def populate_gis_data(instance, geometries_attribute, foreign_key_field=None):
     if not foreign_key_field:
         foreign_key_field = instance_name.lower()
 
-    populate_gis_data_lands_and_waters(
-        instance, geometries_attribute, foreign_key_field
-    )  # Covers Identifiers, Names, Acts, Tenures and Categories
-    populate_gis_data_regions(instance, geometries_attribute, foreign_key_field)
-    populate_gis_data_districts(instance, geometries_attribute, foreign_key_field)
-    populate_gis_data_lgas(instance, geometries_attribute, foreign_key_field)
+    layers = gis_data_layers()
+    gis_data = [None] * len(layers)
+    multipolygon = get_gis_multipolygon(instance, geometries_attribute, invert_xy=True)
+    if multipolygon is not None:
+        # Query all layers at the same time rather than one after another
+        with ThreadPoolExecutor(max_workers=len(layers)) as executor:
+            futures = [
+                executor.submit(
+                    _get_gis_data_for_layer,
+                    instance,
+                    multipolygon,
+                    layer_name,
+                    properties,
+                )
+                for layer_name, properties, save in layers
+            ]
+            gis_data = [future.result() for future in futures]
+
+    with transaction.atomic():
+        for (layer_name, properties, save), data in zip(layers, gis_data):
+            save(instance, foreign_key_field, data)
     logger.info(
         "-> Finished populating GIS data for %s: %s",
         instance_name,
@@ -476,31 +976,14 @@ def populate_gis_data(instance, geometries_attribute, foreign_key_field=None):
     )
 
 
-def populate_gis_data_lands_and_waters(
-    instance, geometries_attribute, foreign_key_field
+def save_gis_data_lands_and_waters(
+    instance, foreign_key_field, gis_data_lands_and_waters
 ):
-    properties = [
-        "leg_identifier",
-        "leg_vesting",
-        "leg_name",
-        "leg_tenure",
-        "leg_act",
-        "leg_category",
-    ]
+    properties = GIS_LANDS_AND_WATERS_PROPERTIES
     # Start with storing the ids of existing identifiers, names, acts, tenures and categories of this instance
     # Remove any GIS data that is returned from querying the geoserver.
     # Whatever remains in this list is no longer part of this instance and will be deleted.
     object_ids = gis_property_to_model_ids(instance, properties, foreign_key_field)
-    gis_data_lands_and_waters = get_gis_data_for_geometries(
-        instance,
-        geometries_attribute,
-        settings.GIS_SERVER_URL,
-        settings.GIS_LANDS_AND_WATERS_LAYER_NAME,
-        [p.upper() for p in properties],  # A bit ugly but works
-        version="2.0.0",
-        the_geom="SHAPE",
-        invert_xy=True,
-    )
     if gis_data_lands_and_waters is None:
         logger.warning(
             "No GIS Lands and waters data found for %s %s",
@@ -619,21 +1102,9 @@ def populate_gis_data_lands_and_waters(
     delete_gis_data(instance, foreign_key_field, ids_to_delete=object_ids)
 
 
-def populate_gis_data_regions(instance, geometries_attribute, foreign_key_field):
-    properties = [
-        "DRG_REGION_NAME",  # KB
-    ]
+def save_gis_data_regions(instance, foreign_key_field, gis_data_regions):
+    properties = GIS_REGION_PROPERTIES
     object_ids = gis_property_to_model_ids(instance, properties, foreign_key_field)
-    gis_data_regions = get_gis_data_for_geometries(
-        instance,
-        geometries_attribute,
-        settings.GIS_SERVER_URL,
-        "kaartdijin-boodja-public:CPT_DBCA_REGIONS",
-        properties,
-        version="2.0.0",
-        the_geom="SHAPE",
-        invert_xy=True,
-    )
     if gis_data_regions is None:
         logger.warning(
             "No GIS Region data found for instance %s", instance.lodgement_number
@@ -658,20 +1129,10 @@ def populate_gis_data_regions(instance, geometries_attribute, foreign_key_field)
     delete_gis_data(instance, foreign_key_field, ids_to_delete=object_ids)
 
 
-def populate_gis_data_districts(instance, geometries_attribute, foreign_key_field):
-    properties = [["district", "ADMIN_ZONE"]]
+def save_gis_data_districts(instance, foreign_key_field, gis_data_districts):
+    properties = GIS_DISTRICT_PROPERTIES
 
     object_ids = gis_property_to_model_ids(instance, properties, foreign_key_field)
-    gis_data_districts = get_gis_data_for_geometries(
-        instance,
-        geometries_attribute,
-        settings.GIS_SERVER_URL,
-        "kaartdijin-boodja-public:CPT_DBCA_DISTRICTS",
-        properties,
-        version="2.0.0",
-        the_geom="SHAPE",
-        invert_xy=True,
-    )
     if gis_data_districts is None:
         logger.warning(
             "No GIS District data found for instance %s", instance.lodgement_number
@@ -699,21 +1160,9 @@ def populate_gis_data_districts(instance, geometries_attribute, foreign_key_fiel
     delete_gis_data(instance, foreign_key_field, ids_to_delete=object_ids)
 
 
-def populate_gis_data_lgas(instance, geometries_attribute, foreign_key_field):
-    properties = [
-        "lga_label",
-    ]
+def save_gis_data_lgas(instance, foreign_key_field, gis_data_lgas):
+    properties = GIS_LGA_PROPERTIES
     object_ids = gis_property_to_model_ids(instance, properties, foreign_key_field)
-    gis_data_lgas = get_gis_data_for_geometries(
-        instance,
-        geometries_attribute,
-        settings.GIS_SERVER_URL,
-        "kaartdijin-boodja-public:CPT_LOCAL_GOVT_AREAS",
-        [p.upper() for p in properties],  # A bit ugly but works
-        version="2.0.0",
-        the_geom="SHAPE",
-        invert_xy=True,
-    )
     if gis_data_lgas is None:
         logger.warning(
             "No GIS LGA data found for instance %s", instance.lodgement_number
@@ -910,13 +1359,159 @@ def get_secure_document_url(instance, related_name="documents", document_id=None
     return f"{base_path}{instance._meta.model.__name__}/{instance.id}/{related_name}/"
 
 
-def validate_map_files(request, instance, foreign_key_field=None):
+def read_shapefile_polygons(path, name):
+    """Returns the polygons of a shapefile as an array of shapely polygons in
+    WGS-84, with multipolygons exploded into their polygons. Shapefiles without a
+    .prj file are assumed to be in WGS-84."""
+
+    gdf = gpd.read_file(path)  # Shapefile to GeoDataFrame
+    geometries = gdf.geometry[gdf.geometry.notna() & ~gdf.geometry.is_empty]
+    if geometries.empty:
+        raise ValidationError(f"Geometry is empty in {name}")
+
+    # Reproject all geometries at once
+    if not geometries.crs:
+        geometries = geometries.set_crs("epsg:4326")
+    else:
+        geometries = geometries.to_crs("epsg:4326")
+
+    # Only accept polygons
+    geom_types = set(geometries.geom_type) - {"Polygon", "MultiPolygon"}
+    if geom_types:
+        raise ValidationError(
+            f"Geometry of type {', '.join(sorted(geom_types))} not allowed"
+        )
+
+    return geometries.explode(index_parts=False).to_numpy()
+
+
+def save_shapefile_polygons(
+    instance, user_id, shp_file_objs, foreign_key_field=None, progress=None
+):
+    """Saves the polygons of shapefiles as geometries of a proposal or competitive
+    process instance when all of them intersect with the tenure layer.
+
+    The polygons are tested against the tenure layer's features within their
+    bounding box in bulk (see `get_layer_geometries` and `intersects_any`) and are
+    saved with `bulk_create` in one transaction.
+
+    Args:
+        instance (Model): The proposal or competitive process
+        user_id (int): The id of the user who uploaded the shapefiles
+        shp_file_objs (iterable): The .shp documents
+        foreign_key_field (str, optional): The name of the instance foreign key
+            field of the geometry model
+        progress (callable, optional): Called with a stage name, the number of
+            items done and the total number of items as the import progresses
+
+    Returns:
+        bool: Whether any geometry was saved
+    """
+
+    if progress is None:
+
+        def progress(stage, done, total):
+            pass
+
+    shp_file_objs = list(shp_file_objs)
+    started = time.perf_counter()
+    polygons = []
+    for i, shp_file_obj in enumerate(shp_file_objs):
+        progress("reading", i, len(shp_file_objs))
+        polygons.append(read_shapefile_polygons(shp_file_obj.path, shp_file_obj.name))
+    polygons = np.concatenate(polygons) if polygons else np.array([])
+    timings = {"read": time.perf_counter() - started}
+    if not len(polygons):
+        return False
+
+    # Check for intersection with DBCA geometries
+    progress("validating", 0, len(polygons))
+    started = time.perf_counter()
+    specs = tenure_layer_specification()
+    test_polygons = (
+        shapely.transform(polygons, lambda coordinates: coordinates[:, ::-1])
+        if specs["invert_xy"]
+        else polygons
+    )
+    geometries, source = get_layer_geometries(
+        Polygon.from_bbox(shapely.total_bounds(test_polygons)),
+        specs["server_url"],
+        specs["layer_name"],
+        specs["version"],
+        specs["the_geom"],
+    )
+    # Imported geometry is valid if it intersects with any one of the DBCA geometries
+    if not intersects_any(test_polygons, geometries).all():
+        raise ValidationError(
+            "One or more polygons does not intersect with a relevant layer"
+        )
+    timings["validate"] = time.perf_counter() - started
+
+    # Some generic code to save the geometry to the database
+    # That will work for both a proposal instance and a competitive process instance
+    started = time.perf_counter()
+    instance_name = instance._meta.model.__name__
+    if not foreign_key_field:
+        foreign_key_field = instance_name.lower()
+    geometry_model = apps.get_model("leaseslicensing", f"{instance_name}Geometry")
+    new_geometries = [
+        geometry_model(
+            **{
+                foreign_key_field: instance,
+                "polygon": GEOSGeometry(memoryview(wkb), srid=4326),
+                "intersects": True,
+                "drawn_by": user_id,
+            }
+        )
+        for wkb in shapely.to_wkb(polygons)
+    ]
+    batch_size = 1000
+    with transaction.atomic(), revisions.create_revision():
+        for start in range(0, len(new_geometries), batch_size):
+            progress("saving", start, len(new_geometries))
+            end = start + batch_size
+            geometry_model.objects.bulk_create(new_geometries[start:end])
+        if revisions.is_registered(geometry_model):
+            for geometry in new_geometries:
+                revisions.add_to_revision(geometry)
+    progress("saving", len(new_geometries), len(new_geometries))
+    timings["save"] = time.perf_counter() - started
+
+    logger.info(
+        f"Imported {len(polygons)} polygons from {len(shp_file_objs)} shapefiles "
+        f"for {instance_name}: {instance} checked against {len(geometries)} "
+        f"features of the {source}. Stage timings: "
+        + ", ".join(f"{stage}: {seconds:.2f}s" for stage, seconds in timings.items())
+    )
+
+    return True
+
+
+def import_map_files(
+    request, instance, geometries_attribute, foreign_key_field=None, progress=None
+):
+    """Saves the polygons of the shapefiles uploaded to a proposal or competitive
+    process as its geometries and populates its GIS data. Large uploads can be
+    imported with `leaseslicensing.jobs.start_job` (the progress is reported
+    through `progress`)."""
+
+    valid_geometry_saved = validate_map_files(
+        request, instance, foreign_key_field, progress
+    )
+    instance.save()
+    if valid_geometry_saved:
+        if progress:
+            progress("populating gis data", 0, 1)
+        populate_gis_data(instance, geometries_attribute, foreign_key_field)
+
+    return valid_geometry_saved
+
+
+def validate_map_files(request, instance, foreign_key_field=None, progress=None):
     # Validates shapefiles uploaded with via the proposal map or the competitive process map.
     # Shapefiles are valid when the shp, shx, and dbf extensions are provided
     # and when they intersect with DBCA legislated land or water polygons
 
-    valid_geometry_saved = False
-
     logger.debug(f"Shapefile documents: {instance.shapefile_documents.all()}")
 
     if not instance.shapefile_documents.exists():
@@ -963,81 +1558,9 @@ def validate_map_files(request, instance, foreign_key_field=None):
     # A list of all uploaded shapefiles
     shp_file_objs = shp_file_qs.filter(Q(name__endswith=".shp"))
 
-    for shp_file_obj in shp_file_objs:
-        gdf = gpd.read_file(shp_file_obj.path)  # Shapefile to GeoDataFrame
-
-        if gdf.empty:
-            raise ValidationError(f"Geometry is empty in {shp_file_obj.name}")
-
-        # If no prj file assume WGS-84 datum
-        if not gdf.crs:
-            gdf_transform = gdf.set_crs("epsg:4326", inplace=True)
-        else:
-            gdf_transform = gdf.to_crs("epsg:4326")
-
-        geometries = gdf_transform.geometry  # GeoSeries
-
-        # Only accept polygons
-        geom_type = geometries.geom_type.values[0]
-        if geom_type not in ("Polygon", "MultiPolygon"):
-            raise ValidationError(f"Geometry of type {geom_type} not allowed")
-
-        # Check for intersection with DBCA geometries
-        gdf_transform["valid"] = False
-        for geom in geometries:
-            srid = SpatialReference(
-                geometries.crs.srs
-            ).srid  # spatial reference identifier
-
-            polygon = GEOSGeometry(geom.wkt, srid=srid)
-
-            # Add the file name as identifier to the geojson for use in the frontend
-            if "source_" not in gdf_transform:
-                gdf_transform["source_"] = shp_file_obj.name
-
-            specs = tenure_layer_specification()
-
-            test_polygon = (
-                invert_xy_coordinates([polygon])[0] if specs["invert_xy"] else polygon
-            )
-
-            # Imported geometry is valid if it intersects with any one of the DBCA geometries
-            if not polygon_intersects_with_layer(
-                test_polygon,
-                specs["server_url"],
-                specs["layer_name"],
-                specs["properties"],
-                specs["version"],
-                specs["the_geom"],
-            ):
-                raise ValidationError(
-                    "One or more polygons does not intersect with a relevant layer"
-                )
-
-            gdf_transform["valid"] = True
-
-            # Some generic code to save the geometry to the database
-            # That will work for both a proposal instance and a competitive process instance
-            instance_name = instance._meta.model.__name__
-
-            if not foreign_key_field:
-                foreign_key_field = instance_name.lower()
-
-            geometry_model = apps.get_model(
-                "leaseslicensing", f"{instance_name}Geometry"
-            )
-
-            geometry_model.objects.create(
-                **{
-                    foreign_key_field: instance,
-                    "polygon": polygon,
-                    "intersects": True,
-                    "drawn_by": request.user.id,
-                }
-            )
-
-        instance.save()
-        valid_geometry_saved = True
+    valid_geometry_saved = save_shapefile_polygons(
+        instance, request.user.id, shp_file_objs, foreign_key_field, progress
+    )
 
     # Delete all shapefile documents so the user can upload another one if they wish.
     instance.shapefile_documents.all().delete()
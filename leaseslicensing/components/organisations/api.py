@@ -20,7 +20,6 @@ from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-from rest_framework_datatables.pagination import DatatablesPageNumberPagination
 
 from leaseslicensing.components.main.api import (
     KeyValueListMixin,
@@ -33,6 +32,10 @@ from leaseslicensing.components.main.decorators import (
     logging_action,
 )
 from leaseslicensing.components.main.filters import LedgerDatatablesFilterBackend
+from leaseslicensing.components.main.pagination import (
+    DatatablesPagination,
+    get_cached_total_count,
+)
 from leaseslicensing.components.organisations.models import (  # ledger_organisation,
     Organisation,
     OrganisationAction,
@@ -743,7 +746,7 @@ class OrganisationRequestFilterBackend(LedgerDatatablesFilterBackend):
     """
 
     def filter_queryset(self, request, queryset, view):
-        total_count = queryset.count()
+        total_count = get_cached_total_count(queryset)
 
         filter_organisation = request.GET.get("filter_organisation", None)
         filter_role = request.GET.get("filter_role", None)
@@ -771,7 +774,7 @@ class OrganisationRequestFilterBackend(LedgerDatatablesFilterBackend):
 
 class OrganisationRequestPaginatedViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = (OrganisationRequestFilterBackend,)
-    pagination_class = DatatablesPageNumberPagination
+    pagination_class = DatatablesPagination
     renderer_classes = (ProposalRenderer,)
     page_size = 10
     queryset = OrganisationRequest.objects.all()
@@ -1067,7 +1070,7 @@ class OrganisationContactFilterBackend(LedgerDatatablesFilterBackend):
     """
 
     def filter_queryset(self, request, queryset, view):
-        total_count = queryset.count()
+        total_count = get_cached_total_count(queryset)
         admin_user_count = queryset.filter(
             user_role=OrganisationContact.USER_ROLE_CHOICE_ADMIN,
             user_status=OrganisationContact.USER_STATUS_CHOICE_ACTIVE,
@@ -1093,7 +1096,7 @@ class OrganisationContactFilterBackend(LedgerDatatablesFilterBackend):
 
 class OrganisationContactPaginatedViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = (OrganisationContactFilterBackend,)
-    pagination_class = DatatablesPageNumberPagination
+    pagination_class = DatatablesPagination
     renderer_classes = (ProposalRenderer,)
     page_size = 10
     queryset = OrganisationContact.objects.all()
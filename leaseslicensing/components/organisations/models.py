@@ -1,17 +1,11 @@
 import logging
 
 from django.conf import settings
-from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import models, transaction
 from django.utils.text import slugify
 from ledger_api_client.managed_models import SystemGroupPermission
-from ledger_api_client.utils import (
-    create_organisation,
-    get_organisation,
-    get_search_organisation,
-)
-from rest_framework import status
+from ledger_api_client.utils import create_organisation, get_search_organisation
 
 from leaseslicensing.components.main.models import (
     CommunicationsLogEntry,
@@ -36,7 +30,10 @@ from leaseslicensing.components.organisations.emails import (  # send_organisati
 from leaseslicensing.components.organisations.exceptions import (
     UnableToRetrieveLedgerOrganisation,
 )
-from leaseslicensing.components.organisations.utils import random_generator
+from leaseslicensing.components.organisations.utils import (
+    prefetch_ledger_organisations,
+    random_generator,
+)
 from leaseslicensing.helpers import belongs_to_by_user_id
 from leaseslicensing.ledger_api_utils import retrieve_email_user
 
@@ -107,26 +104,16 @@ class Organisation(models.Model):
     @property
     def ledger_organisation(self):
         if self.ledger_organisation_id:
-            cache_key = settings.CACHE_KEY_LEDGER_ORGANISATION.format(
-                self.ledger_organisation_id
-            )
-            organisation = cache.get(cache_key)
+            organisation = prefetch_ledger_organisations(
+                [self.ledger_organisation_id]
+            ).get(self.ledger_organisation_id)
             if organisation is None:
-                logger.info(
-                    f"Retrieving organisation {self.ledger_organisation_id} from ledger."
+                error_message = (
+                    "CRITICAL: Unable to retrieve organisation "
+                    f"{self.ledger_organisation_id} from ledger."
                 )
-                organisation_response = get_organisation(self.ledger_organisation_id)
-                if status.HTTP_200_OK == organisation_response["status"]:
-                    organisation = organisation_response["data"]
-                    cache.set(cache_key, organisation, settings.CACHE_TIMEOUT_24_HOURS)
-                else:
-                    error_message = (
-                        "CRITICAL: Unable to retrieve organisation "
-                        f"{self.ledger_organisation_id} from ledger."
-                    )
-                    logger.error(error_message)
-                    raise UnableToRetrieveLedgerOrganisation(error_message)
-                logger.info(f"Retrieved organisation {organisation} from ledger.")
+                logger.error(error_message)
+                raise UnableToRetrieveLedgerOrganisation(error_message)
             return organisation
 
         critical_message = (
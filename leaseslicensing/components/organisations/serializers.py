@@ -21,6 +21,7 @@ from leaseslicensing.components.organisations.utils import (
     can_manage_org,
     can_relink,
     is_consultant,
+    prefetch_ledger_organisations,
 )
 from leaseslicensing.components.users.serializers import ContactSerializer
 from leaseslicensing.ledger_api_utils import retrieve_email_user
@@ -167,6 +168,25 @@ class InternalOrganisationCreateSerializer(serializers.Serializer):
         )
 
 
+class LedgerOrganisationPrefetchListSerializer(serializers.ListSerializer):
+    """
+    Loads the ledger organisation details of a page of organisations concurrently
+    before the organisations are serialized, so that the child serializer's
+    `address` and `phone_number` fields are answered from the cache.
+    """
+
+    def to_representation(self, data):
+        if hasattr(data, "all"):
+            data = data.all()
+        data = list(data)
+
+        prefetch_ledger_organisations(
+            organisation.ledger_organisation_id for organisation in data
+        )
+
+        return super().to_representation(data)
+
+
 class OrganisationSerializer(serializers.ModelSerializer):
     pins = serializers.SerializerMethodField(read_only=True)
     delegates = serializers.SerializerMethodField(read_only=True)
@@ -178,6 +198,7 @@ class OrganisationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Organisation
+        list_serializer_class = LedgerOrganisationPrefetchListSerializer
         fields = (
             "id",
             "ledger_organisation_id",
@@ -306,6 +327,7 @@ class MyOrganisationsSerializer(OrganisationSerializer):
 
     class Meta:
         model = Organisation
+        list_serializer_class = LedgerOrganisationPrefetchListSerializer
         fields = [
             "id",
             "ledger_organisation_id",
@@ -0,0 +1,55 @@
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from leaseslicensing.components.organisations.utils import (
+    prefetch_ledger_organisations,
+)
+
+
+class LedgerOrganisationStub:
+    """A local stand-in for ledger's get organisation endpoint"""
+
+    def __init__(self, organisations):
+        self.organisations = organisations
+        self.requested = []
+        self._lock = threading.Lock()
+
+    def __call__(self, ledger_organisation_id):
+        with self._lock:
+            self.requested.append(ledger_organisation_id)
+        if ledger_organisation_id not in self.organisations:
+            return {"status": 404, "message": "Organisation not found"}
+        return {"status": 200, "data": self.organisations[ledger_organisation_id]}
+
+
+class LedgerOrganisationPrefetchTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.ledger = LedgerOrganisationStub(
+            {
+                1: {"organisation_id": 1, "organisation_name": "One"},
+                2: {"organisation_id": 2, "organisation_name": "Two"},
+            }
+        )
+        patcher = mock.patch(
+            "leaseslicensing.components.organisations.utils.get_organisation",
+            self.ledger,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fetches_missing_organisations_once(self):
+        organisations = prefetch_ledger_organisations([1, 2, 3, None], max_workers=2)
+        self.assertEqual(
+            {i: o["organisation_name"] for i, o in organisations.items()},
+            {1: "One", 2: "Two"},
+        )
+        self.assertEqual(sorted(self.ledger.requested), [1, 2, 3])
+
+        # Only the organisation that couldn't be retrieved is requested again
+        self.assertEqual(prefetch_ledger_organisations([1, 2, 3]), organisations)
+        self.assertEqual(sorted(self.ledger.requested), [1, 2, 3, 3])
@@ -1,12 +1,19 @@
+import logging
 import random
 import string
+from concurrent.futures import ThreadPoolExecutor
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import EmptyResultSet
 from ledger_api_client.ledger_models import EmailUserRO as EmailUser
+from ledger_api_client.utils import get_organisation
+from rest_framework import status
 
 from leaseslicensing.helpers import belongs_to_by_user_id
 
+logger = logging.getLogger(__name__)
+
 
 def can_manage_org(organisation, user):
     from leaseslicensing.components.organisations.models import UserDelegation
@@ -160,3 +167,77 @@ def get_admin_emails_for_organisation(organisation_id):
         )
 
     return list(active_admin_contacts)
+
+
+def fetch_ledger_organisation(ledger_organisation_id):
+    """Returns the organisation details from ledger or None if they can't be retrieved"""
+
+    try:
+        organisation_response = get_organisation(ledger_organisation_id)
+    except Exception as e:
+        logger.exception(
+            f"Unable to retrieve organisation {ledger_organisation_id} from ledger: {e}"
+        )
+        return None
+
+    if status.HTTP_200_OK != organisation_response["status"]:
+        logger.error(
+            f"Unable to retrieve organisation {ledger_organisation_id} from ledger: "
+            f"{organisation_response}"
+        )
+        return None
+
+    return organisation_response["data"]
+
+
+def prefetch_ledger_organisations(ledger_organisation_ids, max_workers=None):
+    """
+    Loads the ledger organisation details for many organisations into the cache.
+    Organisations that aren't cached yet are retrieved from ledger concurrently and
+    cached in one pass, so that e.g. a list of organisations doesn't make one blocking
+    ledger request per row.
+
+    Args:
+        ledger_organisation_ids (iterable): The ids of the ledger organisations
+        max_workers (int, optional): The maximum number of concurrent ledger requests
+
+    Returns:
+        dict: The organisation details by ledger organisation id (organisations that
+            couldn't be retrieved are missing)
+    """
+
+    ledger_organisation_ids = {int(i) for i in ledger_organisation_ids if i}
+    cache_keys = {
+        settings.CACHE_KEY_LEDGER_ORGANISATION.format(i): i
+        for i in ledger_organisation_ids
+    }
+    organisations = {
+        cache_keys[cache_key]: organisation
+        for cache_key, organisation in cache.get_many(list(cache_keys)).items()
+    }
+
+    missing = sorted(ledger_organisation_ids - organisations.keys())
+    if not missing:
+        return organisations
+
+    max_workers = max_workers or settings.LEDGER_ORGANISATION_PREFETCH_WORKERS
+    logger.info(f"Retrieving {len(missing)} organisations from ledger")
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+        fetched = {
+            ledger_organisation_id: organisation
+            for ledger_organisation_id, organisation in zip(
+                missing, executor.map(fetch_ledger_organisation, missing)
+            )
+            if organisation is not None
+        }
+
+    cache.set_many(
+        {
+            settings.CACHE_KEY_LEDGER_ORGANISATION.format(i): organisation
+            for i, organisation in fetched.items()
+        },
+        settings.CACHE_TIMEOUT_24_HOURS,
+    )
+    organisations.update(fetched)
+
+    return organisations
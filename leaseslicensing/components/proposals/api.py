@@ -3,10 +3,10 @@ from collections import OrderedDict
 from datetime import datetime
 
 from django.conf import settings
-from django.core.cache import cache
+from django.contrib.gis.geos import Polygon
 from django.db import transaction
-from django.db.models import CharField, F, Func, Q, Value
-from django.urls import reverse
+from django.db.models import CharField, F, Func, Q, Value, prefetch_related_objects
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils.decorators import method_decorator
 from django.utils.translation import gettext as _
 from django.views.decorators.cache import cache_page
@@ -19,13 +19,11 @@ from rest_framework.decorators import renderer_classes
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-from rest_framework_datatables.pagination import DatatablesPageNumberPagination
 from rest_framework_datatables.renderers import DatatablesRenderer
 from reversion.models import Version
 
 from leaseslicensing.components.approvals.models import Approval
 from leaseslicensing.components.competitive_processes.models import CompetitiveProcess
-from leaseslicensing.components.compliances.models import Compliance
 from leaseslicensing.components.main.api import (
     LicensingViewSet,
     UserActionLoggingViewset,
@@ -33,17 +31,27 @@ from leaseslicensing.components.main.api import (
 from leaseslicensing.components.main.decorators import basic_exception_handler
 from leaseslicensing.components.main.filters import LedgerDatatablesFilterBackend
 from leaseslicensing.components.main.models import ApplicationType
+from leaseslicensing.components.main.pagination import (
+    DatatablesPagination,
+    get_cached_total_count,
+)
 from leaseslicensing.components.main.process_document import process_generic_document
 from leaseslicensing.components.main.related_item import RelatedItemsSerializer
+from leaseslicensing.components.main.search import search_results
 from leaseslicensing.components.main.serializers import (
     NewEmailuserSerializer,
     RelatedItemSerializer,
 )
-from leaseslicensing.components.main.utils import save_site_name, validate_map_files
+from leaseslicensing.components.main.utils import import_map_files, save_site_name
 from leaseslicensing.components.organisations.models import Organisation
 from leaseslicensing.components.proposals.email import (
     send_external_referee_invite_email,
 )
+from leaseslicensing.components.proposals.map_layer import (
+    add_details_urls,
+    map_features_etag,
+    refresh_map_features,
+)
 from leaseslicensing.components.proposals.models import (
     AdditionalDocumentType,
     AmendmentReason,
@@ -53,7 +61,7 @@ from leaseslicensing.components.proposals.models import (
     Proposal,
     ProposalAssessment,
     ProposalAssessmentAnswer,
-    ProposalGeometry,
+    ProposalMapFeature,
     ProposalRequirement,
     ProposalStandardRequirement,
     ProposalType,
@@ -93,7 +101,6 @@ from leaseslicensing.components.proposals.serializers import (  # InternalSavePr
 )
 from leaseslicensing.components.proposals.utils import (
     make_proposal_applicant_ready,
-    populate_gis_data,
     proposal_submit,
     save_assessor_data,
     save_proponent_data,
@@ -108,6 +115,7 @@ from leaseslicensing.helpers import (
     is_internal,
     is_referee,
 )
+from leaseslicensing.jobs import start_job
 from leaseslicensing.ledger_api_utils import retrieve_email_user
 from leaseslicensing.permissions import (
     HasObjectPermission,
@@ -227,7 +235,7 @@ class ProposalFilterBackend(LedgerDatatablesFilterBackend):
     """
 
     def filter_queryset(self, request, queryset, view):
-        total_count = queryset.count()
+        total_count = get_cached_total_count(queryset)
 
         filter_lodged_from = request.GET.get("filter_lodged_from")
         filter_lodged_to = request.GET.get("filter_lodged_to")
@@ -285,7 +293,7 @@ class ProposalRenderer(DatatablesRenderer):
 
 class ProposalPaginatedViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = (ProposalFilterBackend,)
-    pagination_class = DatatablesPageNumberPagination
+    pagination_class = DatatablesPagination
     renderer_classes = (ProposalRenderer,)
     queryset = Proposal.objects.none()
     serializer_class = ListProposalSerializer
@@ -373,10 +381,10 @@ class ProposalPaginatedViewSet(viewsets.ReadOnlyModelViewSet):
             ).annotate(referral_processing_status=F("referrals__processing_status"))
 
         qs = self.filter_queryset(qs)
-
-        self.paginator.page_size = qs.count()
-        result_page = self.paginator.paginate_queryset(qs, request)
         serializer_class = self.get_serializer_class()
+        qs = serializer_class.get_prefetched_queryset(qs)
+
+        result_page = self.paginator.paginate_queryset(qs, request, view=self)
         serializer = serializer_class(
             result_page, context={"request": request}, many=True
         )
@@ -396,8 +404,6 @@ class ProposalPaginatedViewSet(viewsets.ReadOnlyModelViewSet):
         http://localhost:8499/api/proposal_paginated/proposal_paginated_external/?format=datatables&draw=1&length=2
         """
         qs = self.get_queryset().exclude(processing_status="discarded")
-        # qs = self.filter_queryset(self.request, qs, self)
-        qs = self.filter_queryset(qs)
 
         # on the internal organisations dashboard, filter the Proposal/Approval/Compliance
         # datatables by applicant/organisation
@@ -408,8 +414,11 @@ class ProposalPaginatedViewSet(viewsets.ReadOnlyModelViewSet):
         if submitter_id:
             qs = qs.filter(submitter=submitter_id)
 
-        self.paginator.page_size = qs.count()
-        result_page = self.paginator.paginate_queryset(qs, request)
+        # Filter last so the counts stored on the view match the paginated queryset
+        qs = self.filter_queryset(qs)
+        qs = ListProposalSerializer.get_prefetched_queryset(qs)
+
+        result_page = self.paginator.paginate_queryset(qs, request, view=self)
         serializer = ListProposalSerializer(
             result_page, context={"request": request}, many=True
         )
@@ -422,6 +431,12 @@ class ProposalViewSet(UserActionLoggingViewset):
     lookup_field = "id"
 
     def get_queryset(self):
+        qs = self.get_proposals_queryset()
+        if self.action in ["retrieve", "internal_proposal"]:
+            qs = self.get_serializer_class().get_prefetched_queryset(qs)
+        return qs
+
+    def get_proposals_queryset(self):
         user = self.request.user
         if is_internal(self.request):
             return Proposal.objects.all()
@@ -483,7 +498,17 @@ class ProposalViewSet(UserActionLoggingViewset):
 
     @list_route(methods=["GET"], detail=False)
     def list_for_map(self, request, *args, **kwargs):
-        """Returns the proposals for the map"""
+        """
+        Returns the proposals for the map from their pre-rendered map features.
+
+        Optional parameters:
+            bbox: Only returns the proposals whose polygons overlap the bounding box
+                `<min x>,<min y>,<max x>,<max y>` (in EPSG:4326)
+            zoom: Returns simplified polygons below `settings.MAP_FEATURE_DETAIL_ZOOM`
+
+        Responds with 304 Not Modified when the request's `If-None-Match` header
+        matches the ETag of the map features.
+        """
         proposal_ids = [
             int(id)
             for id in request.query_params.get("proposal_ids", "").split(",")
@@ -491,17 +516,13 @@ class ProposalViewSet(UserActionLoggingViewset):
         ]
         application_type = request.query_params.get("application_type", None)
         processing_status = request.query_params.get("processing_status", None)
+        try:
+            bbox = [float(c) for c in request.query_params.get("bbox", "").split(",")]
+        except ValueError:
+            bbox = []
+        zoom = request.query_params.get("zoom", None)
 
-        cache_key = settings.CACHE_KEY_MAP_PROPOSALS
-        qs = cache.get(cache_key)
-        if qs is None:
-            qs = (
-                self.get_queryset()
-                .exclude(proposalgeometry__isnull=True)
-                .prefetch_related("proposalgeometry")
-            )
-            cache.set(cache_key, qs, settings.CACHE_TIMEOUT_2_HOURS)
-
+        qs = self.get_queryset()
         if len(proposal_ids) > 0:
             qs = qs.filter(id__in=proposal_ids)
 
@@ -515,10 +536,41 @@ class ProposalViewSet(UserActionLoggingViewset):
         if processing_status:
             qs = qs.filter(processing_status=processing_status)
 
-        serializer = ListProposalMinimalSerializer(
-            qs, context={"request": request}, many=True
+        refresh_map_features(qs, limit=settings.MAP_FEATURE_RENDER_LIMIT)
+
+        map_features = ProposalMapFeature.objects.filter(
+            proposal__in=qs, extent__isnull=False
         )
-        return Response(serializer.data)
+        if len(bbox) == 4:
+            map_features = map_features.filter(
+                extent__bboxoverlaps=Polygon.from_bbox(bbox)
+            )
+
+        simplified = (
+            zoom is not None
+            and zoom.isnumeric()
+            and int(zoom) < settings.MAP_FEATURE_DETAIL_ZOOM
+        )
+        etag = map_features_etag(
+            map_features,
+            is_internal(request),
+            simplified,
+        )
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            field = "simplified_data" if simplified else "data"
+            response = Response(
+                [
+                    add_details_urls(data, request)
+                    for data in map_features.order_by("proposal_id").values_list(
+                        field, flat=True
+                    )
+                ]
+            )
+        response["ETag"] = etag
+        # Browsers have to revalidate the cached response on every request
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
     @detail_route(
         methods=[
@@ -528,11 +580,12 @@ class ProposalViewSet(UserActionLoggingViewset):
     )
     def compare_list(self, request, *args, **kwargs):
         """Returns the reversion-compare urls --> list"""
+        instance = self.get_object()
         current_revision_id = (
-            Version.objects.get_for_object(self.get_object()).first().revision_id
+            Version.objects.get_for_object(instance).first().revision_id
         )
         versions = (
-            Version.objects.get_for_object(self.get_object())
+            Version.objects.get_for_object(instance)
             .select_related("revision__user")
             .filter(
                 Q(revision__comment__icontains="status")
@@ -1060,40 +1113,26 @@ class ProposalViewSet(UserActionLoggingViewset):
             return Response(serializer.data)
 
         try:
-            # This model's version for `revision_id`
-            version = self.get_object().revision_version(revision_id)
+            # An instance of the model version with its geometries at `revision_id`
+            instance = instance.revision_snapshot(
+                revision_id, model_class.REVISION_SNAPSHOT_RELATIONS
+            )
         except IndexError:
             raise serializers.ValidationError(f"Revision {revision_id} does not exist")
 
-        version.revision.version_set.all()
-
-        # An instance of the model version
-        instance = model_class(**version.field_dict)
         # Serialize the instance
         serializer = serializer_class(instance, context={"request": request})
 
         # Feature collection to return as proposal's proposalgeometry property
-        geometry_data = {"type": "FeatureCollection", "features": []}
-        # Build geometry data structure containing only the geometry versions at `revision_id`
-        proposalgeometries = instance.proposalgeometry.all()
-        for geometry in proposalgeometries:
-            # Get associated proposal geometry at the time of `revision_id`
-            pg_versions = (
-                Version.objects.get_for_object(geometry)
-                .filter(Q(revision_id__lte=revision_id))
-                .order_by("-revision__date_created")
-            )
-            pg_version = pg_versions.first()
-            if not pg_version:
-                # Geometry might not have existed back then
-                continue
-            # Build a proposal geometry instance from the version
-            proposalgeometry = ProposalGeometry(**pg_version.field_dict)
-            pg_serializer = ProposalGeometrySerializer(
-                proposalgeometry, context={"request": request}
-            )
-            # Append the geometry to the feature collection
-            geometry_data["features"].append(pg_serializer.data)
+        proposalgeometries = list(instance.proposalgeometry.all())
+        prefetch_related_objects(proposalgeometries, "copied_from__proposal")
+        pg_serializer = ProposalGeometrySerializer(
+            proposalgeometries, many=True, context={"request": request}
+        )
+        geometry_data = {
+            "type": "FeatureCollection",
+            "features": pg_serializer.data["features"],
+        }
 
         revision_data = serializer.data.copy()
         revision_data["proposalgeometry"] = OrderedDict(geometry_data)
@@ -1157,7 +1196,7 @@ class ProposalViewSet(UserActionLoggingViewset):
         https://stackoverflow.com/questions/29128225/django-rest-framework-3-1-breaks-pagination-paginationserializer
         """
         proposals = self.get_queryset().exclude(processing_status="discarded")
-        paginator = DatatablesPageNumberPagination()
+        paginator = DatatablesPagination()
         paginator.page_size = proposals.count()
         result_page = paginator.paginate_queryset(proposals, request)
         serializer = ListProposalSerializer(
@@ -1179,7 +1218,7 @@ class ProposalViewSet(UserActionLoggingViewset):
         https://stackoverflow.com/questions/29128225/django-rest-framework-3-1-breaks-pagination-paginationserializer
         """
         proposals = self.get_queryset()
-        paginator = DatatablesPageNumberPagination()
+        paginator = DatatablesPagination()
         paginator.page_size = proposals.count()
         result_page = paginator.paginate_queryset(proposals, request)
         serializer = ListProposalSerializer(
@@ -1211,10 +1250,19 @@ class ProposalViewSet(UserActionLoggingViewset):
     @basic_exception_handler
     def validate_map_files(self, request, *args, **kwargs):
         instance = self.get_object()
-        valid_geometry_saved = validate_map_files(request, instance)
-        instance.save()
-        if valid_geometry_saved:
-            populate_gis_data(instance, "proposalgeometry")
+        if request.data.get("background", None) in [True, "true"]:
+            # Large shapefiles can be imported in the background, the job can be
+            # polled from the background job api
+            job_id = start_job(
+                "validate_map_files",
+                request.user.id,
+                import_map_files,
+                request,
+                instance,
+                "proposalgeometry",
+            )
+            return Response({"job_id": job_id}, status=status.HTTP_202_ACCEPTED)
+        import_map_files(request, instance, "proposalgeometry")
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
@@ -1797,7 +1845,7 @@ class ProposalViewSet(UserActionLoggingViewset):
         methods=["GET"],
         detail=True,
         renderer_classes=[DatatablesRenderer],
-        pagination_class=DatatablesPageNumberPagination,
+        pagination_class=DatatablesPagination,
     )
     def related_items(self, request, *args, **kwargs):
         """Uses union to combine a queryset of multiple different model types
@@ -2335,53 +2383,7 @@ class SearchReferenceView(views.APIView):
 
     def get(self, request, format=None):
         search_term = request.GET.get("term", "")
-        proposals = Proposal.objects.filter(
-            Q(lodgement_number__icontains=search_term)
-            | Q(original_leaselicence_number__icontains=search_term)
-        )[:4]
-        proposal_results = [
-            {
-                "id": proposal.id,
-                "text": f"{ proposal.lodgement_number }"
-                + f" - { proposal.application_type.name_display }"
-                + f" - { proposal.proposal_type.description } [Proposal]",
-                "redirect_url": reverse(
-                    "internal-proposal-detail", kwargs={"pk": proposal.id}
-                ),
-            }
-            for proposal in proposals
-        ]
-        approvals = Approval.objects.filter(
-            Q(lodgement_number__icontains=search_term)
-            | Q(original_leaselicence_number__icontains=search_term)
-        )[:4]
-        approval_results = [
-            {
-                "id": approval.id,
-                "text": f"{ approval.lodgement_number } [Approval]",
-                "redirect_url": reverse(
-                    "internal-approval-detail", kwargs={"pk": approval.id}
-                ),
-            }
-            for approval in approvals
-        ]
-        compliances = Compliance.objects.filter(
-            lodgement_number__icontains=search_term
-        )[:4]
-        compliance_results = [
-            {
-                "id": compliance.id,
-                "text": f"{ compliance.lodgement_number } [Compliance]",
-                "redirect_url": reverse(
-                    "internal-compliance-detail",
-                    kwargs={"pk": compliance.id},
-                ),
-            }
-            for compliance in compliances
-        ]
-        data_transform = proposal_results + approval_results + compliance_results
-
-        return Response({"results": data_transform})
+        return Response({"results": search_results(search_term)})
 
 
 class AssessorChecklistViewSet(viewsets.ReadOnlyModelViewSet):
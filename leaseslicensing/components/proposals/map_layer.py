@@ -0,0 +1,202 @@
+"""Pre-rendered, simplified map data of the proposals shown on the proposals map."""
+
+import hashlib
+import json
+import logging
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.gis.geos import GEOSGeometry, MultiPolygon
+from django.db.models import Count, Max, Q
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+
+from leaseslicensing.components.proposals.models import (
+    ProposalGeometry,
+    ProposalMapFeature,
+)
+from leaseslicensing.components.proposals.serializers import (
+    ProposalMapFeatureDataSerializer,
+)
+from leaseslicensing.helpers import is_internal
+
+logger = logging.getLogger(__name__)
+
+# The features are rendered without a user, so they don't contain details urls, which
+# depend on the user (see `add_details_urls`)
+RENDER_CONTEXT = {"request": SimpleNamespace(user=AnonymousUser())}
+
+
+def round_coordinates(coordinates, precision):
+    if coordinates and isinstance(coordinates[0], (int, float)):
+        return [round(coordinate, precision) for coordinate in coordinates]
+    return [round_coordinates(c, precision) for c in coordinates]
+
+
+def map_features(data):
+    """Returns the polygon features of a proposal's and its competitive process' data"""
+
+    features = list(data["proposalgeometry"]["features"])
+    if data.get("competitive_process"):
+        features += data["competitive_process"]["competitive_process_geometries"][
+            "features"
+        ]
+    return features
+
+
+def render_map_feature(proposal):
+    """
+    Returns the (unsaved) map feature of a proposal that has been fetched with
+    `ProposalMapFeatureDataSerializer.get_prefetched_queryset`
+    """
+
+    precision = settings.MAP_FEATURE_COORDINATE_PRECISION
+    data = json.loads(
+        JSONRenderer().render(
+            ProposalMapFeatureDataSerializer(proposal, context=RENDER_CONTEXT).data
+        )
+    )
+    simplified_data = json.loads(json.dumps(data))
+
+    polygons = []
+    for feature, simplified_feature in zip(
+        map_features(data), map_features(simplified_data)
+    ):
+        if not feature.get("geometry"):
+            continue
+        polygon = GEOSGeometry(json.dumps(feature["geometry"]))
+        polygons.append(polygon)
+        simplified = polygon.simplify(
+            settings.MAP_FEATURE_SIMPLIFY_TOLERANCE, preserve_topology=True
+        )
+        feature["geometry"]["coordinates"] = round_coordinates(
+            feature["geometry"]["coordinates"], precision
+        )
+        simplified_feature["geometry"]["coordinates"] = round_coordinates(
+            json.loads(simplified.json)["coordinates"], precision
+        )
+
+    extent = None
+    if data["proposalgeometry"]["features"] and polygons:
+        extent = MultiPolygon(polygons, srid=4326).envelope
+        if extent.geom_type != "Polygon":
+            # The envelope of a single point or line is not a polygon
+            extent = extent.buffer(10**-precision).envelope
+
+    return ProposalMapFeature(
+        proposal=proposal,
+        data=data,
+        simplified_data=simplified_data,
+        extent=extent,
+        stale=False,
+    )
+
+
+def refresh_map_features(proposals, limit=None):
+    """
+    Renders the map features of the proposals in `proposals` that are stale or that
+    have polygons but no map feature yet
+
+    Args:
+        proposals (QuerySet): The proposals to render the map features of
+        limit (int, optional): The maximum number of map features to render, e.g.
+            when rendering on a request. The remaining map features are rendered on
+            later calls or by `rebuild_proposal_map_features`.
+
+    Returns:
+        int: The number of rendered map features
+    """
+
+    proposals = ProposalMapFeatureDataSerializer.get_prefetched_queryset(
+        proposals.filter(
+            Q(map_feature__stale=True)
+            | Q(
+                map_feature__isnull=True,
+                id__in=ProposalGeometry.objects.values("proposal_id"),
+            )
+        )
+    )
+    if limit is not None:
+        proposals = proposals.order_by("id")[:limit]
+    rendered = [render_map_feature(proposal) for proposal in proposals]
+    if rendered:
+        ProposalMapFeature.objects.bulk_create(
+            rendered,
+            update_conflicts=True,
+            unique_fields=["proposal"],
+            update_fields=["data", "simplified_data", "extent", "stale", "updated_at"],
+        )
+        logger.info(f"Rendered {len(rendered)} proposal map features")
+    if limit is not None and len(rendered) == limit:
+        logger.warning(
+            f"Rendered the maximum of {limit} proposal map features, any further "
+            "map features are rendered later"
+        )
+
+    return len(rendered)
+
+
+def map_features_etag(queryset, *variant):
+    """
+    Returns an ETag of the map features of `queryset` that changes whenever one of
+    them is rendered again, added or removed. `variant` distinguishes different
+    renderings of the same map features.
+    """
+
+    aggregate = queryset.aggregate(count=Count("id"), updated_at=Max("updated_at"))
+    key = ":".join(
+        str(value) for value in (*variant, aggregate["count"], aggregate["updated_at"])
+    )
+    return f'"{hashlib.md5(key.encode("utf-8")).hexdigest()}"'
+
+
+def proposal_details_url(request, proposal_id):
+    if not request.user.is_authenticated:
+        return None
+    if is_internal(request):
+        return reverse("internal-proposal-detail", kwargs={"pk": proposal_id})
+    return reverse("external-proposal-detail", kwargs={"proposal_pk": proposal_id})
+
+
+def add_details_urls(data, request):
+    """
+    Returns a copy of the map data of a proposal with the details urls of the user
+    of `request` (see `ListProposalMinimalSerializer.get_details_url` and
+    `CompetitiveProcessSerializer.get_details_url`)
+    """
+
+    data = dict(data, details_url=proposal_details_url(request, data["id"]))
+
+    features = data["proposalgeometry"]["features"]
+    if any(feature["properties"].get("proposal_copied_from") for feature in features):
+        copied_features = []
+        for feature in features:
+            copied_from = feature["properties"].get("proposal_copied_from")
+            if copied_from:
+                properties = dict(
+                    feature["properties"],
+                    proposal_copied_from=dict(
+                        copied_from,
+                        details_url=proposal_details_url(request, copied_from["id"]),
+                    ),
+                )
+                feature = dict(feature, properties=properties)
+            copied_features.append(feature)
+        data["proposalgeometry"] = dict(
+            data["proposalgeometry"], features=copied_features
+        )
+
+    competitive_process = data.get("competitive_process")
+    if competitive_process:
+        details_url = None
+        if request.user.is_authenticated:
+            details_url = ""
+            if is_internal(request):
+                details_url = reverse(
+                    "internal-competitiveprocess-detail",
+                    kwargs={"pk": competitive_process["id"]},
+                )
+        data["competitive_process"] = dict(competitive_process, details_url=details_url)
+
+    return data
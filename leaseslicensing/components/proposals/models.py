@@ -15,7 +15,6 @@ from django.conf import settings
 from django.contrib.gis.db.models.fields import PolygonField
 from django.contrib.gis.db.models.functions import Area
 from django.contrib.postgres.fields import ArrayField
-from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError, models, transaction
 from django.db.models import F, JSONField, Max, Min, Q
@@ -88,7 +87,7 @@ from leaseslicensing.components.tenure.models import (
     Vesting,
 )
 from leaseslicensing.helpers import is_approver, is_customer, user_ids_in_group
-from leaseslicensing.ledger_api_utils import retrieve_email_user
+from leaseslicensing.ledger_api_utils import prefetch_email_users, retrieve_email_user
 from leaseslicensing.settings import (
     APPLICATION_TYPE_LEASE_LICENCE,
     APPLICATION_TYPE_REGISTRATION_OF_INTEREST,
@@ -970,6 +969,12 @@ class Proposal(LicensingModelVersioned, DirtyFieldsMixin):
 
     MODEL_PREFIX = "P"
 
+    # The relations a revision snapshot loads as they were at the revision (see
+    # `revision_snapshot`). Only the geometries are saved in the revisions of a
+    # proposal. The tenure links (e.g. identifiers, regions) are written by
+    # `populate_gis_data` outside of any revision, so they are shown as they are now.
+    REVISION_SNAPSHOT_RELATIONS = ["proposalgeometry"]
+
     APPLICANT_TYPE_ORGANISATION = "ORG"
     APPLICANT_TYPE_INDIVIDUAL = "IND"
     APPLICANT_TYPE_PROXY = "PRX"
@@ -1243,8 +1248,6 @@ class Proposal(LicensingModelVersioned, DirtyFieldsMixin):
         verbose_name_plural = "Proposals"
 
     def save(self, *args, **kwargs):
-        # Clear out the cached
-        cache.delete(settings.CACHE_KEY_MAP_PROPOSALS)
         super().save(*args, **kwargs)
         if not ProposalAssessment.objects.filter(proposal=self).exists():
             # Make sure every proposal has an assessment object
@@ -1507,23 +1510,25 @@ class Proposal(LicensingModelVersioned, DirtyFieldsMixin):
 
     @property
     def allowed_assessors(self):
-        group = None
+        group_name = None
         if self.processing_status in [
             Proposal.PROCESSING_STATUS_WITH_APPROVER,
         ]:
-            group = self.get_approver_group()
+            group_name = GROUP_NAME_APPROVER
         elif self.processing_status in [
             Proposal.PROCESSING_STATUS_WITH_REFERRAL,
             Proposal.PROCESSING_STATUS_WITH_ASSESSOR,
             Proposal.PROCESSING_STATUS_WITH_ASSESSOR_CONDITIONS,
         ]:
-            group = self.get_assessor_group()
+            group_name = GROUP_NAME_ASSESSOR
 
-        if not group:
+        if not group_name:
             return []
 
+        member_ids = user_ids_in_group(group_name)
+        prefetch_email_users(member_ids)
         emailusers = []
-        for id in group.get_system_group_member_ids():
+        for id in member_ids:
             emailuser = retrieve_email_user(id)
             emailusers.append(emailuser)
 
@@ -1537,7 +1542,7 @@ class Proposal(LicensingModelVersioned, DirtyFieldsMixin):
     def compliance_assessors(self):
         # group = self.get_assessor_group()
         # return group.members if group else []
-        return self.get_assessor_group().get_system_group_member_ids()
+        return user_ids_in_group(GROUP_NAME_ASSESSOR)
 
     @property
     def can_officer_process(self):
@@ -1603,7 +1608,7 @@ class Proposal(LicensingModelVersioned, DirtyFieldsMixin):
     def assessor_recipients(self):
         logger.info("assessor_recipients")
         recipients = []
-        group_ids = self.get_assessor_group().get_system_group_member_ids()
+        group_ids = user_ids_in_group(GROUP_NAME_ASSESSOR)
         for id in group_ids:
             logger.info(id)
             recipient = retrieve_email_user(id)
@@ -1614,7 +1619,7 @@ class Proposal(LicensingModelVersioned, DirtyFieldsMixin):
     def approver_recipients(self):
         logger.info("approver_recipients")
         recipients = []
-        group_ids = self.get_approver_group().get_system_group_member_ids()
+        group_ids = user_ids_in_group(GROUP_NAME_APPROVER)
         for id in group_ids:
             logger.info(id)
             recipient = retrieve_email_user(id)
@@ -1623,11 +1628,11 @@ class Proposal(LicensingModelVersioned, DirtyFieldsMixin):
 
     # Check if the user is member of assessor group for the Proposal
     def is_assessor(self, user):
-        return user.id in self.get_assessor_group().get_system_group_member_ids()
+        return user.id in user_ids_in_group(GROUP_NAME_ASSESSOR)
 
     # Check if the user is member of assessor group for the Proposal
     def is_approver(self, user):
-        return user.id in self.get_assessor_group().get_system_group_member_ids()
+        return user.id in user_ids_in_group(GROUP_NAME_ASSESSOR)
 
     def can_action(self, user):
         if not self.can_assess(user):
@@ -1639,11 +1644,9 @@ class Proposal(LicensingModelVersioned, DirtyFieldsMixin):
             Proposal.PROCESSING_STATUS_WITH_ASSESSOR_CONDITIONS,
             Proposal.PROCESSING_STATUS_WITH_REFERRAL,
         ]:
-            logger.info("self.__assessor_group().get_system_group_member_ids()")
-            logger.info(self.get_assessor_group().get_system_group_member_ids())
-            return user.id in self.get_assessor_group().get_system_group_member_ids()
+            return user.id in user_ids_in_group(GROUP_NAME_ASSESSOR)
         elif self.processing_status == Proposal.PROCESSING_STATUS_WITH_APPROVER:
-            return user.id in self.get_approver_group().get_system_group_member_ids()
+            return user.id in user_ids_in_group(GROUP_NAME_APPROVER)
         else:
             return False
 
@@ -1692,7 +1695,7 @@ class Proposal(LicensingModelVersioned, DirtyFieldsMixin):
             == Proposal.PROCESSING_STATUS_WITH_ASSESSOR_CONDITIONS
         ):
             # return self.__assessor_group() in user.proposalassessorgroup_set.all()
-            return user.id in self.get_assessor_group().get_system_group_member_ids()
+            return user.id in user_ids_in_group(GROUP_NAME_ASSESSOR)
         else:
             return False
 
@@ -1710,9 +1713,9 @@ class Proposal(LicensingModelVersioned, DirtyFieldsMixin):
                 referral = None
             if referral:
                 return True
-            elif user.id in self.get_assessor_group().get_system_group_member_ids():
+            elif user.id in user_ids_in_group(GROUP_NAME_ASSESSOR):
                 return True
-            elif user.id in self.get_approver_group().get_system_group_member_ids():
+            elif user.id in user_ids_in_group(GROUP_NAME_APPROVER):
                 return True
             else:
                 return False
@@ -1733,17 +1736,12 @@ class Proposal(LicensingModelVersioned, DirtyFieldsMixin):
             if self.assigned_officer:
                 if self.assigned_officer == user.id:
                     # return self.__assessor_group() in user.proposalassessorgroup_set.all()
-                    return (
-                        user.id
-                        in self.get_assessor_group().get_system_group_member_ids()
-                    )
+                    return user.id in user_ids_in_group(GROUP_NAME_ASSESSOR)
                 else:
                     return False
             else:
                 # return self.__assessor_group() in user.proposalassessorgroup_set.all()
-                return (
-                    user.id in self.get_assessor_group().get_system_group_member_ids()
-                )
+                return user.id in user_ids_in_group(GROUP_NAME_ASSESSOR)
 
     def log_user_action(self, action, request):
         return ProposalUserAction.log_action(self, action, request.user.id)
@@ -2668,10 +2666,7 @@ class Proposal(LicensingModelVersioned, DirtyFieldsMixin):
 
     def generate_compliances(self, approval, request, only_future=False):
         today = timezone.now().date()
-        from leaseslicensing.components.compliances.models import (
-            Compliance,
-            ComplianceUserAction,
-        )
+        from leaseslicensing.components.compliances.models import Compliance
 
         # For amendment type of Proposal, check for copied requirements from previous proposal
         if self.proposal_type == PROPOSAL_TYPE_AMENDMENT:
@@ -2701,59 +2696,16 @@ class Proposal(LicensingModelVersioned, DirtyFieldsMixin):
         )
 
         # First, process all the requirements that are not related to gross turnover
-        for req in requirements:
-            if req.due_date and req.due_date >= today:
-                current_date = req.due_date
-                # create a first Compliance
-                try:
-                    compliance = Compliance.objects.get(
-                        requirement=req, due_date=current_date
-                    )
-                except Compliance.DoesNotExist:
-                    compliance = Compliance.objects.create(
-                        proposal=self,
-                        due_date=current_date,
-                        processing_status=Compliance.PROCESSING_STATUS_FUTURE,
-                        approval=approval,
-                        requirement=req,
-                    )
-                    compliance.log_user_action(
-                        ComplianceUserAction.ACTION_CREATE.format(compliance.id),
-                        request,
-                    )
-                if req.recurrence:
-                    while current_date < approval.expiry_date:
-                        for x in range(req.recurrence_schedule):
-                            # Weekly
-                            if req.recurrence_pattern == 1:
-                                current_date += relativedelta(weeks=1)
-                            # Monthly
-                            elif req.recurrence_pattern == 2:
-                                current_date += relativedelta(months=1)
-                            # Yearly
-                            elif req.recurrence_pattern == 3:
-                                current_date += relativedelta(years=1)
-
-                        # Create the compliance
-                        if current_date <= approval.expiry_date:
-                            try:
-                                compliance = Compliance.objects.get(
-                                    requirement=req, due_date=current_date
-                                )
-                            except Compliance.DoesNotExist:
-                                compliance = Compliance.objects.create(
-                                    proposal=self,
-                                    due_date=current_date,
-                                    processing_status=Compliance.PROCESSING_STATUS_FUTURE,
-                                    approval=approval,
-                                    requirement=req,
-                                )
-                                compliance.log_user_action(
-                                    ComplianceUserAction.ACTION_CREATE.format(
-                                        compliance.id
-                                    ),
-                                    request,
-                                )
+        Compliance.bulk_generate(
+            self,
+            approval,
+            {
+                req: req.compliance_due_dates(approval.expiry_date)
+                for req in requirements
+                if req.due_date and req.due_date >= today
+            },
+            request.user.id,
+        )
 
         self.generate_gross_turnover_compliances(only_future=only_future)
 
@@ -3314,6 +3266,13 @@ class Proposal(LicensingModelVersioned, DirtyFieldsMixin):
             )
             return None
 
+        # Set by `BaseProposalSerializer.get_prefetched_queryset`
+        prefetched_proposal_applicants = getattr(
+            self, "prefetched_proposal_applicants", None
+        )
+        if prefetched_proposal_applicants:
+            return prefetched_proposal_applicants[0]
+
         try:
             proposal_applicant = ProposalApplicant.objects.get(proposal=self)
         except ProposalApplicant.DoesNotExist:
@@ -4127,6 +4086,48 @@ class ProposalGeometry(models.Model):
         return self.area.sq_m / 10000
 
 
+class ProposalMapFeature(models.Model):
+    """
+    The pre-rendered map data of a proposal, i.e. what `list_for_map` returns for the
+    proposal, with its polygons at full and at reduced detail.
+    A feature is marked stale when the proposal or its geometries change and is
+    rendered again the next time the map is loaded (see
+    `leaseslicensing.components.proposals.map_layer`).
+    """
+
+    proposal = models.OneToOneField(
+        Proposal, on_delete=models.CASCADE, related_name="map_feature"
+    )
+    data = JSONField(default=dict)
+    simplified_data = JSONField(default=dict)
+    # The bounding box of the proposal's and its competitive process' polygons or
+    # None if the proposal has no polygons (and is not shown on the map)
+    extent = PolygonField(srid=4326, blank=True, null=True)
+    stale = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = "leaseslicensing"
+
+    def __str__(self):
+        return f"Map feature of Proposal: {self.proposal_id}"
+
+    @classmethod
+    def invalidate(cls, **filters):
+        """Marks the map features matching `filters` to be rendered again"""
+
+        cls.objects.filter(stale=False, **filters).update(stale=True)
+
+    @classmethod
+    def invalidate_instance(cls, instance):
+        """Marks the map features showing a proposal or competitive process stale"""
+
+        if isinstance(instance, CompetitiveProcess):
+            cls.invalidate(proposal__originating_competitive_process=instance)
+        else:
+            cls.invalidate(proposal=instance)
+
+
 class ProposalLogDocument(Document):
     log_entry = models.ForeignKey(
         "ProposalLogEntry", related_name="documents", on_delete=models.CASCADE
@@ -4989,6 +4990,40 @@ class ProposalRequirement(RevisionedMixin):
 
         super().save(**kwargs)
 
+    def compliance_due_dates(self, expiry_date):
+        """
+        Returns the due dates of the requirement's compliances for an approval that
+        expires on `expiry_date`: the due date and, if the requirement recurs, every
+        recurrence up to and including the expiry date
+        """
+
+        due_dates = [self.due_date]
+        if not self.recurrence:
+            return due_dates
+
+        recurrence = {
+            1: relativedelta(weeks=1),
+            2: relativedelta(months=1),
+            3: relativedelta(years=1),
+        }.get(self.recurrence_pattern)
+        if recurrence is None or not self.recurrence_schedule:
+            logger.warning(
+                f"ProposalRequirement {self.id} recurs without a valid recurrence "
+                f"(pattern: {self.recurrence_pattern}, schedule: {self.recurrence_schedule})"
+            )
+            return due_dates
+
+        current_date = self.due_date
+        while current_date < expiry_date:
+            # Add one recurrence at a time, e.g. monthly from Jan 31st 2024 is
+            # Feb 29th, then Mar 29th
+            for x in range(self.recurrence_schedule):
+                current_date += recurrence
+            if current_date <= expiry_date:
+                due_dates.append(current_date)
+
+        return due_dates
+
     def get_next_due_date(self, due_date):
         for x in range(self.recurrence_schedule):
             if self.recurrence_pattern == 1:
@@ -2,11 +2,10 @@ import datetime
 import logging
 
 from django.conf import settings
-from django.db.models import Q
+from django.db.models import Prefetch, Q
 from django.urls import reverse
 from django.utils.translation import gettext as _
 from ledger_api_client.ledger_models import EmailUserRO as EmailUser
-from ledger_api_client.managed_models import SystemGroup
 from rest_framework import serializers
 from rest_framework_gis.serializers import GeoFeatureModelSerializer
 
@@ -15,6 +14,7 @@ from leaseslicensing.components.invoicing.serializers import InvoicingDetailsSer
 from leaseslicensing.components.main.serializers import (
     ApplicationTypeSerializer,
     CommunicationLogEntrySerializer,
+    EmailUserPrefetchListSerializer,
     EmailUserSerializer,
 )
 from leaseslicensing.components.main.utils import get_secure_file_url
@@ -37,6 +37,7 @@ from leaseslicensing.components.proposals.models import (
     ProposalDeclinedDetails,
     ProposalDistrict,
     ProposalGeometry,
+    ProposalGroup,
     ProposalIdentifier,
     ProposalLGA,
     ProposalLogEntry,
@@ -53,18 +54,6 @@ from leaseslicensing.components.proposals.models import (
     RequirementDocument,
     SectionChecklist,
 )
-from leaseslicensing.components.tenure.models import (
-    LGA,
-    Act,
-    Category,
-    District,
-    Group,
-    Identifier,
-    Name,
-    Region,
-    Tenure,
-    Vesting,
-)
 from leaseslicensing.components.tenure.serializers import GroupSerializer
 from leaseslicensing.components.users.serializers import (
     ProposalApplicantSerializer,
@@ -76,9 +65,14 @@ from leaseslicensing.helpers import (
     is_finance_officer,
     is_internal,
     is_referee,
+    user_group_names,
 )
 from leaseslicensing.ledger_api_utils import retrieve_email_user
-from leaseslicensing.settings import GROUP_NAME_CHOICES
+from leaseslicensing.settings import (
+    GROUP_NAME_APPROVER,
+    GROUP_NAME_ASSESSOR,
+    GROUP_NAME_CHOICES,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -562,6 +556,58 @@ class BaseProposalSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ("supporting_documents",)
 
+    # The link tables of the gis data and categorisation fields and the field of the
+    # link table that refers to the gis data or category
+    related_id_and_name_relations = {
+        "identifiers": (ProposalIdentifier, "identifier"),
+        "vestings": (ProposalVesting, "vesting"),
+        "names": (ProposalName, "name"),
+        "acts": (ProposalAct, "act"),
+        "tenures": (ProposalTenure, "tenure"),
+        "categories": (ProposalCategory, "category"),
+        "regions": (ProposalRegion, "region"),
+        "districts": (ProposalDistrict, "district"),
+        "lgas": (ProposalLGA, "lga"),
+        "groups": (ProposalGroup, "group"),
+    }
+
+    @classmethod
+    def get_prefetched_queryset(cls, queryset):
+        """
+        Returns `queryset` with the relations the serializer reads loaded up front,
+        so that the number of queries needed to serialize a page of proposals does
+        not grow with the number of proposals on the page.
+        """
+
+        related_id_and_name_prefetches = [
+            Prefetch(relation, queryset=link_model.objects.select_related(field_name))
+            for relation, (link_model, field_name) in (
+                cls.related_id_and_name_relations.items()
+            )
+        ]
+        return queryset.select_related(
+            "application_type",
+            "proposal_type",
+            "org_applicant",
+            "site_name",
+            "approval__approval_type",
+            "originating_competitive_process",
+        ).prefetch_related(
+            *related_id_and_name_prefetches,
+            Prefetch(
+                "proposalgeometry",
+                queryset=ProposalGeometry.objects.select_related(
+                    "copied_from__proposal"
+                ),
+            ),
+            Prefetch(
+                "proposalapplicant_set",
+                queryset=ProposalApplicant.objects.order_by("id"),
+                to_attr="prefetched_proposal_applicants",
+            ),
+            "originating_competitive_process__competitive_process_geometries",
+        )
+
     def get_approval(self, obj):
         from leaseslicensing.components.approvals.serializers import (
             ApprovalBasicSerializer,
@@ -575,54 +621,59 @@ class BaseProposalSerializer(serializers.ModelSerializer):
         return None
 
     def get_identifiers(self, obj):
-        ids = ProposalIdentifier.objects.filter(proposal=obj).values_list(
-            "identifier__id", flat=True
-        )
-        return Identifier.objects.filter(id__in=ids).values("id", "name")
+        return self.get_related_id_and_name(obj, "identifiers")
 
     def get_vestings(self, obj):
-        ids = ProposalVesting.objects.filter(proposal=obj).values_list(
-            "vesting__id", flat=True
-        )
-        return Vesting.objects.filter(id__in=ids).values("id", "name")
+        return self.get_related_id_and_name(obj, "vestings")
 
     def get_names(self, obj):
-        ids = ProposalName.objects.filter(proposal=obj).values_list(
-            "name__id", flat=True
-        )
-        return Name.objects.filter(id__in=ids).values("id", "name")
+        return self.get_related_id_and_name(obj, "names")
 
     def get_acts(self, obj):
-        ids = ProposalAct.objects.filter(proposal=obj).values_list("act__id", flat=True)
-        return Act.objects.filter(id__in=ids).values("id", "name")
+        return self.get_related_id_and_name(obj, "acts")
 
     def get_tenures(self, obj):
-        ids = ProposalTenure.objects.filter(proposal=obj).values_list(
-            "tenure__id", flat=True
-        )
-        return Tenure.objects.filter(id__in=ids).values("id", "name")
+        return self.get_related_id_and_name(obj, "tenures")
 
     def get_categories(self, obj):
-        ids = ProposalCategory.objects.filter(proposal=obj).values_list(
-            "category__id", flat=True
-        )
-        return Category.objects.filter(id__in=ids).values("id", "name")
+        return self.get_related_id_and_name(obj, "categories")
 
     def get_regions(self, obj):
-        ids = ProposalRegion.objects.filter(proposal=obj).values_list(
-            "region__id", flat=True
-        )
-        return Region.objects.filter(id__in=ids).values("id", "name")
+        return self.get_related_id_and_name(obj, "regions")
 
     def get_districts(self, obj):
-        ids = ProposalDistrict.objects.filter(proposal=obj).values_list(
-            "district__id", flat=True
-        )
-        return District.objects.filter(id__in=ids).values("id", "name")
+        return self.get_related_id_and_name(obj, "districts")
 
     def get_lgas(self, obj):
-        ids = ProposalLGA.objects.filter(proposal=obj).values_list("lga__id", flat=True)
-        return LGA.objects.filter(id__in=ids).values("id", "name")
+        return self.get_related_id_and_name(obj, "lgas")
+
+    def get_related_id_and_name(self, obj, relation):
+        """
+        Returns the id and name of the distinct objects `obj` is linked to through the
+        link table `relation` (e.g. the identifiers through `ProposalIdentifier`).
+
+        Reads from the prefetch cache when the relation has been prefetched (see
+        `get_prefetched_queryset`) and falls back to a single query otherwise.
+        """
+
+        link_model, field_name = self.related_id_and_name_relations[relation]
+        model = link_model._meta.get_field(field_name).related_model
+        related_manager = getattr(obj, relation)
+        if relation not in getattr(obj, "_prefetched_objects_cache", {}):
+            return model.objects.filter(
+                id__in=related_manager.values(f"{field_name}_id")
+            ).values("id", "name")
+
+        related_objects = {
+            getattr(link, field_name) for link in related_manager.all()
+        } - {None}
+        ordering = model._meta.ordering
+        return [
+            {"id": related_object.id, "name": related_object.name}
+            for related_object in sorted(
+                related_objects, key=lambda o: [getattr(o, f) for f in ordering]
+            )
+        ]
 
     def get_details_url(self, obj):
         request = self.context["request"]
@@ -635,9 +686,8 @@ class BaseProposalSerializer(serializers.ModelSerializer):
                 )
 
     def get_groups(self, obj):
-        group_ids = obj.groups.values_list("group__id", flat=True)
-        group_qs = Group.objects.filter(id__in=group_ids).values("id", "name")
-        return GroupSerializer(group_qs, many=True).data
+        groups = self.get_related_id_and_name(obj, "groups")
+        return GroupSerializer(groups, many=True).data
 
     def get_lodgement_date_display(self, obj):
         if obj.lodgement_date:
@@ -694,11 +744,10 @@ class BaseProposalSerializer(serializers.ModelSerializer):
         accessing_user = request.user
         roles = []
 
+        group_names = user_group_names(request)
         for choice in GROUP_NAME_CHOICES:
-            group = SystemGroup.objects.get(name=choice[0])
-            ids = group.get_system_group_member_ids()
-            if accessing_user.id in ids:
-                roles.append(group.name)
+            if choice[0] in group_names:
+                roles.append(choice[0])
 
         referral_ids = list(proposal.referrals.values_list("referral", flat=True))
         if accessing_user.id in referral_ids:
@@ -809,6 +858,23 @@ class ListProposalMinimalSerializer(serializers.ModelSerializer):
             "competitive_process",
         )
 
+    @classmethod
+    def get_prefetched_queryset(cls, queryset):
+        """Returns `queryset` with the relations the serializer reads loaded up front"""
+
+        return queryset.select_related(
+            "application_type",
+            "originating_competitive_process",
+        ).prefetch_related(
+            Prefetch(
+                "proposalgeometry",
+                queryset=ProposalGeometry.objects.select_related(
+                    "copied_from__proposal"
+                ),
+            ),
+            "originating_competitive_process__competitive_process_geometries",
+        )
+
     def get_details_url(self, obj):
         request = self.context["request"]
         if request.user.is_authenticated:
@@ -873,6 +939,8 @@ class ListProposalSerializer(BaseProposalSerializer):
             "groups",
             "details_url",
         )
+        list_serializer_class = EmailUserPrefetchListSerializer
+        email_user_fields = ("submitter", "assigned_officer", "assigned_approver")
         # the serverSide functionality of datatables is such that only columns that have
         # field 'data' defined are requested from the serializer. We
         # also require the following additional fields for some of the mRender functions
@@ -908,12 +976,12 @@ class ListProposalSerializer(BaseProposalSerializer):
             Proposal.PROCESSING_STATUS_WITH_ASSESSOR,
             Proposal.PROCESSING_STATUS_WITH_ASSESSOR_CONDITIONS,
         ]:
-            if user.id in proposal.get_assessor_group().get_system_group_member_ids():
+            if GROUP_NAME_ASSESSOR in user_group_names(request):
                 accessing_user_can_process = True
         elif proposal.processing_status in [
             Proposal.PROCESSING_STATUS_WITH_APPROVER,
         ]:
-            if user.id in proposal.get_approver_group().get_system_group_member_ids():
+            if GROUP_NAME_APPROVER in user_group_names(request):
                 accessing_user_can_process = True
         elif proposal.processing_status in [
             Proposal.PROCESSING_STATUS_WITH_REFERRAL,
@@ -1987,3 +2055,35 @@ class ProposalMapFeatureInfoSerializer(ListProposalMinimalSerializer):
             "lodgement_date_display",
             "processing_status_display",
         )
+
+
+class CompetitiveProcessMapFeatureSerializer(CompetitiveProcessSerializer):
+    class Meta:
+        model = CompetitiveProcess
+        fields = (
+            "id",
+            "lodgement_number",
+            "competitive_process_geometries",
+            "status_display",
+            "created_at_display",
+            "label",  # A static value to be used on the map
+        )
+
+
+class ProposalMapFeatureDataSerializer(ListProposalMinimalSerializer):
+    """
+    The data of a proposal that is pre-rendered into its map feature. It is shared by
+    all users, so it contains only data that doesn't depend on the user. The details
+    urls are added per request (see `map_layer.add_details_urls`).
+    """
+
+    def get_details_url(self, obj):
+        return None
+
+    def get_competitive_process(self, obj):
+        if obj.originating_competitive_process:
+            return CompetitiveProcessMapFeatureSerializer(
+                obj.originating_competitive_process
+            ).data
+        else:
+            return None
@@ -1,9 +1,18 @@
 import logging
 
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from leaseslicensing.components.proposals.models import Proposal, Referral
+from leaseslicensing.components.competitive_processes.models import (
+    CompetitiveProcess,
+    CompetitiveProcessGeometry,
+)
+from leaseslicensing.components.proposals.models import (
+    Proposal,
+    ProposalGeometry,
+    ProposalMapFeature,
+    Referral,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -41,3 +50,30 @@ class ReferralListener:
                     Proposal.PROCESSING_STATUS_WITH_ASSESSOR
                 )
                 instance.proposal.save()
+
+
+class ProposalMapFeatureListener:
+    """
+    Marks the map features of proposals stale when the proposals, their competitive
+    processes or their geometries change
+    """
+
+    @staticmethod
+    @receiver(post_save, sender=Proposal)
+    @receiver(post_save, sender=CompetitiveProcess)
+    def _post_save(sender, instance, **kwargs):
+        ProposalMapFeature.invalidate_instance(instance)
+
+    @staticmethod
+    @receiver(post_save, sender=ProposalGeometry)
+    @receiver(post_delete, sender=ProposalGeometry)
+    def _proposal_geometry_changed(sender, instance, **kwargs):
+        ProposalMapFeature.invalidate(proposal_id=instance.proposal_id)
+
+    @staticmethod
+    @receiver(post_save, sender=CompetitiveProcessGeometry)
+    @receiver(post_delete, sender=CompetitiveProcessGeometry)
+    def _competitive_process_geometry_changed(sender, instance, **kwargs):
+        ProposalMapFeature.invalidate(
+            proposal__originating_competitive_process_id=instance.competitive_process_id
+        )
@@ -0,0 +1,214 @@
+from datetime import date
+
+import reversion
+from django.conf import settings
+from django.contrib.gis.geos import Polygon
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from reversion.models import Version
+
+from leaseslicensing.components.competitive_processes.models import (
+    CompetitiveProcess,
+    CompetitiveProcessGeometry,
+)
+from leaseslicensing.components.main.models import ApplicationType
+from leaseslicensing.components.proposals.map_layer import refresh_map_features
+from leaseslicensing.components.proposals.models import (
+    Proposal,
+    ProposalGeometry,
+    ProposalIdentifier,
+    ProposalRequirement,
+)
+from leaseslicensing.components.proposals.serializers import BaseProposalSerializer
+from leaseslicensing.components.tenure.models import Identifier
+
+
+class ProposalSerializerPrefetchTestCase(TestCase):
+    def setUp(self):
+        self.application_type = ApplicationType.objects.create(
+            name=settings.APPLICATION_TYPE_LEASE_LICENCE
+        )
+        self.identifiers = [
+            Identifier.objects.create(name=name) for name in ["R 1", "R 2"]
+        ]
+        self.serializer = BaseProposalSerializer()
+
+    def create_proposals(self, count):
+        for _ in range(count):
+            proposal = Proposal.objects.create(application_type=self.application_type)
+            for identifier in self.identifiers:
+                ProposalIdentifier.objects.create(
+                    proposal=proposal, identifier=identifier
+                )
+
+    def serialize_related_id_and_names(self, proposals):
+        return [
+            {
+                relation: list(self.serializer.get_related_id_and_name(p, relation))
+                for relation in BaseProposalSerializer.related_id_and_name_relations
+            }
+            for p in proposals
+        ]
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            self.serialize_related_id_and_names(
+                BaseProposalSerializer.get_prefetched_queryset(Proposal.objects.all())
+            )
+        return len(context)
+
+    def test_query_count_does_not_grow_with_the_number_of_proposals(self):
+        self.create_proposals(1)
+        query_count = self.count_queries()
+
+        self.create_proposals(4)
+        self.assertEqual(self.count_queries(), query_count)
+
+    def test_prefetched_and_queried_results_match(self):
+        self.create_proposals(1)
+        queried = self.serialize_related_id_and_names(Proposal.objects.all())
+        prefetched = self.serialize_related_id_and_names(
+            BaseProposalSerializer.get_prefetched_queryset(Proposal.objects.all())
+        )
+
+        self.assertEqual(prefetched, queried)
+        self.assertEqual(
+            prefetched[0]["identifiers"],
+            [{"id": i.id, "name": i.name} for i in self.identifiers],
+        )
+
+
+class ProposalMapFeatureTestCase(TestCase):
+    def setUp(self):
+        application_type = ApplicationType.objects.create(
+            name=settings.APPLICATION_TYPE_LEASE_LICENCE
+        )
+        self.proposal = Proposal.objects.create(application_type=application_type)
+        self.geometry = ProposalGeometry.objects.create(
+            proposal=self.proposal,
+            polygon=Polygon(
+                ((115, -32), (115, -31.9), (115.1, -31.9), (115.1, -32), (115, -32)),
+                srid=4326,
+            ),
+        )
+
+    def test_stale_map_features_are_rendered_again(self):
+        proposals = Proposal.objects.all()
+        self.assertEqual(refresh_map_features(proposals, limit=0), 0)
+        self.assertEqual(refresh_map_features(proposals), 1)
+        self.assertEqual(refresh_map_features(proposals), 0)
+
+        map_feature = Proposal.objects.get(id=self.proposal.id).map_feature
+        self.assertEqual(map_feature.extent.extent, (115, -32, 115.1, -31.9))
+        self.assertEqual(len(map_feature.data["proposalgeometry"]["features"]), 1)
+        # Details urls depend on the user and are added per request
+        self.assertIsNone(map_feature.data["details_url"])
+
+        self.geometry.save()
+        self.assertEqual(refresh_map_features(proposals), 1)
+
+    def test_competitive_process_is_rendered_without_user_data(self):
+        competitive_process = CompetitiveProcess.objects.create()
+        CompetitiveProcessGeometry.objects.create(
+            competitive_process=competitive_process,
+            polygon=self.geometry.polygon,
+        )
+        self.proposal.originating_competitive_process = competitive_process
+        self.proposal.save()
+
+        self.assertEqual(refresh_map_features(Proposal.objects.all()), 1)
+        data = Proposal.objects.get(id=self.proposal.id).map_feature.data
+        self.assertEqual(
+            set(data["competitive_process"]),
+            {
+                "id",
+                "lodgement_number",
+                "competitive_process_geometries",
+                "status_display",
+                "created_at_display",
+                "label",
+            },
+        )
+        self.assertEqual(
+            len(
+                data["competitive_process"]["competitive_process_geometries"][
+                    "features"
+                ]
+            ),
+            1,
+        )
+
+
+class ProposalRevisionSnapshotTestCase(TestCase):
+    def setUp(self):
+        application_type = ApplicationType.objects.create(
+            name=settings.APPLICATION_TYPE_LEASE_LICENCE
+        )
+        self.proposal = Proposal.objects.create(application_type=application_type)
+
+    def save_geometries(self, *geometries):
+        with reversion.create_revision():
+            reversion.set_comment("Saved geometries")
+            for geometry in geometries:
+                geometry.save()
+        return Version.objects.get_for_object(geometries[0]).first().revision_id
+
+    def test_geometries_at_revision(self):
+        polygon = Polygon(((0, 0), (0, 1), (1, 1), (1, 0), (0, 0)), srid=4326)
+        kept = ProposalGeometry(proposal=self.proposal, polygon=polygon)
+        deleted = ProposalGeometry(proposal=self.proposal, polygon=polygon)
+        first_revision_id = self.save_geometries(kept, deleted)
+        second_revision_id = self.save_geometries(kept)
+        deleted_id = deleted.id
+        deleted.delete()
+
+        def geometry_ids(revision_id):
+            return [
+                int(version.object_id)
+                for version in self.proposal.reverse_fk_versions_at(
+                    revision_id, "proposalgeometry"
+                )
+            ]
+
+        self.assertEqual(geometry_ids(first_revision_id), [kept.id, deleted_id])
+        self.assertEqual(geometry_ids(second_revision_id), [kept.id])
+
+    def test_tenure_relations_at_revision(self):
+        # Tenure links are written outside of any revision, like `populate_gis_data`
+        identifier = Identifier.objects.create(name="R 1")
+        ProposalIdentifier.objects.create(proposal=self.proposal, identifier=identifier)
+        with reversion.create_revision():
+            reversion.set_comment("Saved proposal")
+            self.proposal.save()
+        revision_id = Version.objects.get_for_object(self.proposal).first().revision_id
+
+        snapshot = self.proposal.revision_snapshot(
+            revision_id, Proposal.REVISION_SNAPSHOT_RELATIONS
+        )
+        self.assertEqual(
+            [link.identifier_id for link in snapshot.identifiers.all()],
+            [identifier.id],
+        )
+
+
+class ProposalRequirementDueDatesTestCase(SimpleTestCase):
+    def test_compliance_due_dates(self):
+        requirement = ProposalRequirement(due_date=date(2024, 1, 31))
+        self.assertEqual(
+            requirement.compliance_due_dates(date(2025, 1, 1)), [date(2024, 1, 31)]
+        )
+
+        # Every two months, one month at a time, up to and including the expiry date
+        requirement.recurrence = True
+        requirement.recurrence_pattern = 2
+        requirement.recurrence_schedule = 2
+        self.assertEqual(
+            requirement.compliance_due_dates(date(2024, 7, 29)),
+            [
+                date(2024, 1, 31),
+                date(2024, 3, 29),
+                date(2024, 5, 29),
+                date(2024, 7, 29),
+            ],
+        )
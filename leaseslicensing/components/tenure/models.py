@@ -1,4 +1,9 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.gis.db.models.fields import GeometryField
 from django.db import models
+from django.utils import timezone
 
 GIS_DATA_MODEL_NAMES = [
     "identifier",
@@ -159,3 +164,47 @@ class SiteName(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class GISLayer(models.Model):
+    """A geoserver layer whose features are synced into the local database, so that
+    intersections with the layer can be queried without calling the geoserver"""
+
+    layer_name = models.CharField(max_length=255, unique=True)
+    # The feature properties that have been synced
+    properties = models.JSONField(default=list)
+    srs_name = models.CharField(max_length=255)
+    feature_count = models.PositiveIntegerField(default=0)
+    synced_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "GIS Layer"
+        app_label = "leaseslicensing"
+        ordering = ["layer_name"]
+
+    def __str__(self):
+        return self.layer_name
+
+    @property
+    def is_current(self):
+        if not self.synced_at:
+            return False
+        max_age = timedelta(hours=settings.GIS_LAYER_CACHE_MAX_AGE)
+        return self.synced_at >= timezone.now() - max_age
+
+
+class GISLayerFeature(models.Model):
+    layer = models.ForeignKey(
+        GISLayer, related_name="features", on_delete=models.CASCADE
+    )
+    properties = models.JSONField(default=dict)
+    # Stored in the axis order the geoserver returns, i.e. the same order as the
+    # geometries that are sent to the geoserver to query the layer
+    geometry = GeometryField(srid=4326, spatial_index=True)
+
+    class Meta:
+        verbose_name = "GIS Layer Feature"
+        app_label = "leaseslicensing"
+
+    def __str__(self):
+        return f"{self.layer}: {self.properties}"
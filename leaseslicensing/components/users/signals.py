@@ -2,8 +2,12 @@ import logging
 
 from django.contrib.auth.signals import user_logged_in
 from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from ledger_api_client.managed_models import SystemGroup, SystemGroupPermission
 
 from leaseslicensing.components.proposals.models import ExternalRefereeInvite, Referral
+from leaseslicensing.helpers import SystemGroupMembers
 
 logger = logging.getLogger(__name__)
 
@@ -43,3 +47,11 @@ def process_external_referee_invite(sender, user, request, **kwargs):
 
 
 user_logged_in.connect(process_external_referee_invite)
+
+
+@receiver(post_save, sender=SystemGroup)
+@receiver(post_delete, sender=SystemGroup)
+@receiver(post_save, sender=SystemGroupPermission)
+@receiver(post_delete, sender=SystemGroupPermission)
+def invalidate_system_group_members(sender, **kwargs):
+    transaction.on_commit(SystemGroupMembers.invalidate)
@@ -0,0 +1,199 @@
+"""Runs django management commands in-process as cron jobs."""
+
+import logging
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from io import StringIO
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.core.management import call_command, get_commands, load_command_class
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils.html import escape
+
+logger = logging.getLogger(__name__)
+
+
+class CronJobResult:
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_SKIPPED = "skipped"
+
+    def __init__(self, name):
+        self.name = name
+        self.status = None
+        self.duration = 0
+        # Set by commands that define a `row_count` attribute
+        self.row_count = None
+        self.output = ""
+        self.error = ""
+
+    def __str__(self):
+        return f"{self.name}: {self.status} in {self.duration:.2f}s"
+
+
+def run_cron_job(name):
+    """
+    Runs the management command `name` with `call_command` and returns its result.
+    The command's stdout is captured per job, so jobs can run in parallel threads.
+    """
+
+    result = CronJobResult(name)
+    stdout = StringIO()
+    started = time.perf_counter()
+    try:
+        command = load_command_class(get_commands()[name], name)
+        call_command(command, stdout=stdout, stderr=stdout)
+        result.status = CronJobResult.STATUS_SUCCEEDED
+        result.row_count = getattr(command, "row_count", None)
+    except KeyboardInterrupt:
+        raise
+    except BaseException as e:
+        # E.g. a command calling `sys.exit()` must fail only its own job, rather
+        # than ending the worker thread without a result for the cron email
+        logger.exception(f"Cron job {name} failed: {e!r}")
+        result.status = CronJobResult.STATUS_FAILED
+        result.error = traceback.format_exc()
+    finally:
+        # Worker threads open their own database connections
+        connections.close_all()
+    result.duration = time.perf_counter() - started
+    result.output = stdout.getvalue()
+    logger.info(str(result))
+
+    return result
+
+
+def run_cron_jobs(jobs, max_workers=4):
+    """
+    Runs management commands in a pool of threads. A command starts as soon as all
+    commands it depends on have succeeded and is skipped if one of them did not.
+
+    Args:
+        jobs (dict):
+            Maps command names to the list of command names they depend on, e.g.
+            `{"update_compliance_status": [], "send_compliance_reminder":
+            ["update_compliance_status"]}`
+        max_workers (int, optional):
+            The maximum number of commands to run at the same time
+
+    Returns:
+        list: A CronJobResult for each command, in the order of `jobs`
+    """
+
+    for name, dependencies in jobs.items():
+        unknown = set(dependencies) - set(jobs)
+        if unknown:
+            raise ValueError(f"Cron job {name} depends on unknown jobs {unknown}")
+
+    results = {}
+    pending = dict(jobs)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = {}
+        while pending or running:
+            for name, dependencies in list(pending.items()):
+                if any(d in pending or d in running.values() for d in dependencies):
+                    continue
+                del pending[name]
+                if any(
+                    results[d].status != CronJobResult.STATUS_SUCCEEDED
+                    for d in dependencies
+                ):
+                    results[name] = CronJobResult(name)
+                    results[name].status = CronJobResult.STATUS_SKIPPED
+                    results[name].error = f"Skipped because of {dependencies}"
+                    logger.warning(f"Skipping cron job {name}")
+                    continue
+                running[executor.submit(run_cron_job, name)] = name
+
+            if not running:
+                if pending:
+                    raise ValueError(
+                        f"Cron jobs {list(pending)} have circular dependencies"
+                    )
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+
+    return [results[name] for name in jobs]
+
+
+def cron_results_to_html(results):
+    rows = []
+    for result in results:
+        color = "green" if result.status == CronJobResult.STATUS_SUCCEEDED else "red"
+        rows.append(
+            "<tr>"
+            f"<td>{result.name}</td>"
+            f'<td style="color: {color};">{result.status}</td>'
+            f"<td>{result.duration:.2f}s</td>"
+            f"<td>{'' if result.row_count is None else result.row_count}</td>"
+            "</tr>"
+        )
+    html = (
+        '<table border="1" cellpadding="4">'
+        "<tr><th>Job</th><th>Status</th><th>Duration</th><th>Rows</th></tr>"
+        f"{''.join(rows)}</table>"
+    )
+    for result in results:
+        html += result.output
+        if result.error:
+            html += f"<pre>{escape(result.error)}</pre>"
+
+    return html
+
+
+def send_cron_email(results):
+    if settings.WORKING_FROM_HOME:
+        logger.debug("Not sending email because WORKING_FROM_HOME is True")
+        return
+
+    email_instance = settings.EMAIL_INSTANCE
+    contents_of_cron_email = cron_results_to_html(results)
+    subject = f"{settings.SYSTEM_NAME_SHORT} - Cronjob"
+    to = (
+        settings.CRON_NOTIFICATION_EMAIL
+        if isinstance(settings.CRON_NOTIFICATION_EMAIL, list)
+        else [settings.CRON_NOTIFICATION_EMAIL]
+    )
+    msg = EmailMultiAlternatives(
+        subject,
+        contents_of_cron_email,
+        settings.EMAIL_FROM,
+        to,
+        headers={"System-Environment": email_instance},
+    )
+    msg.attach_alternative(contents_of_cron_email, "text/html")
+    msg.send()
+
+
+class CronCommand(BaseCommand):
+    """
+    Base class for commands that run a set of other management commands.
+    Subclasses declare `jobs`, a dict of command names to the command names that
+    have to succeed before them.
+    """
+
+    jobs = {}
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of jobs to run at the same time",
+        )
+
+    def handle(self, *args, **options):
+        logger.info(f"Running command {self.__module__}\n\n")
+
+        results = run_cron_jobs(self.jobs, max_workers=max(options["workers"], 1))
+        for result in results:
+            self.stdout.write(result.output)
+
+        logger.info(f"Command {self.__module__} completed")
+        send_cron_email(results)
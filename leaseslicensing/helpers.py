@@ -1,5 +1,6 @@
 import logging
 import re
+import uuid
 from decimal import Decimal
 
 from django.apps import apps
@@ -24,18 +25,53 @@ def gst_from_total(total_inc_gst):
     return Decimal(gst).quantize(Decimal("0.01"))
 
 
+class SystemGroupMembers:
+    """
+    Snapshot of the member ids of all system groups, keyed by group name.
+
+    The snapshot is shared between processes through the cache under a version stamp
+    that is replaced whenever a system group or system group permission is saved or
+    deleted in this system. It expires after a minute so that changes made in ledger
+    are picked up as well.
+    """
+
+    @classmethod
+    def version(cls):
+        return cache.get(settings.CACHE_KEY_SYSTEM_GROUP_MEMBERS_VERSION)
+
+    @classmethod
+    def get_members(cls) -> dict[str, frozenset[int]]:
+        cache_key = settings.CACHE_KEY_SYSTEM_GROUP_MEMBERS.format(cls.version())
+        members = cache.get(cache_key)
+        if members is None:
+            members = {
+                system_group.name: frozenset(system_group.get_system_group_member_ids())
+                for system_group in SystemGroup.objects.all()
+            }
+            cache.set(cache_key, members, settings.CACHE_TIMEOUT_1_MINUTE)
+            logger.debug(f"Loaded the members of {len(members)} system groups")
+
+        return members
+
+    @classmethod
+    def invalidate(cls):
+        cache.set(
+            settings.CACHE_KEY_SYSTEM_GROUP_MEMBERS_VERSION,
+            uuid.uuid4().hex,
+            settings.CACHE_TIMEOUT_NEVER,
+        )
+
+
 def user_ids_in_group(group_name):
-    try:
-        system_group = SystemGroup.objects.get(name=group_name)
-        return system_group.get_system_group_member_ids()
-    except SystemGroup.DoesNotExist:
+    members = SystemGroupMembers.get_members()
+    if group_name not in members:
         logger.warning(f"SystemGroup {group_name} does not exist.")
         return []
+    return list(members[group_name])
 
 
 def belongs_to_by_user_id(user_id, group_name):
-    system_group = SystemGroup.objects.filter(name=group_name).first()
-    return system_group and user_id in system_group.get_system_group_member_ids()
+    return user_id in SystemGroupMembers.get_members().get(group_name, ())
 
 
 def emails_list_for_group(group_name):
@@ -45,13 +81,34 @@ def emails_list_for_group(group_name):
     return [sgp.emailuser.email for sgp in sgp]
 
 
+def user_group_names(request):
+    """
+    Returns the names of the system groups the requesting user is a member of.
+    The memberships are looked up once and then remembered for the rest of the request.
+    """
+
+    # Use the underlying django request, so the memberships are shared with the
+    # rest framework request wrapping it
+    http_request = getattr(request, "_request", request)
+    group_names = getattr(http_request, "_system_group_names", None)
+    if group_names is None:
+        group_names = frozenset(
+            group_name
+            for group_name, member_ids in SystemGroupMembers.get_members().items()
+            if request.user.id in member_ids
+        )
+        http_request._system_group_names = group_names
+
+    return group_names
+
+
 def belongs_to(request, group_name):
     if not request.user.is_authenticated:
         return False
     if request.user.is_superuser:
         return True
 
-    return belongs_to_by_user_id(request.user.id, group_name)
+    return group_name in user_group_names(request)
 
 
 def is_competitive_process_editor(request):
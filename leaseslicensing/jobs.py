@@ -0,0 +1,129 @@
+"""Runs long running functions in a pool of background threads and reports their progress."""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from rest_framework.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.BACKGROUND_JOB_WORKERS,
+                thread_name_prefix="background-job",
+            )
+    return _executor
+
+
+def get_job_cache():
+    # The status is written by a worker thread and polled from other processes,
+    # so it bypasses the per-process tier of the default cache
+    return caches["shared"] if "shared" in settings.CACHES else caches["default"]
+
+
+class BackgroundJob:
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+
+    def __init__(self, name, user_id):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.user_id = user_id
+        self.status = self.STATUS_PENDING
+        self.stage = None
+        self.done = 0
+        self.total = None
+        self.error = ""
+        self.started = time.time()
+        self.duration = 0
+
+    @property
+    def cache_key(self):
+        return settings.CACHE_KEY_BACKGROUND_JOB.format(self.id)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "user_id": self.user_id,
+            "status": self.status,
+            "stage": self.stage,
+            "done": self.done,
+            "total": self.total,
+            "error": self.error,
+            "duration": self.duration,
+        }
+
+    def save(self):
+        self.duration = time.time() - self.started
+        get_job_cache().set(
+            self.cache_key, self.to_dict(), settings.CACHE_TIMEOUT_24_HOURS
+        )
+
+    def progress(self, stage, done, total):
+        """Records the progress of the job, passed to the job's function as
+        `progress`"""
+
+        self.stage, self.done, self.total = stage, done, total
+        self.save()
+
+    def run(self, func, *args, **kwargs):
+        self.status = self.STATUS_RUNNING
+        self.save()
+        try:
+            func(*args, progress=self.progress, **kwargs)
+            self.status = self.STATUS_SUCCEEDED
+        except ValidationError as e:
+            self.status = self.STATUS_FAILED
+            self.error = e.detail
+        except Exception as e:
+            logger.exception(f"Background job {self.name} ({self.id}) failed: {e}")
+            self.status = self.STATUS_FAILED
+            self.error = str(e)
+        finally:
+            # Worker threads open their own database connections
+            connections.close_all()
+        self.save()
+        logger.info(
+            f"Background job {self.name} ({self.id}) {self.status} "
+            f"in {self.duration:.2f}s"
+        )
+
+
+def start_job(name, user_id, func, *args, **kwargs):
+    """
+    Runs `func(*args, progress=<callable>, **kwargs)` in a background thread.
+    `func` reports its progress by calling `progress(stage, done, total)`.
+
+    Returns:
+        str: The id of the job, to be passed to `get_job`
+    """
+
+    job = BackgroundJob(name, user_id)
+    job.save()
+    get_executor().submit(job.run, func, *args, **kwargs)
+    logger.info(f"Started background job {name} ({job.id})")
+
+    return job.id
+
+
+def get_job(job_id):
+    """Returns the status and progress of a job as a dict or None if there is no
+    job with the id"""
+
+    return get_job_cache().get(settings.CACHE_KEY_BACKGROUND_JOB.format(job_id))
@@ -1,9 +1,11 @@
 import logging
 
+from asgiref.local import Local
 from django.conf import settings
 from django.core.cache import cache
 from ledger_api_client.ledger_models import EmailUserRO as EmailUser
 
+from leaseslicensing.cache import LRUCache
 from leaseslicensing.components.main.decorators import (
     basic_exception_handler,
     user_notexists_exception_handler,
@@ -12,18 +14,91 @@ from leaseslicensing.components.main.decorators import (
 logger = logging.getLogger(__name__)
 
 
+email_user_lru_cache = LRUCache(
+    settings.LEDGER_EMAIL_USER_LRU_CACHE_SIZE,
+    settings.CACHE_TIMEOUT_5_MINUTES,
+)
+
+# Request-scoped identity map of the email users loaded while handling a request.
+# It is only active between `open_email_user_identity_map` and
+# `close_email_user_identity_map` (see `EmailUserIdentityMapMiddleware`), so
+# long-running processes such as management commands don't hold on to stale users.
+_request_email_users = Local()
+
+
+def _identity_map():
+    email_users = getattr(_request_email_users, "email_users", None)
+    return {} if email_users is None else email_users
+
+
+def open_email_user_identity_map():
+    _request_email_users.email_users = {}
+
+
+def close_email_user_identity_map():
+    _request_email_users.email_users = None
+
+
+def prefetch_email_users(email_user_ids):
+    """
+    Loads the ledger email users with the given ids into the request-scoped identity
+    map, so that subsequent `retrieve_email_user` calls for these ids don't query ledger.
+    Ids that aren't in the identity map, the LRU cache or the shared cache are
+    fetched with a single query.
+
+    Args:
+        email_user_ids (iterable): The ids of the email users to load
+
+    Returns:
+        dict: The email users by id (users that don't exist are missing)
+    """
+
+    identity_map = _identity_map()
+    email_user_ids = {int(i) for i in email_user_ids if i}
+    missing = email_user_ids - identity_map.keys()
+    if missing:
+        email_users = email_user_lru_cache.get_many(missing)
+        missing -= email_users.keys()
+
+        if missing:
+            cache_keys = {
+                settings.CACHE_KEY_LEDGER_EMAIL_USER.format(i): i for i in missing
+            }
+            cached = {
+                cache_keys[key]: email_user
+                for key, email_user in cache.get_many(list(cache_keys)).items()
+            }
+            email_users.update(cached)
+            missing -= cached.keys()
+
+        if missing:
+            fetched = {u.id: u for u in EmailUser.objects.filter(id__in=missing)}
+            logger.debug(f"Fetched {len(fetched)} email users from ledger")
+            cache.set_many(
+                {
+                    settings.CACHE_KEY_LEDGER_EMAIL_USER.format(i): u
+                    for i, u in fetched.items()
+                },
+                settings.CACHE_TIMEOUT_5_SECONDS,
+            )
+            email_users.update(fetched)
+            # Remember users that don't exist for the rest of the request
+            identity_map.update({i: None for i in missing - fetched.keys()})
+
+        email_user_lru_cache.set_many(email_users)
+        identity_map.update(email_users)
+
+    return {
+        i: identity_map[i] for i in email_user_ids if identity_map.get(i) is not None
+    }
+
+
 @basic_exception_handler
 @user_notexists_exception_handler
 def retrieve_email_user(email_user_id):
-    cache_key = settings.CACHE_KEY_LEDGER_EMAIL_USER.format(email_user_id)
-    email_user = cache.get(cache_key)
-    if email_user is None:
-        try:
-            email_user = EmailUser.objects.get(id=email_user_id)
-        except EmailUser.DoesNotExist:
-            return None
-        cache.set(cache_key, email_user, settings.CACHE_TIMEOUT_5_SECONDS)
-    return email_user
+    if email_user_id is None:
+        return None
+    return prefetch_email_users([email_user_id]).get(int(email_user_id))
 
 
 def retrieve_default_from_email_user():
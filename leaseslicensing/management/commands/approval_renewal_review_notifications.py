@@ -76,4 +76,6 @@ class Command(BaseCommand):
             cmd_name, err_str, updates
         )
         logger.info(msg)
-        print(msg)  # will redirect to cron_tasks.log file, by the parent script
+        self.row_count = len(updates)
+        # will be included in the cron email by the parent command
+        self.stdout.write(msg)
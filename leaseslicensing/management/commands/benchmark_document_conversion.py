@@ -0,0 +1,102 @@
+import logging
+import subprocess
+import tempfile
+import time
+from io import BytesIO
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from docx import Document
+
+from leaseslicensing.components.main.document_conversion import DocumentConverter
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate docx documents and measure the throughput of converting them to pdf "
+        "with the document converter"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--documents",
+            type=int,
+            default=50,
+            help="Number of documents to convert",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.DOCUMENT_CONVERSION_WORKERS,
+            help="Number of concurrent LibreOffice commands",
+        )
+        parser.add_argument(
+            "--baseline",
+            action="store_true",
+            help="Also convert every document with a LibreOffice process of its own",
+        )
+
+    def generate_document(self, i):
+        doc = Document()
+        doc.add_heading(f"Licence L{i:06d}", 0)
+        for paragraph in range(20):
+            doc.add_paragraph(f"Condition {paragraph + 1} of licence L{i:06d}. " * 10)
+        buffer = BytesIO()
+        doc.save(buffer)
+        return buffer.getvalue()
+
+    def convert_one_by_one(self, documents):
+        with tempfile.TemporaryDirectory() as directory:
+            for i, content in enumerate(documents):
+                path = f"{directory}/licence_{i}.docx"
+                with open(path, "wb") as f:
+                    f.write(content)
+                subprocess.run(
+                    [
+                        settings.LIBREOFFICE_COMMAND,
+                        "--headless",
+                        "--convert-to",
+                        "pdf",
+                        "--outdir",
+                        directory,
+                        path,
+                    ],
+                    capture_output=True,
+                    check=True,
+                )
+
+    def handle(self, *args, **options):
+        count = max(options["documents"], 1)
+        documents = [self.generate_document(i) for i in range(count)]
+        timings = {}
+
+        if options["baseline"]:
+            started = time.perf_counter()
+            self.convert_one_by_one(documents)
+            timings["one process per document"] = time.perf_counter() - started
+
+        converter = DocumentConverter(workers=options["workers"])
+        try:
+            # Initialise the workers' profiles before timing
+            converter.convert(
+                [(f"warm-up_{i}.docx", documents[0]) for i in range(options["workers"])]
+            )
+            started = time.perf_counter()
+            converter.convert(
+                [(f"licence_{i}.docx", content) for i, content in enumerate(documents)]
+            )
+            timings[f"converter with {options['workers']} workers"] = (
+                time.perf_counter() - started
+            )
+        finally:
+            converter.shutdown()
+
+        msg = f"Converted {count} documents to pdf\n"
+        msg += "\n".join(
+            f"    {name}: {seconds:.2f}s ({count / seconds:.1f} documents/s)"
+            for name, seconds in timings.items()
+        )
+        logger.info(msg)
+        self.stdout.write(msg)
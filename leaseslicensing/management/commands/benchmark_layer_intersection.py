@@ -0,0 +1,121 @@
+import json
+import logging
+import time
+
+import shapely
+from django.contrib.gis.geos import GEOSGeometry
+from django.core.management.base import BaseCommand
+
+from leaseslicensing.components.main.utils import intersects_any
+
+logger = logging.getLogger(__name__)
+
+# The south west corner of the generated layer, near Perth (EPSG:4326)
+BENCHMARK_ORIGIN = (115.5, -32.5)
+# The width of a generated feature and of the gap to the next one, in degrees
+FEATURE_SIZE = 0.001
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a GeoJSON layer of square features (by default as many as the "
+        "DBCA legislated lands and waters layer) and time checking proposal polygons "
+        "against it, with a linear scan of prepared GEOS geometries and with the "
+        "STR-tree query of `intersects_any`"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--features",
+            type=int,
+            default=50000,
+            help="Number of layer features to generate",
+        )
+        parser.add_argument(
+            "--polygons",
+            type=int,
+            default=100,
+            help="Number of proposal polygons to check against the layer",
+        )
+
+    def generate_layer(self, count):
+        columns = max(int(count**0.5), 1)
+        step = FEATURE_SIZE * 2
+        features = []
+        for i in range(count):
+            x = BENCHMARK_ORIGIN[0] + (i % columns) * step
+            y = BENCHMARK_ORIGIN[1] + (i // columns) * step
+            x2, y2 = x + FEATURE_SIZE, y + FEATURE_SIZE
+            features.append(
+                {
+                    "type": "Feature",
+                    "properties": {"id": i},
+                    "geometry": {
+                        "type": "Polygon",
+                        "coordinates": [[[x, y], [x, y2], [x2, y2], [x2, y], [x, y]]],
+                    },
+                }
+            )
+        return {"type": "FeatureCollection", "features": features}
+
+    def generate_polygons(self, count, features):
+        """Squares spread over the layer, which alternately hit features and gaps"""
+
+        columns = max(int(features**0.5), 1)
+        step = FEATURE_SIZE * 2
+        polygons = []
+        for i in range(count):
+            column = (i * 7919) % columns
+            row = (i * 104729) % max(features // columns, 1)
+            x = BENCHMARK_ORIGIN[0] + column * step + (i % 2) * FEATURE_SIZE * 1.25
+            y = BENCHMARK_ORIGIN[1] + row * step + (i % 2) * FEATURE_SIZE * 1.25
+            polygons.append(
+                shapely.box(x, y, x + FEATURE_SIZE / 2, y + FEATURE_SIZE / 2)
+            )
+        return polygons
+
+    def handle(self, *args, **options):
+        feature_count = max(options["features"], 1)
+        polygons = self.generate_polygons(max(options["polygons"], 1), feature_count)
+        layer = json.loads(json.dumps(self.generate_layer(feature_count)))
+        timings = {}
+
+        # The layer is parsed on every check, like `get_dbca_lands_and_waters_geos`
+        started = time.perf_counter()
+        prepared = [
+            GEOSGeometry(json.dumps(feature["geometry"])).prepared
+            for feature in layer["features"]
+        ]
+        timings["parse into prepared GEOS geometries"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        linear = [
+            any(geometry.intersects(polygon) for geometry in prepared)
+            for polygon in (GEOSGeometry(p.wkt, srid=4326) for p in polygons)
+        ]
+        timings["linear scan of prepared GEOS geometries"] = (
+            time.perf_counter() - started
+        )
+
+        started = time.perf_counter()
+        geometries = shapely.from_geojson(
+            [json.dumps(feature["geometry"]) for feature in layer["features"]]
+        )
+        timings["parse into shapely geometries"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        indexed = intersects_any(polygons, geometries).tolist()
+        timings["STR-tree query (intersects_any)"] = time.perf_counter() - started
+
+        if indexed != linear:
+            logger.error("The STR-tree query and the linear scan disagree")
+
+        msg = (
+            f"Checked {len(polygons)} polygons ({sum(indexed)} intersecting) against "
+            f"{feature_count} layer features\n"
+        )
+        msg += "\n".join(
+            f"    {stage}: {seconds:.3f}s" for stage, seconds in timings.items()
+        )
+        logger.info(msg)
+        self.stdout.write(msg)
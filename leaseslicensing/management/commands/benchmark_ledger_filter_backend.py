@@ -0,0 +1,154 @@
+import logging
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from ledger_api_client.ledger_models import EmailUserRO as EmailUser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from leaseslicensing.components.main.filters import LedgerDatatablesFilterBackend
+from leaseslicensing.components.main.models import ApplicationType
+from leaseslicensing.components.proposals.models import Proposal
+
+logger = logging.getLogger(__name__)
+
+
+class BenchmarkRollback(Exception):
+    """Rolls back the proposals created by the benchmark"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Create growing numbers of proposals (in a transaction that is rolled back) and "
+        "time and measure the memory of searching and ordering a dashboard page with "
+        "the LedgerDatatablesFilterBackend"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=str,
+            default="1000,10000,50000",
+            help="Comma separated numbers of proposals to benchmark",
+        )
+        parser.add_argument(
+            "--page_size",
+            type=int,
+            default=10,
+            help="Number of proposals on a dashboard page",
+        )
+        parser.add_argument(
+            "--search",
+            type=str,
+            default="00",
+            help="The search box value",
+        )
+
+    def datatables_request(self, search, page_size):
+        """A dashboard request ordered by the submitter's (ledger) name"""
+
+        columns = [
+            ("lodgement_number", "lodgement_number"),
+            ("id", "submitter__first_name, submitter__last_name"),
+        ]
+        params = {
+            "draw": 1,
+            "start": 0,
+            "length": page_size,
+            "search[value]": search,
+            "search[regex]": "false",
+            "order[0][column]": 1,
+            "order[0][dir]": "asc",
+        }
+        for i, (data, name) in enumerate(columns):
+            params.update(
+                {
+                    f"columns[{i}][data]": data,
+                    f"columns[{i}][name]": name,
+                    f"columns[{i}][searchable]": "true",
+                    f"columns[{i}][orderable]": "true",
+                    f"columns[{i}][search][value]": "",
+                    f"columns[{i}][search][regex]": "false",
+                }
+            )
+        return Request(APIRequestFactory().get("/", params))
+
+    def create_proposals(self, count, start, application_type, submitter_ids):
+        proposals = Proposal.objects.bulk_create(
+            [
+                Proposal(
+                    application_type=application_type,
+                    submitter=(
+                        submitter_ids[i % len(submitter_ids)] if submitter_ids else None
+                    ),
+                )
+                for i in range(start, start + count)
+            ],
+            batch_size=1000,
+        )
+        for proposal in proposals:
+            proposal.lodgement_number = f"{Proposal.MODEL_PREFIX}{proposal.pk:06d}"
+        Proposal.objects.bulk_update(proposals, ["lodgement_number"], batch_size=1000)
+
+    def measure(self, request, page_size):
+        """Returns the seconds and peak memory of filtering and fetching a page"""
+
+        backend = LedgerDatatablesFilterBackend()
+        view = type("BenchmarkView", (), {})()
+        tracemalloc.start()
+        started = time.perf_counter()
+        queryset = backend.apply_request(
+            request,
+            Proposal.objects.all(),
+            view,
+            ledger_lookup_fields=["submitter"],
+        )
+        page = list(queryset[:page_size])
+        seconds = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return seconds, peak, len(page)
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options["rows"].split(",") if size)
+        page_size = max(options["page_size"], 1)
+        request = self.datatables_request(options["search"], page_size)
+        submitter_ids = list(EmailUser.objects.values_list("id", flat=True)[:100])
+
+        results = []
+        try:
+            with transaction.atomic():
+                application_type, _ = ApplicationType.objects.get_or_create(
+                    name=settings.APPLICATION_TYPE_LEASE_LICENCE
+                )
+                existing = Proposal.objects.count()
+                created = 0
+                for size in sizes:
+                    self.create_proposals(
+                        max(size - existing - created, 0),
+                        created,
+                        application_type,
+                        submitter_ids,
+                    )
+                    created = max(size - existing, created)
+                    results.append(
+                        (Proposal.objects.count(), *self.measure(request, page_size))
+                    )
+                raise BenchmarkRollback()
+        except BenchmarkRollback:
+            pass
+
+        msg = (
+            f"Searched `{options['search']}` and ordered by submitter name "
+            f"({len(submitter_ids)} ledger users), page size {page_size}\n"
+        )
+        msg += "\n".join(
+            f"    {rows} proposals: {seconds:.3f}s, peak memory "
+            f"{peak / 1024:.0f} KiB, {page_rows} rows on the page"
+            for rows, seconds, peak, page_rows in results
+        )
+        logger.info(msg)
+        self.stdout.write(msg)
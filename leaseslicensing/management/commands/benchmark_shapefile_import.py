@@ -0,0 +1,126 @@
+import logging
+import os
+import tempfile
+import time
+
+import geopandas as gpd
+import shapely
+from django.contrib.gis.geos import GEOSGeometry, Polygon
+from django.core.management.base import BaseCommand
+
+from leaseslicensing.components.main.utils import (
+    get_layer_geometries,
+    intersects_any,
+    read_shapefile_polygons,
+    tenure_layer_specification,
+)
+
+logger = logging.getLogger(__name__)
+
+# GDA94 / MGA zone 50, i.e. a projected crs the shapefiles are commonly uploaded in
+BENCHMARK_CRS = "epsg:28350"
+# Perth
+BENCHMARK_ORIGIN = (390000, 6465000)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a shapefile of square polygons (every tenth pair of squares as a "
+        "multipolygon) and time the stages of the shapefile import without saving "
+        "any geometries"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--polygons",
+            type=int,
+            default=10000,
+            help="Number of polygons to generate",
+        )
+        parser.add_argument(
+            "--tenure_layer",
+            action="store_true",
+            help=(
+                "Check the polygons against the tenure layer instead of a generated "
+                "layer covering all polygons"
+            ),
+        )
+
+    def generate_shapefile(self, path, count):
+        size = 100  # metres
+        columns = max(int(count**0.5), 1)
+        squares = [
+            shapely.box(
+                BENCHMARK_ORIGIN[0] + (i % columns) * size * 2,
+                BENCHMARK_ORIGIN[1] + (i // columns) * size * 2,
+                BENCHMARK_ORIGIN[0] + (i % columns) * size * 2 + size,
+                BENCHMARK_ORIGIN[1] + (i // columns) * size * 2 + size,
+            )
+            for i in range(count)
+        ]
+        geometries = []
+        i = 0
+        while i < len(squares):
+            if i % 20 == 0 and i + 1 < len(squares):
+                geometries.append(shapely.MultiPolygon([squares[i], squares[i + 1]]))
+                i += 2
+            else:
+                geometries.append(squares[i])
+                i += 1
+        gpd.GeoDataFrame(
+            {"name": [f"polygon {i}" for i in range(len(geometries))]},
+            geometry=geometries,
+            crs=BENCHMARK_CRS,
+        ).to_file(path)
+
+    def handle(self, *args, **options):
+        count = max(options["polygons"], 1)
+        timings = {}
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "benchmark.shp")
+            started = time.perf_counter()
+            self.generate_shapefile(path, count)
+            timings["generate"] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            polygons = read_shapefile_polygons(path, "benchmark.shp")
+            timings["read, reproject and explode"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        bounds = shapely.total_bounds(polygons)
+        if options["tenure_layer"]:
+            specs = tenure_layer_specification()
+            if specs["invert_xy"]:
+                polygons = shapely.transform(
+                    polygons, lambda coordinates: coordinates[:, ::-1]
+                )
+                bounds = shapely.total_bounds(polygons)
+            geometries, source = get_layer_geometries(
+                Polygon.from_bbox(bounds),
+                specs["server_url"],
+                specs["layer_name"],
+                specs["version"],
+                specs["the_geom"],
+            )
+        else:
+            geometries, source = [shapely.box(*bounds)], "generated layer"
+        timings[f"fetch layer ({source})"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        intersects = intersects_any(polygons, geometries)
+        timings["intersect"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for wkb in shapely.to_wkb(polygons):
+            GEOSGeometry(memoryview(wkb), srid=4326)
+        timings["convert"] = time.perf_counter() - started
+
+        msg = (
+            f"Imported {len(polygons)} polygons ({intersects.sum()} intersecting "
+            f"{len(geometries)} layer features) in {sum(timings.values()):.2f}s\n"
+        )
+        msg += "\n".join(
+            f"    {stage}: {seconds:.3f}s" for stage, seconds in timings.items()
+        )
+        logger.info(msg)
+        self.stdout.write(msg)
@@ -1,12 +1,15 @@
 import logging
-import traceback
 
 from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from ledger_api_client.ledger_models import EmailUserRO as EmailUser
 
-from leaseslicensing.components.approvals.models import Approval
+from leaseslicensing.components.approvals.email import (
+    send_approval_expire_email_notification,
+)
+from leaseslicensing.components.approvals.models import Approval, ApprovalUserAction
+from leaseslicensing.components.proposals.models import ProposalUserAction
 
 logger = logging.getLogger(__name__)
 
@@ -20,24 +23,19 @@ class Command(BaseCommand):
         except EmailUser.DoesNotExist:
             user = EmailUser.objects.create(email=settings.CRON_EMAIL, password="")
 
-        errors = []
-        updates = []
         today = timezone.localtime(timezone.now()).date()
         logger.info(f"Running command {__name__}")
-        # for a in Approval.objects.filter(status='current'):
-        for a in Approval.objects.filter(status__in=Approval.CURRENT_APPROVAL_STATUSES):
-            if a.expiry_date < today:
-                try:
-                    a.expire_approval(user)
-                    a.save()
-                    logger.info(f"Updated Approval {a.id} status to {a.status}")
-                    updates.append(a.lodgement_number)
-                except Exception as e:
-                    err_msg = "Error updating Approval {} status".format(
-                        a.lodgement_number
-                    )
-                    logger.error(f"{err_msg}\n{e}\n{traceback.format_exc()}")
-                    errors.append(err_msg)
+        approvals, errors = Approval.bulk_transition(
+            Approval.objects.filter(
+                status=Approval.APPROVAL_STATUS_CURRENT, expiry_date__lt=today
+            ),
+            Approval.APPROVAL_STATUS_EXPIRED,
+            user,
+            ApprovalUserAction.ACTION_EXPIRE_APPROVAL,
+            ProposalUserAction.ACTION_EXPIRED_APPROVAL_,
+            emails=[send_approval_expire_email_notification],
+        )
+        updates = [a.lodgement_number for a in approvals]
 
         cmd_name = __name__.split(".")[-1].replace("_", " ").upper()
         err_str = (
@@ -49,4 +47,6 @@ class Command(BaseCommand):
             cmd_name, err_str, updates
         )
         logger.info(msg)
-        print(msg)  # will redirect to cron_tasks.log file, by the parent script
+        self.row_count = len(updates)
+        # will be included in the cron email by the parent command
+        self.stdout.write(msg)
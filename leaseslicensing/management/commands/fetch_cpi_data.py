@@ -24,7 +24,10 @@ import xml.etree.ElementTree as ET
 import requests
 from django.core.management.base import BaseCommand
 
-from leaseslicensing.components.invoicing.models import ConsumerPriceIndex
+from leaseslicensing.components.invoicing.models import (
+    ConsumerPriceIndex,
+    ConsumerPriceIndexTable,
+)
 from leaseslicensing.settings import (
     ABS_API_CPI_PATH,
     ABS_API_CPI_SUBDIRECTORY,
@@ -43,6 +46,7 @@ class Command(BaseCommand):
         cpi_data = requests.get(url)
         logger.info(f"Request took: {cpi_data.elapsed.total_seconds()} seconds.")
         root = ET.fromstring(cpi_data.content)
+        created_count = 0
         for node in root[1][0]:
             if node[0].attrib["id"] != "TIME_PERIOD":
                 continue
@@ -55,6 +59,11 @@ class Command(BaseCommand):
                 year=year, quarter=quarter, value=value
             )
             if created:
+                created_count += 1
                 logger.info(
                     f"Created New CPI Data Record - Time Period: {time_period}, Value: {value}"
                 )
+
+        if created_count > 0:
+            # Make sure all processes reload the CPI lookup table
+            ConsumerPriceIndexTable.invalidate()
@@ -1,10 +1,12 @@
 import logging
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from django.conf import settings
 from django.core.management.base import BaseCommand
-from django.db import IntegrityError
+from django.db import IntegrityError, connections, transaction
 from django.db.models import Q
 from django.utils import timezone
 
@@ -35,131 +37,267 @@ class Command(BaseCommand):
             type=str,
             help="Test date (YYYY-MM-DD) to use instead of today",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of worker threads used to send the invoice notification emails",
+        )
 
     def handle(self, *args, **options):
         logger.info(f"Running command {__name__}")
 
         testing = options["test"]
+        workers = max(options["workers"], 1)
 
         today = timezone.localtime(timezone.now()).date()
         if options["test_date"]:
             logger.info(f"Using test date {options['test_date']} instead of today")
             today = datetime.strptime(options["test_date"], "%Y-%m-%d").date()
 
-        scheduled_invoices = ScheduledInvoice.objects.filter(
-            Q(invoice__isnull=True)
-            | (
-                Q(notification_email_sent=False)
-                & Q(
-                    attempts_to_send_notification_email__lte=settings.MAX_ATTEMPTS_TO_SEND_INVOICE_NOTIFICATION_EMAIL
-                    - 1
-                )
-            ),
-            invoicing_details__proposal__approval__status__in=Approval.CURRENT_APPROVAL_STATUSES,
-            invoicing_details__proposal__processing_status=Proposal.PROCESSING_STATUS_APPROVED,
-            date_to_generate__lte=today,
-        )
-        scheduled_invoice_count = scheduled_invoices.count()
+        timings = {}
+
+        started = time.perf_counter()
+        scheduled_invoices = self.get_scheduled_invoices(today)
+        timings["select"] = time.perf_counter() - started
+
+        scheduled_invoice_count = len(scheduled_invoices)
         logger.info(
             f"Found {scheduled_invoice_count} scheduled invoices that need generation "
             f"and or notification today({today})"
         )
 
+        started = time.perf_counter()
+        new_invoices = self.price_invoices(scheduled_invoices)
+        timings["price"] = time.perf_counter() - started
+
+        started = time.perf_counter()
         invoices_generated = []
+        if testing:
+            for invoice in new_invoices:
+                logger.info(f"Test mode - Invoice record would be generated: {invoice}")
+        else:
+            invoices_generated = self.create_invoices(new_invoices)
+        timings["create"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        if testing:
+            logger.info(
+                "Test mode - Invoice email nofitication would have been sent to proponent and finance group"
+            )
+        else:
+            self.send_notifications(scheduled_invoices, workers)
+        timings["notify"] = time.perf_counter() - started
+
+        if scheduled_invoice_count > 0:
+            logger.info(f"Generated the following invoices {invoices_generated}")
+        logger.info(
+            "Stage timings: "
+            + ", ".join(
+                f"{stage}: {seconds:.2f}s" for stage, seconds in timings.items()
+            )
+        )
+        logger.info(f"Finished running command {__name__}")
+
+    def get_scheduled_invoices(self, today):
+        """Returns the scheduled invoices due today with everything needed to price them"""
+        invoicing_details = "invoicing_details"
+        approval = "invoicing_details__proposal__approval"
+        max_attempts = settings.MAX_ATTEMPTS_TO_SEND_INVOICE_NOTIFICATION_EMAIL
+        return list(
+            ScheduledInvoice.objects.filter(
+                Q(invoice__isnull=True)
+                | (
+                    Q(notification_email_sent=False)
+                    & Q(attempts_to_send_notification_email__lte=max_attempts - 1)
+                ),
+                invoicing_details__proposal__approval__status__in=Approval.CURRENT_APPROVAL_STATUSES,
+                invoicing_details__proposal__processing_status=Proposal.PROCESSING_STATUS_APPROVED,
+                date_to_generate__lte=today,
+            )
+            .select_related(
+                "invoice",
+                f"{invoicing_details}__charge_method",
+                f"{invoicing_details}__invoicing_repetition_type",
+                f"{invoicing_details}__cpi_calculation_method",
+                f"{invoicing_details}__proposal__proposal_type",
+                f"{approval}__approval_type",
+                f"{approval}__current_proposal__invoicing_details__oracle_code",
+            )
+            .prefetch_related(
+                f"{invoicing_details}__annual_increment_amounts",
+                f"{invoicing_details}__annual_increment_percentages",
+                f"{invoicing_details}__custom_cpi_years",
+                f"{invoicing_details}__gross_turnover_percentages",
+            )
+        )
+
+    def price_invoices(self, scheduled_invoices):
+        """
+        Returns unsaved invoices for the scheduled invoices that don't have one yet.
+        Every invoicing details' schedule is computed once, no matter how many of its
+        scheduled invoices are due.
+        """
+        invoicing_details_by_id = {}
+        schedules = {}
+        new_invoices = []
         for scheduled_invoice in scheduled_invoices:
+            if hasattr(scheduled_invoice, "invoice"):
+                continue
+
             logger.info(f"Processing scheduled invoice {scheduled_invoice.id}")
-            if not hasattr(scheduled_invoice, "invoice"):
-                try:
-                    self.generate_invoice(
-                        scheduled_invoice, invoices_generated, test=testing
-                    )
-
-                except (TypeError, IntegrityError) as e:
-                    logger.exception(
-                        f"Failed to generate invoice from scheduled invoice {scheduled_invoice.id}: {e}"
-                        f"\n{traceback.format_exc()}"
-                    )
-                    continue
-
-            if testing:
-                logger.info(
-                    "Test mode - Invoice email nofitication would have been sent to proponent and finance group"
+
+            # Share one invoicing details instance (and its cached schedule) between rows
+            invoicing_details = invoicing_details_by_id.setdefault(
+                scheduled_invoice.invoicing_details_id,
+                scheduled_invoice.invoicing_details,
+            )
+            scheduled_invoice.invoicing_details = invoicing_details
+            approval = invoicing_details.approval
+            logger.info(
+                f"\tGenerating Invoice for Approval: {approval} from schedule: {scheduled_invoice.id}"
+            )
+
+            try:
+                if invoicing_details.id not in schedules:
+                    schedule = {}
+                    for preview_invoice in invoicing_details.invoice_schedule():
+                        schedule.setdefault(
+                            preview_invoice["original_issue_date"], preview_invoice
+                        )
+                    schedules[invoicing_details.id] = schedule
+            except TypeError as e:
+                logger.exception(
+                    f"Failed to generate invoice from scheduled invoice {scheduled_invoice.id}: {e}"
+                    f"\n{traceback.format_exc()}"
                 )
                 continue
 
-            if (
-                hasattr(scheduled_invoice, "invoice")
-                and not scheduled_invoice.notification_email_sent
-            ):
-                # send to the applicant and cc finance officer
-                msg = send_new_invoice_raised_internal_notification(
-                    scheduled_invoice.invoice
+            preview_invoice = schedules[invoicing_details.id].get(
+                scheduled_invoice.date_to_generate.strftime("%d/%m/%Y")
+            )
+            if not preview_invoice:
+                logger.warning(
+                    f"preview_invoice_by_date returned None for {scheduled_invoice.date_to_generate} "
+                    f"(Approval: {approval.lodgement_number}, Scheduled Invoice: {scheduled_invoice.id})"
                 )
-                scheduled_invoice.attempts_to_send_notification_email += 1
-                if msg:
-                    scheduled_invoice.notification_email_sent = True
-                else:
-                    if (
-                        scheduled_invoice.attempts_to_send_notification_email
-                        >= settings.MAX_ATTEMPTS_TO_SEND_INVOICE_NOTIFICATION_EMAIL
-                    ):
-                        logger.error(
-                            f"Failed to send email notification for invoice {scheduled_invoice.invoice.id} "
-                            f"after {settings.MAX_ATTEMPTS_TO_SEND_INVOICE_NOTIFICATION_EMAIL} "
-                            "attempts. Will not attempt again."
-                        )
-                    else:
-                        logger.error(
-                            f"Failed to send email notification for invoice {scheduled_invoice.invoice.id}"
-                        )
-
-                scheduled_invoice.save()
+                continue
 
-        if scheduled_invoice_count > 0:
-            logger.info(f"Generated the following invoices {invoices_generated}")
-        logger.info(f"Finished running command {__name__}")
+            # The oracle code is normally set in `Invoice.save`, which bulk_create bypasses
+            oracle_code = None
+            if approval.current_proposal.invoicing_details:
+                oracle_code = approval.current_proposal.invoicing_details.oracle_code
 
-    def generate_invoice(self, scheduled_invoice, invoices_generated, test=False):
-        invoicing_details = scheduled_invoice.invoicing_details
-        logger.info(
-            f"\tGenerating Invoice for Approval: {invoicing_details.approval} from schedule: {scheduled_invoice.id}"
-        )
-        approval = invoicing_details.approval
-        preview_invoice = invoicing_details.preview_invoice_by_original_issue_date(
-            scheduled_invoice.date_to_generate
-        )
-        if not preview_invoice:
-            logger.warning(
-                f"preview_invoice_by_date returned None for {scheduled_invoice.date_to_generate} "
-                f"(Approval: {approval.lodgement_number}, Scheduled Invoice: {scheduled_invoice.id})"
+            new_invoices.append(
+                Invoice(
+                    approval=approval,
+                    amount=preview_invoice["amount_object"]["amount"],
+                    gst_free=approval.approval_type.gst_free,
+                    scheduled_invoice=scheduled_invoice,
+                    oracle_code=oracle_code,
+                )
             )
-            return
 
-        amount = preview_invoice["amount_object"]["amount"]
+        return new_invoices
 
-        invoice, created = Invoice.objects.get_or_create(
-            approval=approval,
-            amount=amount,
-            gst_free=approval.approval_type.gst_free,
-            scheduled_invoice=scheduled_invoice,
-        )
-        if not created:
+    def create_invoices(self, new_invoices):
+        """Inserts the invoices and their lodgement numbers in one transaction"""
+        if not new_invoices:
+            return []
+
+        try:
+            with transaction.atomic():
+                invoices = Invoice.objects.bulk_create(new_invoices)
+                for invoice in invoices:
+                    invoice.lodgement_number = f"{invoice.MODEL_PREFIX}{invoice.pk:06d}"
+                Invoice.objects.bulk_update(invoices, ["lodgement_number"])
+        except IntegrityError as e:
             logger.warning(
-                f"\tPossible duplication attempt. Invoice {invoice.lodgement_number} "
-                f"already exists for Approval: {approval.lodgement_number}"
+                f"Failed to bulk create invoices ({e}). Creating invoices one at a time."
             )
-            return
+            invoices = self.create_invoices_individually(new_invoices)
 
-        if test:
-            logger.info(f"Test mode - Invoice record would be generated: {invoice}")
+        for invoice in invoices:
+            # Make the new invoice available to the notification stage
+            invoice.scheduled_invoice.invoice = invoice
+            logger.info(
+                self.style.SUCCESS(f"\tGenerated Invoice: {invoice.lodgement_number}\n")
+            )
+
+        return invoices
+
+    def create_invoices_individually(self, new_invoices):
+        invoices = []
+        for invoice in new_invoices:
+            invoice.pk = None
+            invoice.lodgement_number = None
+            try:
+                with transaction.atomic():
+                    invoice.save()
+            except (TypeError, IntegrityError) as e:
+                logger.exception(
+                    f"Failed to generate invoice from scheduled invoice {invoice.scheduled_invoice.id}: {e}"
+                    f"\n{traceback.format_exc()}"
+                )
+                continue
+            invoices.append(invoice)
+
+        return invoices
+
+    def send_notifications(self, scheduled_invoices, workers):
+        """
+        Sends the invoice notification emails through a bounded pool of worker threads
+        and records the attempts for all scheduled invoices in one update
+        """
+        pending = [
+            scheduled_invoice
+            for scheduled_invoice in scheduled_invoices
+            if hasattr(scheduled_invoice, "invoice")
+            and not scheduled_invoice.notification_email_sent
+        ]
+        if not pending:
             return
 
-        invoice.save()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(self.send_notification, pending))
 
+        for scheduled_invoice, msg in zip(pending, results):
+            scheduled_invoice.attempts_to_send_notification_email += 1
+            if msg:
+                scheduled_invoice.notification_email_sent = True
+            elif (
+                scheduled_invoice.attempts_to_send_notification_email
+                >= settings.MAX_ATTEMPTS_TO_SEND_INVOICE_NOTIFICATION_EMAIL
+            ):
+                logger.error(
+                    f"Failed to send email notification for invoice {scheduled_invoice.invoice.id} "
+                    f"after {settings.MAX_ATTEMPTS_TO_SEND_INVOICE_NOTIFICATION_EMAIL} "
+                    "attempts. Will not attempt again."
+                )
+            else:
+                logger.error(
+                    f"Failed to send email notification for invoice {scheduled_invoice.invoice.id}"
+                )
+
+        ScheduledInvoice.objects.bulk_update(
+            pending,
+            ["attempts_to_send_notification_email", "notification_email_sent"],
+        )
         logger.info(
-            self.style.SUCCESS(f"\tGenerated Invoice: {invoice.lodgement_number}\n")
+            f"Sent {sum(1 for msg in results if msg)} of {len(pending)} invoice notification emails"
         )
 
-        invoices_generated.append(invoice)
-
-        return invoice
+    def send_notification(self, scheduled_invoice):
+        # send to the applicant and cc finance officer
+        try:
+            return send_new_invoice_raised_internal_notification(
+                scheduled_invoice.invoice
+            )
+        except Exception as e:
+            logger.exception(
+                f"Failed to send email notification for invoice {scheduled_invoice.invoice.id}: {e}"
+            )
+            return None
+        finally:
+            # Worker threads open their own database connections
+            connections.close_all()
@@ -0,0 +1,55 @@
+import logging
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from reversion.models import Version
+
+from leaseslicensing.components.approvals.models import Approval, ApprovalHistory
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Record the approval history of the commented approval revisions that were
+    saved before the approval history was recorded on save
+    """
+
+    help = "Record the approval history from the existing approval revisions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch_size",
+            type=int,
+            default=500,
+            help="Number of approval versions to record at a time",
+        )
+
+    def handle(self, *args, **options):
+        logger.info(f"Running command {__name__}")
+
+        batch_size = max(options["batch_size"], 1)
+        # In the order of the revisions, so the most recent revision of a lodgement
+        # sequence is recorded last
+        versions = (
+            Version.objects.filter(
+                content_type=ContentType.objects.get_for_model(Approval)
+            )
+            .exclude(revision__comment="")
+            .select_related("revision")
+            .order_by("revision__date_created", "revision_id")
+        )
+
+        recorded = 0
+        batch = []
+        with transaction.atomic():
+            for version in versions.iterator(chunk_size=batch_size):
+                batch.append(version)
+                if len(batch) == batch_size:
+                    recorded += len(ApprovalHistory.record_versions(batch))
+                    batch = []
+            recorded += len(ApprovalHistory.record_versions(batch))
+
+        logger.info(f"Recorded {recorded} approval history entries")
+        self.stdout.write(f"Recorded {recorded} approval history entries")
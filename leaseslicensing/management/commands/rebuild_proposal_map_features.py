@@ -0,0 +1,43 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from leaseslicensing.components.proposals.map_layer import refresh_map_features
+from leaseslicensing.components.proposals.models import Proposal, ProposalMapFeature
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Renders the map features of all proposals again (the map features are "
+        "otherwise rendered when the map is loaded after a proposal or its "
+        "geometries have changed)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch_size",
+            type=int,
+            default=200,
+            help="Number of proposals rendered per query",
+        )
+
+    def handle(self, *args, **options):
+        logger.info(f"Running command {__name__}")
+
+        batch_size = max(options["batch_size"], 1)
+        ProposalMapFeature.objects.update(stale=True)
+        ids = list(Proposal.objects.order_by("id").values_list("id", flat=True))
+        map_feature_count = 0
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            map_feature_count += refresh_map_features(
+                Proposal.objects.filter(id__in=ids[start:end])
+            )
+
+        self.row_count = map_feature_count
+        msg = f"<p>Rendered {map_feature_count} proposal map features</p>"
+        logger.info(msg)
+        # will be included in the cron email by the parent command
+        self.stdout.write(msg)
@@ -0,0 +1,53 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from leaseslicensing.components.main.models import SearchIndexEntry
+from leaseslicensing.components.main.search import (
+    indexed_objects,
+    update_search_index,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the search index of proposals, approvals and compliances (the "
+        "entries are otherwise updated whenever one of them is saved, but not when "
+        "e.g. an organisation name changes)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch_size",
+            type=int,
+            default=500,
+            help="Number of objects indexed per transaction",
+        )
+
+    def handle(self, *args, **options):
+        logger.info(f"Running command {__name__}")
+
+        batch_size = max(options["batch_size"], 1)
+        counts = {}
+        for object_type, _ in SearchIndexEntry.OBJECT_TYPE_CHOICES:
+            queryset, _ = indexed_objects(object_type)
+            ids = list(queryset.order_by("id").values_list("id", flat=True))
+            counts[object_type] = 0
+            for start in range(0, len(ids), batch_size):
+                end = start + batch_size
+                counts[object_type] += update_search_index(object_type, ids[start:end])
+            SearchIndexEntry.objects.filter(object_type=object_type).exclude(
+                object_id__in=queryset.values("id")
+            ).delete()
+
+        self.row_count = sum(counts.values())
+        msg = "<p>Rebuilt the search index: {}</p>".format(
+            ", ".join(
+                f"{count} {object_type}s" for object_type, count in counts.items()
+            )
+        )
+        logger.info(msg)
+        # will be included in the cron email by the parent command
+        self.stdout.write(msg)
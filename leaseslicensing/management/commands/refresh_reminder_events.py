@@ -0,0 +1,49 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from leaseslicensing.components.approvals.models import Approval, ReminderEvent
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the reminder events of all current approvals (the events are "
+        "otherwise refreshed whenever an approval or its invoicing details are saved)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch_size",
+            type=int,
+            default=200,
+            help="Number of approvals refreshed per transaction",
+        )
+
+    def handle(self, *args, **options):
+        logger.info(f"Running command {__name__}")
+
+        batch_size = max(options["batch_size"], 1)
+        approvals = (
+            Approval.objects.filter(status__in=Approval.CURRENT_APPROVAL_STATUSES)
+            .select_related("current_proposal__invoicing_details__charge_method")
+            .order_by("id")
+        )
+        approval_count = event_count = 0
+        batch = []
+        for approval in approvals.iterator(chunk_size=batch_size):
+            batch.append(approval)
+            if len(batch) == batch_size:
+                event_count += len(ReminderEvent.refresh(batch))
+                approval_count += len(batch)
+                batch = []
+        if batch:
+            event_count += len(ReminderEvent.refresh(batch))
+            approval_count += len(batch)
+
+        self.row_count = event_count
+        msg = f"<p>Refreshed {event_count} reminder events of {approval_count} approvals</p>"
+        logger.info(msg)
+        # will be included in the cron email by the parent command
+        self.stdout.write(msg)
@@ -59,6 +59,6 @@ class Command(BaseCommand):
             cmd_name, err_str, reminders_sent
         )
         logger.info(msg)
-        self.stdout.write(
-            msg
-        )  # will redirect to cron_tasks.log file, by the parent script
+        self.row_count = len(reminders_sent)
+        # will be included in the cron email by the parent command
+        self.stdout.write(msg)
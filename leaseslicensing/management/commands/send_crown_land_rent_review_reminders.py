@@ -6,7 +6,7 @@ from django.core.management.base import BaseCommand
 from leaseslicensing.components.approvals.email import (
     send_approval_crown_land_rent_review_email_notification,
 )
-from leaseslicensing.components.approvals.models import Approval
+from leaseslicensing.components.approvals.models import Approval, ReminderEvent
 from leaseslicensing.components.proposals.models import Proposal
 
 logger = logging.getLogger(__name__)
@@ -34,7 +34,11 @@ class Command(BaseCommand):
             "current_proposal__processing_status": Proposal.PROCESSING_STATUS_APPROVED,
             charge_method_in: settings.CHARGE_METHODS_REQUIRING_CROWN_LAND_RENT_REVIEW,
         }
-        approvals = Approval.objects.filter(**filters)
+        # Only the approvals with a reminder event today can be due a reminder
+        approvals = ReminderEvent.due_approvals(
+            ReminderEvent.REMINDER_TYPE_CROWN_LAND_RENT_REVIEW
+        ).filter(**filters)
+        self.row_count = 0
         for approval in approvals:
             logger.info(f"Checking approval: {approval}")
             months_due_in = None
@@ -66,3 +70,4 @@ class Command(BaseCommand):
                         f"Error sending crown land rent review reminder for approval: {approval}: {e}"
                     )
                     continue
+                self.row_count += 1
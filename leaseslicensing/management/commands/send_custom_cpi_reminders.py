@@ -7,7 +7,7 @@ from django.core.management.base import BaseCommand
 from leaseslicensing.components.approvals.email import (
     send_approval_custom_cpi_entry_email_notification,
 )
-from leaseslicensing.components.approvals.models import Approval
+from leaseslicensing.components.approvals.models import Approval, ReminderEvent
 from leaseslicensing.components.proposals.models import Proposal
 
 logger = logging.getLogger(__name__)
@@ -47,7 +47,11 @@ class Command(BaseCommand):
             "current_proposal__processing_status": Proposal.PROCESSING_STATUS_APPROVED,
             charge_method_key: settings.CHARGE_METHOD_BASE_FEE_PLUS_ANNUAL_CPI_CUSTOM,
         }
-        approvals = Approval.objects.filter(**filters)
+        # Only the approvals with a reminder event today can be due a reminder
+        approvals = ReminderEvent.due_approvals(
+            ReminderEvent.REMINDER_TYPE_CUSTOM_CPI_ENTRY
+        ).filter(**filters)
+        self.row_count = 0
         for approval in approvals:
             logger.debug(f"Checking approval: {approval}")
             invoicing_details = approval.current_proposal.invoicing_details
@@ -93,6 +97,7 @@ class Command(BaseCommand):
                         f"Error sending cpi entry reminder for approval: {approval}: {e}"
                     )
                     continue
+                self.row_count += 1
 
         logger.info("Finished running send_custom_cpi_reminders management command")
         time_taken = f"{time.time() - start:.4f}"
@@ -6,7 +6,7 @@ from django.core.management.base import BaseCommand
 from leaseslicensing.components.approvals.email import (
     send_approval_gto_advance_turnover_entry_reminder_email_notification,
 )
-from leaseslicensing.components.approvals.models import Approval
+from leaseslicensing.components.approvals.models import Approval, ReminderEvent
 from leaseslicensing.components.proposals.models import Proposal
 
 logger = logging.getLogger(__name__)
@@ -36,7 +36,10 @@ class Command(BaseCommand):
             charge_method: settings.CHARGE_METHOD_PERCENTAGE_OF_GROSS_TURNOVER_IN_ADVANCE,
         }
         reminders_sent = []
-        approvals = Approval.objects.filter(**filters)
+        # Only the approvals with a reminder event today can be due a reminder
+        approvals = ReminderEvent.due_approvals(
+            ReminderEvent.REMINDER_TYPE_GTO_ADVANCE_TURNOVER_ENTRY
+        ).filter(**filters)
         for approval in approvals:
             for (
                 days_prior
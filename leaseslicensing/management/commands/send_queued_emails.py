@@ -0,0 +1,45 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from leaseslicensing.components.emails.models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Sends the emails queued in the outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch_size",
+            type=int,
+            default=None,
+            help="Maximum number of emails sent over one connection",
+        )
+        parser.add_argument(
+            "--requeue_failed",
+            action="store_true",
+            help="Queue the emails that could not be sent again first",
+        )
+
+    def handle(self, *args, **options):
+        logger.info(f"Running command {__name__}")
+
+        if options["requeue_failed"]:
+            logger.info(f"Queued {OutboundEmail.requeue_failed()} failed emails again")
+
+        sent = failed = 0
+        while True:
+            batch_sent, batch_failed = OutboundEmail.deliver_queued(
+                options["batch_size"]
+            )
+            sent += batch_sent
+            failed += batch_failed
+            if batch_sent + batch_failed == 0:
+                break
+
+        self.row_count = sent
+        msg = f"<p>Sent {sent} queued emails ({failed} failed attempts)</p>"
+        logger.info(msg)
+        self.stdout.write(msg)
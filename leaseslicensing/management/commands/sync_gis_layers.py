@@ -0,0 +1,60 @@
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from leaseslicensing.components.main.utils import (
+    gis_layer_specifications,
+    sync_gis_layer,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the GIS layers queried when populating GIS data into the local database, "
+        "so that intersections can be found without calling the geoserver"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--layer_name",
+            type=str,
+            help="Only sync the layer with this name",
+        )
+
+    def handle(self, *args, **options):
+        logger.info(f"Running command {__name__}")
+
+        errors = []
+        updates = []
+        for specification in gis_layer_specifications():
+            layer_name = specification["layer_name"]
+            if options["layer_name"] and options["layer_name"] != layer_name:
+                continue
+            try:
+                layer = sync_gis_layer(
+                    settings.GIS_SERVER_URL,
+                    layer_name,
+                    specification["properties"],
+                )
+                updates.append(f"{layer_name} ({layer.feature_count} features)")
+            except Exception as e:
+                err_msg = f"Error syncing GIS layer {layer_name}"
+                logger.exception(f"{err_msg}\n{e}")
+                errors.append(err_msg)
+
+        cmd_name = __name__.split(".")[-1].replace("_", " ").upper()
+        err_str = (
+            f'<strong style="color: red;">Errors: {len(errors)}</strong>'
+            if len(errors) > 0
+            else '<strong style="color: green;">Errors: 0</strong>'
+        )
+        msg = "<p>{} completed. Errors: {}. Layers synced: {}.</p>".format(
+            cmd_name, err_str, updates
+        )
+        logger.info(msg)
+        self.row_count = len(updates)
+        # will be included in the cron email by the parent command
+        self.stdout.write(msg)
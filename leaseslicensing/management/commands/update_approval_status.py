@@ -6,11 +6,34 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from ledger_api_client.ledger_models import EmailUserRO as EmailUser
 
-from leaseslicensing.components.approvals.models import Approval
+from leaseslicensing.components.approvals.email import (
+    send_approval_cancel_email_notification,
+    send_approval_reinstate_email_notification,
+    send_approval_surrender_email_notification,
+    send_approval_suspend_email_notification,
+)
+from leaseslicensing.components.approvals.models import Approval, ApprovalUserAction
+from leaseslicensing.components.proposals.models import ProposalUserAction
 
 logger = logging.getLogger(__name__)
 
 
+def approval_ids_due(queryset, details_field, date_key, today):
+    """
+    Returns the ids of the approvals in `queryset` whose `details_field` json holds
+    a `date_key` date (dd/mm/yyyy) on or before today
+    """
+
+    approval_ids = []
+    for approval_id, details in queryset.values_list("id", details_field):
+        if not details or not details.get(date_key):
+            continue
+        date = datetime.datetime.strptime(details[date_key], "%d/%m/%Y").date()
+        if date <= today:
+            approval_ids.append(approval_id)
+    return approval_ids
+
+
 class Command(BaseCommand):
     help = "Change the status of Approvals to Surrender/ Cancelled/ suspended."
 
@@ -26,79 +49,105 @@ class Command(BaseCommand):
         filter_statuses = Approval.CURRENT_APPROVAL_STATUSES + [
             Approval.APPROVAL_STATUS_SUSPENDED
         ]
+        approvals = Approval.objects.filter(status__in=filter_statuses)
         logger.info(f"Running command {__name__}")
-        for a in Approval.objects.filter(status__in=filter_statuses):
-            # Begin the suspension
-            if a.suspension_details and a.set_to_suspend:
-                from_date = datetime.datetime.strptime(
-                    a.suspension_details["from_date"], "%d/%m/%Y"
+
+        # Begin the suspension
+        suspended, suspend_errors = Approval.bulk_transition(
+            Approval.objects.filter(
+                id__in=approval_ids_due(
+                    approvals.filter(set_to_suspend=True),
+                    "suspension_details",
+                    "from_date",
+                    today,
+                )
+            ),
+            Approval.APPROVAL_STATUS_SUSPENDED,
+            user,
+            ApprovalUserAction.ACTION_SUSPEND_APPROVAL,
+            ProposalUserAction.ACTION_SUSPEND_APPROVAL,
+            version_comment="status_change: Approval suspended",
+            emails=[send_approval_suspend_email_notification],
+            set_to_suspend=False,
+        )
+        errors += suspend_errors
+        updates += [dict(suspended=a.lodgement_number) for a in suspended]
+
+        # End the suspension
+        reinstated, reinstate_errors = Approval.bulk_transition(
+            Approval.objects.filter(
+                id__in=approval_ids_due(
+                    approvals.filter(
+                        status=Approval.APPROVAL_STATUS_SUSPENDED,
+                        expiry_date__gt=today,
+                    ),
+                    "suspension_details",
+                    "to_date",
+                    today,
                 )
-                from_date = from_date.date()
-                if from_date <= today:
-                    try:
-                        a.commence_suspension(user)
-                        logger.info(
-                            f"Approval {a.lodgement_number} Suspension Commenced"
-                        )
-                        updates.append(dict(suspended=a.lodgement_number))
-                    except Exception as e:
-                        err_msg = "Error suspending Approval {} status".format(
-                            a.lodgement_number
-                        )
-                        logger.error(f"{err_msg}\n{str(e)}")
-                        errors.append(err_msg)
-
-            # End the suspension
-            if a.suspension_details and a.suspension_details["to_date"]:
-                to_date = datetime.datetime.strptime(
-                    a.suspension_details["to_date"], "%d/%m/%Y"
+            ),
+            Approval.APPROVAL_STATUS_CURRENT,
+            user,
+            ApprovalUserAction.ACTION_REINSTATE_APPROVAL,
+            ProposalUserAction.ACTION_REINSTATE_APPROVAL,
+            version_comment="status_change: Approval reinstated",
+            hooks=[
+                Approval.reinstate_discarded_compliances,
+                Approval.reinstate_discarded_invoices,
+            ],
+            emails=[
+                lambda approval: send_approval_reinstate_email_notification(
+                    approval, None
                 )
-                to_date = to_date.date()
-                if to_date <= today and today < a.expiry_date:
-                    try:
-                        a.reinstate_approval(user)
-                        logger.info(
-                            f"Suspended Approval {a.lodgement_number} Reinstated"
-                        )
-                        updates.append(dict(current=a.lodgement_number))
-                    except Exception as e:
-                        err_msg = "Error suspending Approval {} status".format(
-                            a.lodgement_number
-                        )
-                        logger.error(f"{err_msg}\n{str(e)}")
-                        errors.append(err_msg)
-
-            # Surrender the approval
-            if a.surrender_details and a.set_to_surrender:
-                surrender_date = datetime.datetime.strptime(
-                    a.surrender_details["surrender_date"], "%d/%m/%Y"
+            ],
+            suspension_details={},
+            renewal_review_notification_sent_to_assessors=False,
+        )
+        errors += reinstate_errors
+        updates += [dict(current=a.lodgement_number) for a in reinstated]
+
+        # Surrender the approval
+        surrendered, surrender_errors = Approval.bulk_transition(
+            Approval.objects.filter(
+                id__in=approval_ids_due(
+                    approvals.filter(set_to_surrender=True),
+                    "surrender_details",
+                    "surrender_date",
+                    today,
                 )
-                surrender_date = surrender_date.date()
-                if surrender_date <= today:
-                    try:
-                        a.surrender(user)
-                        logger.info(f"Updated Approval {a.id} status to {a.status}")
-                        updates.append(dict(surrender=a.lodgement_number))
-                    except Exception as e:
-                        err_msg = "Error surrendering Approval {} status: {}".format(
-                            a.lodgement_number, e
-                        )
-                        logger.error(f"{err_msg}\n{str(e)}")
-                        errors.append(err_msg)
-
-            # Cancel the approval
-            if a.cancellation_date and a.set_to_cancel:
-                if a.cancellation_date <= today:
-                    try:
-                        a.cancel(user)
-                        logger.info(f"Updated Approval {a.id} status to {a.status}")
-                        updates.append(dict(cancelled=a.lodgement_number))
-                    except Exception as e:
-                        err_msg = "Error cancelling Approval {} status".format(
-                            a.lodgement_number
-                        )
-                        logger.error(f"{err_msg}\n{str(e)}")
-                        errors.append(err_msg)
+            ),
+            Approval.APPROVAL_STATUS_SURRENDERED,
+            user,
+            ApprovalUserAction.ACTION_SURRENDER_APPROVAL,
+            ProposalUserAction.ACTION_SURRENDER_APPROVAL,
+            version_comment="status_change: Approval surrendered",
+            hooks=[
+                Approval.discard_future_compliances,
+                Approval.discard_future_invoices,
+            ],
+            emails=[send_approval_surrender_email_notification],
+            set_to_surrender=False,
+        )
+        errors += surrender_errors
+        updates += [dict(surrender=a.lodgement_number) for a in surrendered]
+
+        # Cancel the approval
+        cancelled, cancel_errors = Approval.bulk_transition(
+            approvals.filter(set_to_cancel=True, cancellation_date__lte=today),
+            Approval.APPROVAL_STATUS_CANCELLED,
+            user,
+            ApprovalUserAction.ACTION_CANCEL_APPROVAL,
+            ProposalUserAction.ACTION_CANCEL_APPROVAL,
+            version_comment="status_change: Approval cancelled",
+            hooks=[
+                Approval.discard_future_compliances,
+                Approval.discard_future_invoices,
+            ],
+            emails=[send_approval_cancel_email_notification],
+            set_to_cancel=False,
+        )
+        errors += cancel_errors
+        updates += [dict(cancelled=a.lodgement_number) for a in cancelled]
 
         logger.info(f"Command {__name__} completed")
 
@@ -112,4 +161,6 @@ class Command(BaseCommand):
             cmd_name, err_str, updates
         )
         logger.info(msg)
-        print(msg)  # will redirect to cron_tasks.log file, by the parent script
+        self.row_count = len(updates)
+        # will be included in the cron email by the parent command
+        self.stdout.write(msg)
@@ -8,10 +8,7 @@ from django.utils import timezone
 from ledger_api_client.ledger_models import EmailUserRO as EmailUser
 
 from leaseslicensing.components.approvals.models import Approval
-from leaseslicensing.components.compliances.models import (
-    Compliance,
-    ComplianceUserAction,
-)
+from leaseslicensing.components.compliances.models import Compliance
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +23,6 @@ class Command(BaseCommand):
 
         logger.info(f"Running command {__name__}")
         errors = []
-        updates = []
         # update future compliances to due if they are close to due date
         compliances_due = Compliance.objects.filter(
             Q(due_date__lte=due_soon),
@@ -37,44 +33,21 @@ class Command(BaseCommand):
                 Compliance.CUSTOMER_STATUS_DUE,
             ],
         )
-        for c in compliances_due:
-            updated = False
-            if (
-                c.due_date <= today
-                and c.customer_status != Compliance.CUSTOMER_STATUS_OVERDUE
-            ):
-                c.processing_status = Compliance.PROCESSING_STATUS_OVERDUE
-                c.customer_status = Compliance.CUSTOMER_STATUS_OVERDUE
-                updated = True
-
-            elif (
-                c.due_date <= due_soon
-                and c.customer_status != Compliance.CUSTOMER_STATUS_DUE
-            ):
-                c.processing_status = Compliance.PROCESSING_STATUS_DUE
-                c.customer_status = Compliance.CUSTOMER_STATUS_DUE
-                updated = True
-
-            if not updated:
-                continue
-
-            try:
-                c.save()
-                ComplianceUserAction.log_action(
-                    c, ComplianceUserAction.ACTION_STATUS_CHANGE.format(c.id), user.id
-                )
-                logger.info(
-                    "updated Compliance {} status to {}".format(
-                        c.lodgement_number, c.processing_status
-                    )
-                )
-                updates.append(c.lodgement_number)
-            except Exception as e:
-                err_msg = "Error updating Compliance {} status".format(
-                    c.lodgement_number
-                )
-                logger.error(f"{err_msg}\n{str(e)}")
-                errors.append(err_msg)
+        overdue = Compliance.bulk_transition(
+            compliances_due.filter(due_date__lte=today),
+            Compliance.PROCESSING_STATUS_OVERDUE,
+            Compliance.CUSTOMER_STATUS_OVERDUE,
+            user,
+        )
+        due = Compliance.bulk_transition(
+            compliances_due.filter(
+                due_date__gt=today, customer_status=Compliance.CUSTOMER_STATUS_FUTURE
+            ),
+            Compliance.PROCESSING_STATUS_DUE,
+            Compliance.CUSTOMER_STATUS_DUE,
+            user,
+        )
+        updates = [c.lodgement_number for c in overdue + due]
 
         cmd_name = __name__.split(".")[-1].replace("_", " ").upper()
         err_str = (
@@ -86,4 +59,6 @@ class Command(BaseCommand):
             cmd_name, err_str, updates
         )
         logger.info(msg)
-        print(msg)  # will redirect to cron_tasks.log file, by the parent script
+        self.row_count = len(updates)
+        # will be included in the cron email by the parent command
+        self.stdout.write(msg)
@@ -0,0 +1,66 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from leaseslicensing.components.organisations.models import (
+    Organisation,
+    OrganisationContact,
+)
+from leaseslicensing.components.organisations.utils import (
+    prefetch_ledger_organisations,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Load the ledger organisation details of all active organisations into the "
+        "cache, e.g. after a deploy, so that organisation lists don't call ledger"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Warm the cache for all organisations, not only the active ones",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Number of concurrent requests made to ledger",
+        )
+
+    def handle(self, *args, **options):
+        logger.info(f"Running command {__name__}")
+
+        organisations = Organisation.objects.exclude(ledger_organisation_id=None)
+        if not options["all"]:
+            organisations = organisations.filter(
+                contacts__user_status=OrganisationContact.USER_STATUS_CHOICE_ACTIVE
+            )
+        ledger_organisation_ids = set(
+            organisations.values_list("ledger_organisation_id", flat=True)
+        )
+
+        workers = options["workers"]
+        organisations = prefetch_ledger_organisations(
+            ledger_organisation_ids, max_workers=max(workers, 1) if workers else None
+        )
+        errors = sorted(ledger_organisation_ids - organisations.keys())
+
+        cmd_name = __name__.split(".")[-1].replace("_", " ").upper()
+        err_str = (
+            f'<strong style="color: red;">Errors: {len(errors)}</strong>'
+            if len(errors) > 0
+            else '<strong style="color: green;">Errors: 0</strong>'
+        )
+        msg = "<p>{} completed. Errors: {}. Organisations cached: {}.</p>".format(
+            cmd_name, err_str, len(organisations)
+        )
+        if errors:
+            msg += f"<p>Unable to retrieve ledger organisations: {errors}</p>"
+        logger.info(msg)
+        self.row_count = len(organisations)
+        # will be included in the cron email by the parent command
+        self.stdout.write(msg)
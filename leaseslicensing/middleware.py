@@ -5,6 +5,10 @@ from django.shortcuts import redirect
 from django.urls import reverse
 
 from leaseslicensing.helpers import is_internal
+from leaseslicensing.ledger_api_utils import (
+    close_email_user_identity_map,
+    open_email_user_identity_map,
+)
 
 
 class FirstTimeNagScreenMiddleware:
@@ -79,3 +83,17 @@ class CacheControlMiddleware:
         elif request.path[:8] == "/static/":
             response["Cache-Control"] = "public, max-age=86400"
         return response
+
+
+class EmailUserIdentityMapMiddleware:
+    """Scopes the ledger email user identity map to a single request"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        open_email_user_identity_map()
+        try:
+            return self.get_response(request)
+        finally:
+            close_email_user_identity_map()
@@ -0,0 +1,40 @@
+import django.contrib.gis.db.models.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaseslicensing', '0326_alter_organisation_ledger_organisation_trading_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GISLayer',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('layer_name', models.CharField(max_length=255, unique=True)),
+                ('properties', models.JSONField(default=list)),
+                ('srs_name', models.CharField(max_length=255)),
+                ('feature_count', models.PositiveIntegerField(default=0)),
+                ('synced_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'GIS Layer',
+                'ordering': ['layer_name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='GISLayerFeature',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('properties', models.JSONField(default=dict)),
+                ('geometry', django.contrib.gis.db.models.fields.GeometryField(srid=4326)),
+                ('layer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='features', to='leaseslicensing.gislayer')),
+            ],
+            options={
+                'verbose_name': 'GIS Layer Feature',
+            },
+        ),
+    ]
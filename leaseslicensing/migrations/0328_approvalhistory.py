@@ -0,0 +1,37 @@
+# Generated by Django 5.0.2 on 2024-02-12 09:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaseslicensing', '0327_gislayer_gislayerfeature'),
+        ('reversion', '0001_squashed_0004_auto_20160611_1202'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApprovalHistory',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lodgement_sequence', models.IntegerField()),
+                ('status', models.CharField(choices=[('current', 'Current'), ('current_pending_renewal_review', 'Current (Pending Renewal Review)'), ('current_pending_renewal', 'Current (Pending Renewal)'), ('expired', 'Expired'), ('cancelled', 'Cancelled'), ('surrendered', 'Surrendered'), ('suspended', 'Suspended'), ('extended', 'Extended'), ('awaiting_payment', 'Awaiting Payment'), ('current_editing_invoicing', 'Current (Editing Invoicing)')], max_length=40)),
+                ('start_date', models.DateField(null=True)),
+                ('expiry_date', models.DateField(null=True)),
+                ('approval', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='history', to='leaseslicensing.approval')),
+                ('approval_type', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='leaseslicensing.approvaltype')),
+                ('cover_letter_document', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='leaseslicensing.approvaldocument')),
+                ('current_proposal', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='leaseslicensing.proposal')),
+                ('licence_document', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='leaseslicensing.approvaldocument')),
+                ('revision', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reversion.revision')),
+                ('sign_off_sheet', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='leaseslicensing.approvaldocument')),
+            ],
+            options={
+                'verbose_name_plural': 'Approval history',
+                'ordering': ['approval', '-lodgement_sequence'],
+                'unique_together': {('approval', 'lodgement_sequence')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.2 on 2024-02-26 11:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaseslicensing', '0329_outboundemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reminder_type', models.CharField(choices=[('crown_land_rent_review', 'Crown Land Rent Review'), ('custom_cpi_entry', 'Custom CPI Entry'), ('gto_advance_turnover_entry', 'Gross Turnover Entry (Advance)')], max_length=40)),
+                ('date', models.DateField()),
+                ('approval', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminder_events', to='leaseslicensing.approval')),
+            ],
+            options={
+                'ordering': ['date', 'approval'],
+                'indexes': [models.Index(fields=['date', 'reminder_type'], name='leaseslicen_date_761e67_idx')],
+                'unique_together': {('approval', 'reminder_type', 'date')},
+            },
+        ),
+    ]
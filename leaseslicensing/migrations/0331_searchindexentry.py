@@ -0,0 +1,35 @@
+# Generated by Django 5.0.2 on 2024-02-27 09:41
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaseslicensing', '0330_reminderevent'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.CreateModel(
+            name='SearchIndexEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_type', models.CharField(choices=[('proposal', 'Proposal'), ('approval', 'Approval'), ('compliance', 'Compliance')], max_length=20)),
+                ('object_id', models.IntegerField()),
+                ('reference', models.CharField(blank=True, max_length=50)),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('text', models.TextField(blank=True)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='search_index_vector_idx'), django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass('text', name='gin_trgm_ops'), name='search_index_text_trgm_idx'), django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('text'), name='gin_trgm_ops'), name='search_index_utext_trgm_idx')],
+                'unique_together': {('object_type', 'object_id')},
+            },
+        ),
+    ]
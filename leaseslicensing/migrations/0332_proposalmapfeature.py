@@ -0,0 +1,27 @@
+# Generated by Django 5.0.2 on 2024-02-28 10:17
+
+import django.contrib.gis.db.models.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaseslicensing', '0331_searchindexentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProposalMapFeature',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.JSONField(default=dict)),
+                ('simplified_data', models.JSONField(default=dict)),
+                ('extent', django.contrib.gis.db.models.fields.PolygonField(blank=True, null=True, srid=4326)),
+                ('stale', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('proposal', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='map_feature', to='leaseslicensing.proposal')),
+            ],
+        ),
+    ]
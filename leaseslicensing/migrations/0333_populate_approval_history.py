@@ -0,0 +1,17 @@
+from django.core.management import call_command
+from django.db import migrations
+
+
+def populate_approval_history(apps, schema_editor):
+    call_command("populate_approval_history", verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaseslicensing', '0332_proposalmapfeature'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_approval_history, migrations.RunPython.noop),
+    ]
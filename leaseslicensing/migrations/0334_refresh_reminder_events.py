@@ -0,0 +1,17 @@
+from django.core.management import call_command
+from django.db import migrations
+
+
+def refresh_reminder_events(apps, schema_editor):
+    call_command("refresh_reminder_events", verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaseslicensing', '0333_populate_approval_history'),
+    ]
+
+    operations = [
+        migrations.RunPython(refresh_reminder_events, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+from django.core.management import call_command
+from django.db import migrations
+
+
+def rebuild_proposal_map_features(apps, schema_editor):
+    call_command("rebuild_proposal_map_features", verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaseslicensing', '0335_rebuild_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_proposal_map_features, migrations.RunPython.noop),
+    ]
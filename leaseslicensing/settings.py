@@ -64,6 +64,7 @@ INSTALLED_APPS += [
     "leaseslicensing.components.approvals",
     "leaseslicensing.components.compliances",
     "leaseslicensing.components.competitive_processes",
+    "leaseslicensing.components.emails",
     "leaseslicensing.components.invoicing",
     "leaseslicensing.components.tenure",
     "leaseslicensing.components.texts",
@@ -79,6 +80,10 @@ INSTALLED_APPS += [
 # Not using django cron
 INSTALLED_APPS.pop(INSTALLED_APPS.index("django_cron"))
 
+# Trigram and full-text search lookups of the search index
+if "django.contrib.postgres" not in INSTALLED_APPS:
+    INSTALLED_APPS.append("django.contrib.postgres")
+
 ADD_REVERSION_ADMIN = True
 
 WSGI_APPLICATION = "leaseslicensing.wsgi.application"
@@ -105,7 +110,7 @@ REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": (
         "rest_framework_datatables.filters.DatatablesFilterBackend",
     ),
-    "DEFAULT_PAGINATION_CLASS": "rest_framework_datatables.pagination.DatatablesPageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "leaseslicensing.components.main.pagination.DatatablesPagination",
     "PAGE_SIZE": 20,
     "EXCEPTION_HANDLER": "drf_standardized_errors.handler.exception_handler",
 }
@@ -114,6 +119,7 @@ REST_FRAMEWORK = {
 MIDDLEWARE_CLASSES += [
     "leaseslicensing.middleware.FirstTimeNagScreenMiddleware",
     "leaseslicensing.middleware.CacheControlMiddleware",
+    "leaseslicensing.middleware.EmailUserIdentityMapMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
 ]
 MIDDLEWARE = MIDDLEWARE_CLASSES
@@ -161,11 +167,31 @@ if USE_DUMMY_CACHE:
     }
 else:
     CACHES = {
+        # A per-process LRU cache in front of the shared cache
         "default": {
-            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
-            "LOCATION": os.path.join(BASE_DIR, "leaseslicensing", "cache"),
+            "BACKEND": "leaseslicensing.cache.TwoTierCache",
+            "OPTIONS": {
+                "SHARED_CACHE": "shared",
+                "LOCAL_MAX_ENTRIES": env("CACHE_LOCAL_MAX_ENTRIES", 1000),
+                "LOCAL_TIMEOUT": env("CACHE_LOCAL_TIMEOUT", 10),  # seconds
+            },
+        },
+        "shared": {
+            "BACKEND": env(
+                "SHARED_CACHE_BACKEND",
+                "django.core.cache.backends.filebased.FileBasedCache",
+            ),
+            "LOCATION": env(
+                "SHARED_CACHE_LOCATION",
+                os.path.join(BASE_DIR, "leaseslicensing", "cache"),
+            ),
         },
     }
+    if len(sys.argv) > 1 and sys.argv[1] == "test":
+        # Use an in-memory stand-in for the shared cache when running the tests
+        CACHES["shared"] = {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
 
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles_ll")
 STATICFILES_DIRS.extend(
@@ -213,7 +239,6 @@ MEDIA_APP_DIR = env("MEDIA_APP_DIR", "leaseslicensing")
 CRON_RUN_AT_TIMES = env("CRON_RUN_AT_TIMES", "04:05")
 CRON_EMAIL = env("CRON_EMAIL", "cron@" + SITE_DOMAIN).lower()
 CRON_NOTIFICATION_EMAIL = env("CRON_NOTIFICATION_EMAIL", NOTIFICATION_EMAIL).lower()
-CRON_EMAIL_FILE_NAME = "cron_email.log"
 
 DEFAULT_FROM_EMAIL = env("DEFAULT_FROM_EMAIL", "no-reply@" + SITE_DOMAIN).lower()
 SUPPORT_EMAIL = env("SUPPORT_EMAIL", "licensing@" + SITE_DOMAIN).lower()
@@ -331,6 +356,23 @@ if CONSOLE_EMAIL_BACKEND:
     # EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
     EMAIL_BACKEND = "wagov_utils.components.utils.email_backend.EmailBackend"
 
+# Queue outbound emails in the database, with the transaction that sends them, rather than
+# sending them right away. The queued emails are sent by the `send_queued_emails` command
+# with the `EMAIL_OUTBOX_DELIVERY_BACKEND` (by default the backend configured above).
+EMAIL_OUTBOX = env("EMAIL_OUTBOX", False)
+EMAIL_OUTBOX_DELIVERY_BACKEND = env(
+    "EMAIL_OUTBOX_DELIVERY_BACKEND",
+    globals().get("EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend"),
+)
+if EMAIL_OUTBOX:
+    EMAIL_BACKEND = "leaseslicensing.components.emails.backends.OutboxEmailBackend"
+# Maximum number of queued emails sent over one connection
+EMAIL_OUTBOX_BATCH_SIZE = env("EMAIL_OUTBOX_BATCH_SIZE", 100)
+# Emails that can't be sent are retried after this many seconds, doubled after each attempt
+EMAIL_OUTBOX_RETRY_DELAY = env("EMAIL_OUTBOX_RETRY_DELAY", 60)
+# Emails that can't be sent in this many attempts are marked as failed
+EMAIL_OUTBOX_MAX_ATTEMPTS = env("EMAIL_OUTBOX_MAX_ATTEMPTS", 5)
+
 
 # Add a debug level logger for development
 if DEBUG:
@@ -430,6 +472,9 @@ GIS_LANDS_AND_WATERS_LAYER_NAME = env(
     "kaartdijin-boodja-public:CPT_DBCA_LEGISLATED_TENURE",
 )
 GIS_INVERT_XY = env("GIS_INVERT_XY", True)
+# How long the local copies of the GIS layers are used for before falling back to the geoserver
+GIS_LAYER_CACHE_MAX_AGE = env("GIS_LAYER_CACHE_MAX_AGE", 48)  # hours
+GIS_SERVER_TIMEOUT = env("GIS_SERVER_TIMEOUT", 30)  # seconds
 
 ABS_API_URL = env("ABS_API_URL", "https://api.data.abs.gov.au")
 ABS_API_CPI_SUBDIRECTORY = env("ABD_API_CPI_PATH", "/data/CPI/")
@@ -624,28 +669,71 @@ CACHE_TIMEOUT_2_HOURS = 60 * 60 * 2
 CACHE_TIMEOUT_24_HOURS = 60 * 60 * 24
 CACHE_TIMEOUT_NEVER = None
 
+# Maximum number of ledger email users kept in each process' LRU cache
+LEDGER_EMAIL_USER_LRU_CACHE_SIZE = env("LEDGER_EMAIL_USER_LRU_CACHE_SIZE", 2000)
+
+# Maximum number of concurrent requests made to ledger when loading organisations
+LEDGER_ORGANISATION_PREFETCH_WORKERS = env("LEDGER_ORGANISATION_PREFETCH_WORKERS", 8)
+
+# Maximum number of background jobs (e.g. large shapefile imports) run at the same time per process
+BACKGROUND_JOB_WORKERS = env("BACKGROUND_JOB_WORKERS", 2)
+
+# Document (e.g. docx to pdf) conversion with a pool of headless LibreOffice workers,
+# each with a LibreOffice user profile of its own
+LIBREOFFICE_COMMAND = env("LIBREOFFICE_COMMAND", "libreoffice")
+DOCUMENT_CONVERSION_WORKERS = env("DOCUMENT_CONVERSION_WORKERS", 2)
+# Maximum number of documents converted by a worker with one command
+DOCUMENT_CONVERSION_BATCH_SIZE = env("DOCUMENT_CONVERSION_BATCH_SIZE", 10)
+DOCUMENT_CONVERSION_TIMEOUT = env("DOCUMENT_CONVERSION_TIMEOUT", 120)
+
+# The coordinates of the polygons on the proposals map are rounded to this many
+# decimal places (7 decimal places of a degree are about 1cm)
+MAP_FEATURE_COORDINATE_PRECISION = env("MAP_FEATURE_COORDINATE_PRECISION", 7)
+# Below this zoom level (the `zoom` parameter of `list_for_map`) the map shows
+# simplified polygons
+MAP_FEATURE_DETAIL_ZOOM = env("MAP_FEATURE_DETAIL_ZOOM", 14)
+# The tolerance in degrees of the simplified polygons (0.0001 is about 10m)
+MAP_FEATURE_SIMPLIFY_TOLERANCE = env("MAP_FEATURE_SIMPLIFY_TOLERANCE", 0.0001)
+# The maximum number of map features (re-)rendered when loading the proposals map,
+# the rest are rendered on the next load or by `rebuild_proposal_map_features`
+MAP_FEATURE_RENDER_LIMIT = env("MAP_FEATURE_RENDER_LIMIT", 100)
+
 # ---------- Cache Keys ----------
 
-CACHE_KEY_DBCA_LEDGER_ORGANISATION = "dbca_ledger_organisation"
-CACHE_KEY_DEFAULT_FROM_EMAIL = "default-from-email"
-CACHE_KEY_LEDGER_EMAIL_USER = "ledger-emailuser-{}"
-CACHE_KEY_LEDGER_ORGANISATION = "ledger-organisation-{}"
-CACHE_KEY_ORGANISATION_IDS = "cache_organisation_ids"
-CACHE_KEY_ORGANISATIONS = "cache_organisations"
-CACHE_KEY_USER_IDS = "cache_user_ids"
-CACHE_KEY_COUNTRY_LIST = "country_list"
+# Keys of the form `<namespace>:<key>` can be invalidated per namespace with
+# `cache.invalidate_namespace(<namespace>)` (see `leaseslicensing.cache.TwoTierCache`)
+CACHE_NAMESPACE_LEDGER = "ledger"
+CACHE_NAMESPACE_APPLICATION_TYPES = "application-types"
+CACHE_NAMESPACE_APPROVAL_TYPES = "approval-types"
+CACHE_NAMESPACE_GIS = "gis"
+
+CACHE_KEY_DBCA_LEDGER_ORGANISATION = "ledger:dbca_ledger_organisation"
+CACHE_KEY_DEFAULT_FROM_EMAIL = "ledger:default-from-email"
+CACHE_KEY_LEDGER_EMAIL_USER = "ledger:emailuser-{}"
+CACHE_KEY_LEDGER_ORGANISATION = "ledger:organisation-{}"
+CACHE_KEY_ORGANISATION_IDS = "ledger:cache_organisation_ids"
+CACHE_KEY_ORGANISATIONS = "ledger:cache_organisations"
+CACHE_KEY_USER_IDS = "ledger:cache_user_ids"
+CACHE_KEY_COUNTRY_LIST = "ledger:country_list"
 CACHE_KEY_APPROVAL_STATUSES = "approval_statuses_dict"
-CACHE_KEY_APPLICATION_TYPE_DICT_FOR_FILTER = "application_type_dict_for_filter"
-CACHE_KEY_APPLICATION_TYPE_DICT = "application_type_dict"
+CACHE_KEY_APPLICATION_TYPE_DICT_FOR_FILTER = (
+    "application-types:application_type_dict_for_filter"
+)
+CACHE_KEY_APPLICATION_TYPE_DICT = "application-types:application_type_dict"
 CACHE_KEY_APPLICATION_STATUSES_DICT_INTERNAL = "application_internal_statuses_dict"
 CACHE_KEY_APPLICATION_STATUSES_DICT_EXTERNAL = "application_external_statuses_dict"
 CACHE_KEY_APPLICATION_STATUSES_DICT_FOR_FILTER = (
     "application_internal_statuses_dict_for_filter"
 )
-CACHE_KEY_DBCA_LEGISLATED_LANDS_AND_WATERS = "dbca_legislated_lands_and_waters"
-CACHE_KEY_MAP_PROPOSALS = "map-proposals"
+CACHE_KEY_DBCA_LEGISLATED_LANDS_AND_WATERS = "gis:dbca_legislated_lands_and_waters"
 CACHE_KEY_LODGEMENT_NUMBER_PREFIXES = "lodgement_number_prefixes"
-CACHE_KEY_APPROVAL_TYPES_DICTIONARY = "approval-types-dictionary"
+CACHE_KEY_APPROVAL_TYPES_DICTIONARY = "approval-types:approval-types-dictionary"
+CACHE_KEY_DATATABLES_TOTAL_COUNT = "datatables-total-count-{}"
+CACHE_KEY_CPI_TABLE_VERSION = "cpi-table-version"
+CACHE_KEY_GIS_LAYER_LATENCY = "gis:gis-layer-latency-{}"
+CACHE_KEY_SYSTEM_GROUP_MEMBERS = "system-group-members-{}"
+CACHE_KEY_SYSTEM_GROUP_MEMBERS_VERSION = "system-group-members-version"
+CACHE_KEY_BACKGROUND_JOB = "background-job-{}"
 
 # ---------- User Log Actions ----------
 
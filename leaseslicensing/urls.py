@@ -179,6 +179,21 @@ api_patterns = [
         proposal_api.SearchReferenceView.as_view(),
         name="search_reference",
     ),
+    re_path(
+        r"^api/main/gis_layer_latencies/$",
+        main_api.GISLayerLatencyView.as_view(),
+        name="gis_layer_latencies",
+    ),
+    re_path(
+        r"^api/main/cache_statistics/$",
+        main_api.CacheStatisticsView.as_view(),
+        name="cache_statistics",
+    ),
+    re_path(
+        r"^api/main/background_jobs/(?P<job_id>[0-9a-f]+)/$",
+        main_api.BackgroundJobView.as_view(),
+        name="background_job",
+    ),
     re_path(
         r"^api/main/secure_file/(?P<model>[\w-]+)/(?P<instance_id>\d+)/(?P<file_field_name>\w+)/$",
         main_api.SecureFileAPIView.as_view(),